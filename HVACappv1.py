@@ -1,6 +1,123 @@
 import streamlit as st
 import pandas as pd
 
+from ductsizing import empty_duct_table, normalize_ducts, size_ducts
+from electricalappv2 import circuit_schedule_wire
+from hvacloads import empty_room_table, normalize_rooms, room_loads, select_units
+from pricecatalog import catalog_price
+
+# Inputs the composite project estimator collects for line_items() (HVAC Technician scope)
+MODEL_INPUTS = {
+    "hvac_unit_cost": ("Cost of HVAC Unit ($)", 0.0),
+    "duct_install_cost": ("Duct Installation Cost ($)", 0.0),
+    "wire_cost": ("Cost of Wire per Foot ($)", 0.0),
+    "wire_length": ("Total Wire Length (Feet)", 0.0),
+    "num_outlets": ("Number of Outlets/Switches", 0),
+    "cost_per_outlet": ("Cost per Outlet/Switch ($)", 0.0),
+    "num_fixtures": ("Number of Light Fixtures", 0),
+    "cost_per_fixture": ("Cost per Light Fixture ($)", 0.0),
+    "panel_cost": ("Electrical Panel/Unit Cost ($)", 0.0),
+    "conduit_cost": ("Conduit and Fittings ($)", 0.0),
+    "junction_boxes": ("Junction Boxes ($)", 0.0),
+    "misc_materials": ("Miscellaneous Materials ($)", 0.0),
+    "num_technicians": ("Number of Technicians", 1),
+    "hours_per_technician": ("Hours per Technician", 0.0),
+    "labor_rate": ("Hourly Rate per Technician ($)", 0.0),
+    "permit_cost": ("Permit Costs ($)", 0.0),
+    "inspection_cost": ("Inspection Costs ($)", 0.0),
+}
+
+
+# Trade-specific material costs: input name -> (phase, line item); absent inputs cost nothing
+TRADE_MATERIALS = {
+    "alarm_system_cost": ("Installation", "Alarm System"),
+    "network_wiring_cost": ("Rough-In", "Network Wiring"),
+    "pole_install_cost": ("Installation", "Pole Installation"),
+    "transformer_cost": ("Installation", "Transformer"),
+    "hvac_unit_cost": ("Installation", "HVAC Unit"),
+    "duct_install_cost": ("Rough-In", "Ductwork Installation"),
+    "duct_fabrication_cost": ("Rough-In", "Duct Fabrication"),
+    "duct_installation_cost": ("Rough-In", "Duct Installation"),
+    "boiler_cost": ("Installation", "Boiler Unit"),
+    "tank_installation_cost": ("Installation", "Tank Installation"),
+}
+
+
+def calculate_estimate(inputs):
+    """Costs and cost lines for a set of electrical or HVAC inputs, before markup and contingency
+
+    Lines are (phase, item, quantity, unit cost) and are what the composite
+    estimator prices. Trade-specific costs in TRADE_MATERIALS are optional.
+    """
+    total_labor_hours = inputs["num_technicians"] * inputs["hours_per_technician"]
+    lines = [
+        ("Rough-In", "Wire (feet)", inputs["wire_length"], inputs["wire_cost"]),
+        ("Rough-In", "Conduit and Fittings", 1, inputs["conduit_cost"]),
+        ("Rough-In", "Junction Boxes", 1, inputs["junction_boxes"]),
+        ("Rough-In", "Electrical Panel/Unit", 1, inputs["panel_cost"]),
+        ("Rough-In", "Miscellaneous Materials", 1, inputs["misc_materials"]),
+        ("Installation", "HVAC Labor (hours)", total_labor_hours, inputs["labor_rate"]),
+        ("Finish", "Outlets/Switches", inputs["num_outlets"], inputs["cost_per_outlet"]),
+        ("Finish", "Light Fixtures", inputs["num_fixtures"], inputs["cost_per_fixture"]),
+        ("Permits", "Permits and Inspections", 1, inputs["permit_cost"] + inputs["inspection_cost"]),
+    ] + [(phase, item, 1, inputs[name]) for name, (phase, item) in TRADE_MATERIALS.items() if name in inputs]
+    costs = {item: quantity * unit_cost for _, item, quantity, unit_cost in lines}
+
+    total_labor_cost = costs["HVAC Labor (hours)"]
+    total_permit_inspect = costs["Permits and Inspections"]
+    subtotal = sum(costs.values())
+    return {
+        "total_materials": subtotal - total_labor_cost - total_permit_inspect,
+        "total_labor_hours": total_labor_hours,
+        "total_labor_cost": total_labor_cost,
+        "total_permit_inspect": total_permit_inspect,
+        "subtotal": subtotal,
+        "lines": lines,
+    }
+
+
+def line_items(inputs):
+    """Cost lines as (phase, item, quantity, unit cost) for the composite estimator"""
+    return calculate_estimate(inputs)["lines"]
+
+
+def duct_network_costs():
+    """Duct tree input sized by equal friction; returns (fabrication cost, installation cost)"""
+    st.write("Enter each duct segment with the segment it branches from (blank for the air handler), "
+             "its length, fittings and the CFM its own outlets deliver.")
+    duct_file = st.file_uploader("Upload Duct Segments (CSV)", type=["csv"], key="duct_upload")
+    duct_table = empty_duct_table()
+    if duct_file is not None:
+        try:
+            duct_table = normalize_ducts(pd.read_csv(duct_file))
+        except Exception as e:
+            st.error(f"Error reading file: {str(e)}")
+    ducts = normalize_ducts(st.data_editor(
+        duct_table, num_rows="dynamic", hide_index=True, use_container_width=True, key="duct_editor"))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        friction_rate = st.number_input("Design Friction Rate (in. w.c. per 100 ft):", min_value=0.01, value=0.08, format="%.3f", step=0.01)
+        rect_height = st.number_input("Rectangular Duct Depth (Inches):", min_value=4.0, value=8.0, step=2.0)
+        seam_waste_pct = st.number_input("Seams and Waste (%):", min_value=0.0, value=15.0, step=5.0)
+    with col2:
+        metal_price = st.number_input("Galvanized Sheet Metal per Pound ($):", min_value=0.0, value=catalog_price("Sheet Metal", "Galvanized Steel"), format="%.2f", step=0.1)
+        fabrication_rate = st.number_input("Fabrication Labor per Pound ($):", min_value=0.0, format="%.2f", step=0.1)
+        install_rate = st.number_input("Installation Cost per Foot of Duct ($):", min_value=0.0, format="%.2f", step=0.5)
+
+    sized, static_pressure = size_ducts(ducts, friction_rate, rect_height, seam_waste_pct=seam_waste_pct)
+    st.dataframe(sized, use_container_width=True)
+    if (sized["Status"] != "OK").any():
+        st.warning("Some segments name a Parent that was not found or do not connect back to the air handler; check their Parent names.")
+
+    total_weight = sized["Weight (lb)"].sum()
+    st.write(f"**Critical path static pressure: {static_pressure:.3f} in. w.c. "
+             f"Sheet metal: {sized['Sheet Metal (sq ft)'].sum():,.1f} sq ft, {total_weight:,.1f} lb.**")
+    fabrication_cost = total_weight * (metal_price + fabrication_rate)
+    installation_cost = ducts["Length (ft)"].sum() * install_rate
+    return fabrication_cost, installation_cost
+
+
 def main():
     st.title("Comprehensive Electrical and HVAC Project Cost Estimator")
     st.write("Enter the details of your electrical or HVAC project below to get an estimated cost.")
@@ -20,15 +137,26 @@ def main():
         ["New Installation", "Renovation", "Service Upgrade", "Repair"]
     )
 
-    service_size = st.selectbox(
-        "Service Size (Amps/Capacity):",
-        ["100A", "200A", "400A", "600A", "1 Ton HVAC", "2 Ton HVAC", "5 Ton HVAC"]
-    )
+    unit_sizing = "Enter Unit Cost"
+    if contractor_type == "HVAC Technician":
+        unit_sizing = st.radio("HVAC unit:", ["Enter Unit Cost", "Size from Room Loads"], horizontal=True)
+    if unit_sizing == "Size from Room Loads":
+        # The units selected from the room loads below set the capacity
+        service_size = "No cooling load"
+    else:
+        service_size = st.selectbox(
+            "Service Size (Amps/Capacity):",
+            ["100A", "200A", "400A", "600A", "1 Ton HVAC", "2 Ton HVAC", "5 Ton HVAC"]
+        )
 
     # General Material Inputs (Applicable to All Trades)
     st.subheader("Materials")
-    wire_cost = st.number_input("Cost of Wire per Foot ($):", min_value=0.0, format="%.2f", step=0.1)
-    wire_length = st.number_input("Total Wire Length Needed (Feet):", min_value=0, step=1)
+    wire_mode = st.radio("Wire quantities:", ["Enter Totals", "Circuit Schedule"], horizontal=True)
+    if wire_mode == "Enter Totals":
+        wire_cost = st.number_input("Cost of Wire per Foot ($):", min_value=0.0, value=catalog_price("Electrical", "Wire"), format="%.2f", step=0.1)
+        wire_length = st.number_input("Total Wire Length Needed (Feet):", min_value=0, step=1)
+    else:
+        wire_cost, wire_length, _ = circuit_schedule_wire()
 
     num_outlets = st.number_input("Number of Outlets/Switches:", min_value=0, step=1)
     cost_per_outlet = st.number_input("Cost per Outlet/Switch ($):", min_value=0.0, format="%.2f", step=0.5)
@@ -51,13 +179,63 @@ def main():
 
     elif contractor_type == "HVAC Technician":
         st.subheader("HVAC System Inputs")
-        hvac_unit_cost = st.number_input("Cost of HVAC Unit ($):", min_value=0.0, format="%.2f", step=50.0)
-        duct_install_cost = st.number_input("Duct Installation Cost ($):", min_value=0.0, format="%.2f", step=50.0)
+        if unit_sizing == "Enter Unit Cost":
+            hvac_unit_cost = st.number_input("Cost of HVAC Unit ($):", min_value=0.0, format="%.2f", step=50.0)
+        else:
+            st.write("Enter each conditioned room. Exterior wall area includes its windows; orientation is the "
+                     "direction the windows face (N, NE, E, SE, S, SW, W, NW or Skylight).")
+            room_file = st.file_uploader("Upload Room Table (CSV)", type=["csv"], key="room_upload")
+            room_table = empty_room_table()
+            if room_file is not None:
+                try:
+                    room_table = normalize_rooms(pd.read_csv(room_file))
+                except Exception as e:
+                    st.error(f"Error reading file: {str(e)}")
+            rooms = normalize_rooms(st.data_editor(
+                room_table, num_rows="dynamic", hide_index=True, use_container_width=True, key="room_editor"))
+
+            with st.expander("Envelope and Design Conditions"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    wall_u = st.number_input("Wall U-Value (Btu/h·sq ft·°F):", min_value=0.0, value=0.08, format="%.3f", step=0.01)
+                    window_u = st.number_input("Window U-Value (Btu/h·sq ft·°F):", min_value=0.0, value=0.35, format="%.3f", step=0.01)
+                    roof_u = st.number_input("Roof/Ceiling U-Value (Btu/h·sq ft·°F):", min_value=0.0, value=0.03, format="%.3f", step=0.01)
+                    shgc = st.number_input("Window Solar Heat Gain Coefficient:", min_value=0.0, max_value=1.0, value=0.4, step=0.05)
+                    infiltration_ach = st.number_input("Infiltration (Air Changes per Hour):", min_value=0.0, value=0.5, step=0.1)
+                with col2:
+                    outdoor_summer = st.number_input("Outdoor Summer Design Temperature (°F):", value=95.0, step=1.0)
+                    indoor_cooling = st.number_input("Indoor Cooling Setpoint (°F):", value=75.0, step=1.0)
+                    outdoor_winter = st.number_input("Outdoor Winter Design Temperature (°F):", value=20.0, step=1.0)
+                    indoor_heating = st.number_input("Indoor Heating Setpoint (°F):", value=70.0, step=1.0)
+                    moisture_grains = st.number_input("Outdoor Minus Indoor Moisture (Grains per lb):", min_value=0.0, value=30.0, step=5.0)
+
+            loads = room_loads(rooms, wall_u, window_u, roof_u, shgc, outdoor_summer, indoor_cooling,
+                               outdoor_winter, indoor_heating, infiltration_ach, moisture_grains)
+            st.dataframe(loads, use_container_width=True)
+
+            safety_pct = st.number_input("Sizing Safety Margin (%):", min_value=0.0, value=10.0, step=5.0)
+            cost_per_ton = st.number_input("Installed Unit Cost per Ton ($):", min_value=0.0, value=catalog_price("HVAC", "Cost per Ton"), format="%.2f", step=50.0)
+            unit_tons, num_units = select_units(loads["Cooling (Btu/h)"].sum(), safety_pct)
+            hvac_unit_cost = unit_tons * num_units * cost_per_ton
+            if num_units:
+                service_size = f"{num_units} x {unit_tons:g} Ton HVAC" if num_units > 1 else f"{unit_tons:g} Ton HVAC"
+                st.write(f"**Building load: {loads['Cooling (Btu/h)'].sum():,.0f} Btu/h cooling "
+                         f"({loads['Tons'].sum():.2f} tons), {loads['Heating (Btu/h)'].sum():,.0f} Btu/h heating, "
+                         f"{loads['Airflow (CFM)'].sum():,.0f} CFM. Selected {num_units} x {unit_tons:g}-ton "
+                         f"unit{'s' if num_units > 1 else ''} for ${hvac_unit_cost:,.2f}.**")
+        if st.checkbox("Size the duct network from a segment tree"):
+            # Fabricated duct and its installation are both carried as the duct line
+            duct_install_cost = sum(duct_network_costs())
+        else:
+            duct_install_cost = st.number_input("Duct Installation Cost ($):", min_value=0.0, format="%.2f", step=50.0)
 
     elif contractor_type == "Sheet Metal Worker":
         st.subheader("Sheet Metal Work")
-        duct_fabrication_cost = st.number_input("Cost of Duct Fabrication ($):", min_value=0.0, format="%.2f", step=50.0)
-        duct_installation_cost = st.number_input("Cost of Duct Installation ($):", min_value=0.0, format="%.2f", step=50.0)
+        if st.checkbox("Size the duct network from a segment tree"):
+            duct_fabrication_cost, duct_installation_cost = duct_network_costs()
+        else:
+            duct_fabrication_cost = st.number_input("Cost of Duct Fabrication ($):", min_value=0.0, format="%.2f", step=50.0)
+            duct_installation_cost = st.number_input("Cost of Duct Installation ($):", min_value=0.0, format="%.2f", step=50.0)
 
     elif contractor_type == "Boilermaker":
         st.subheader("Boiler Installation")
@@ -86,34 +264,38 @@ def main():
     contingency = st.slider("Contingency Percentage (%):", min_value=0, max_value=30, value=10, step=1)
 
     if st.button("Calculate Total Cost"):
-        # Calculate material costs
-        total_wire_cost = wire_cost * wire_length
-        total_outlet_cost = num_outlets * cost_per_outlet
-        total_fixture_cost = num_fixtures * cost_per_fixture
-        total_materials = (total_wire_cost + total_outlet_cost + total_fixture_cost + 
-                         panel_cost + conduit_cost + junction_boxes + misc_materials)
+        inputs = {
+            "wire_cost": wire_cost,
+            "wire_length": wire_length,
+            "num_outlets": num_outlets,
+            "cost_per_outlet": cost_per_outlet,
+            "num_fixtures": num_fixtures,
+            "cost_per_fixture": cost_per_fixture,
+            "panel_cost": panel_cost,
+            "conduit_cost": conduit_cost,
+            "junction_boxes": junction_boxes,
+            "misc_materials": misc_materials,
+            "num_technicians": num_technicians,
+            "hours_per_technician": hours_per_technician,
+            "labor_rate": hourly_rate,
+            "permit_cost": permit_cost,
+            "inspection_cost": inspection_cost,
+        }
 
         # Include trade-specific costs
         if contractor_type == "Low Voltage Electrician":
-            total_materials += alarm_system_cost + network_wiring_cost
+            inputs.update(alarm_system_cost=alarm_system_cost, network_wiring_cost=network_wiring_cost)
         elif contractor_type == "Lineworker":
-            total_materials += pole_install_cost + transformer_cost
+            inputs.update(pole_install_cost=pole_install_cost, transformer_cost=transformer_cost)
         elif contractor_type == "HVAC Technician":
-            total_materials += hvac_unit_cost + duct_install_cost
+            inputs.update(hvac_unit_cost=hvac_unit_cost, duct_install_cost=duct_install_cost)
         elif contractor_type == "Sheet Metal Worker":
-            total_materials += duct_fabrication_cost + duct_installation_cost
+            inputs.update(duct_fabrication_cost=duct_fabrication_cost, duct_installation_cost=duct_installation_cost)
         elif contractor_type == "Boilermaker":
-            total_materials += boiler_cost + tank_installation_cost
-
-        # Calculate labor costs
-        total_labor_hours = num_technicians * hours_per_technician
-        total_labor_cost = total_labor_hours * hourly_rate
+            inputs.update(boiler_cost=boiler_cost, tank_installation_cost=tank_installation_cost)
 
-        # Calculate permit and inspection costs
-        total_permit_inspect = permit_cost + inspection_cost
-
-        # Calculate subtotal
-        subtotal = total_materials + total_labor_cost + total_permit_inspect
+        estimate = calculate_estimate(inputs)
+        subtotal = estimate["subtotal"]
 
         # Calculate markup and contingency
         markup_amount = subtotal * (markup_percentage / 100)
@@ -126,5 +308,38 @@ def main():
         st.subheader("Total Estimated Project Cost")
         st.write(f"**Total Project Cost: ${total_cost:,.2f}**")
 
+        # Create summary DataFrame
+        summary = pd.DataFrame({
+            "Parameter": [
+                "Contractor Type",
+                "Project Type",
+                "Service Size",
+                "Number of Technicians",
+                "Total Labor Hours",
+                "Total Materials Cost ($)",
+                "Labor Cost ($)",
+                "Permits and Inspections ($)",
+                "Subtotal ($)",
+                f"Markup ({markup_percentage}%) ($)",
+                f"Contingency ({contingency}%) ($)",
+                "Total Project Cost ($)"
+            ],
+            "Value": [
+                contractor_type,
+                project_type,
+                service_size,
+                num_technicians,
+                estimate["total_labor_hours"],
+                round(estimate["total_materials"], 2),
+                round(estimate["total_labor_cost"], 2),
+                round(estimate["total_permit_inspect"], 2),
+                round(subtotal, 2),
+                round(markup_amount, 2),
+                round(contingency_amount, 2),
+                round(total_cost, 2)
+            ]
+        })
+        st.dataframe(summary, width=700)
+
 if __name__ == "__main__":
     main()
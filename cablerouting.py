@@ -0,0 +1,191 @@
+import heapq
+import math
+
+import numpy as np
+import pandas as pd
+
+# Longest permanent link per cable type in feet; types not listed have no length limit
+CABLE_MAX_FT = {
+    "Cat5e": 295.0,
+    "Cat6": 295.0,
+    "Cat6a": 295.0,
+    "Fiber Optic": 1800.0,
+    "Coaxial": 500.0,
+    "HDMI": 50.0,
+}
+
+NODE_TYPES = ["Closet", "Junction", "Device"]
+
+# Floor-plan nodes, with the value used for new or missing entries
+NODE_COLUMNS = {
+    "Name": "",
+    "Type": "Device",
+    "X (ft)": 0.0,
+    "Y (ft)": 0.0,
+    "Cable": "",
+}
+
+# Pathway segments (tray, conduit, J-hook runs); a blank length is the straight-line distance
+PATHWAY_COLUMNS = {
+    "From": "",
+    "To": "",
+    "Length (ft)": np.nan,
+}
+
+# Devices with no pathway are attached to the nearest closet or junction in chunks of this many distances
+ATTACH_CHUNK = 2_000_000
+
+
+def empty_node_table():
+    """Starter floor-plan nodes for the data editor"""
+    return pd.DataFrame([
+        {"Name": "MDF", "Type": "Closet", "X (ft)": 0.0, "Y (ft)": 0.0, "Cable": ""},
+        {"Name": "J1", "Type": "Junction", "X (ft)": 50.0, "Y (ft)": 0.0, "Cable": ""},
+        {"Name": "Drop 1", "Type": "Device", "X (ft)": 60.0, "Y (ft)": 10.0, "Cable": ""},
+    ])
+
+
+def empty_pathway_table():
+    """Starter pathway segments for the data editor"""
+    return pd.DataFrame([{"From": "MDF", "To": "J1", "Length (ft)": np.nan}])
+
+
+def normalize_nodes(nodes):
+    """Fill missing columns and values; MDF and IDF count as closets"""
+    nodes = nodes.copy()
+    for column, default in NODE_COLUMNS.items():
+        if column not in nodes.columns:
+            nodes[column] = default
+        if isinstance(default, str):
+            nodes[column] = nodes[column].fillna(default).astype(str).str.strip()
+        else:
+            nodes[column] = pd.to_numeric(nodes[column], errors="coerce").fillna(default)
+    node_type = nodes["Type"].str.title().replace({"Mdf": "Closet", "Idf": "Closet"})
+    nodes["Type"] = node_type.where(node_type.isin(NODE_TYPES), "Device")
+    nodes = nodes[nodes["Name"] != ""].drop_duplicates(subset="Name")
+    return nodes[list(NODE_COLUMNS)].reset_index(drop=True)
+
+
+def normalize_pathways(pathways):
+    """Fill missing columns and values so uploaded or edited pathway tables route cleanly"""
+    pathways = pathways.copy()
+    for column, default in PATHWAY_COLUMNS.items():
+        if column not in pathways.columns:
+            pathways[column] = default
+        if isinstance(default, str):
+            pathways[column] = pathways[column].fillna(default).astype(str).str.strip()
+    pathways["Length (ft)"] = pd.to_numeric(pathways["Length (ft)"], errors="coerce").clip(lower=0)
+    return pathways[list(PATHWAY_COLUMNS)].reset_index(drop=True)
+
+
+def _attach_devices(nodes, edges_from, edges_to):
+    # Devices without a pathway hang off the nearest closet or junction by a straight drop
+    device = (nodes["Type"] == "Device").to_numpy()
+    linked = np.zeros(len(nodes), dtype=bool)
+    linked[edges_from] = True
+    linked[edges_to] = True
+    loose = np.flatnonzero(device & ~linked)
+    anchors = np.flatnonzero(~device)
+    if len(loose) == 0 or len(anchors) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0)
+
+    x, y = nodes["X (ft)"].to_numpy(dtype=float), nodes["Y (ft)"].to_numpy(dtype=float)
+    nearest = np.empty(len(loose), dtype=int)
+    distance = np.empty(len(loose))
+    chunk = max(1, ATTACH_CHUNK // len(anchors))
+    for start in range(0, len(loose), chunk):
+        batch = loose[start:start + chunk]
+        d = np.hypot(x[batch, None] - x[anchors], y[batch, None] - y[anchors])
+        best = d.argmin(axis=1)
+        nearest[start:start + chunk] = anchors[best]
+        distance[start:start + chunk] = d[np.arange(len(batch)), best]
+    return loose, nearest, distance
+
+
+def nearest_closets(num_nodes, edges_from, edges_to, lengths, closets):
+    """Multi-source Dijkstra: distance from every node to its nearest closet, and which closet
+
+    All closets start on the heap at distance zero, so one pass labels the whole
+    graph. Unreachable nodes get an infinite distance and closet -1.
+    """
+    adjacency = [[] for _ in range(num_nodes)]
+    for a, b, length in zip(edges_from.tolist(), edges_to.tolist(), lengths.tolist()):
+        adjacency[a].append((b, length))
+        adjacency[b].append((a, length))
+
+    distance = [math.inf] * num_nodes
+    closet = [-1] * num_nodes
+    heap = []
+    for source in closets:
+        distance[source] = 0.0
+        closet[source] = source
+        heap.append((0.0, source))
+    heapq.heapify(heap)
+    while heap:
+        d, node = heapq.heappop(heap)
+        if d > distance[node]:
+            continue
+        for neighbor, length in adjacency[node]:
+            candidate = d + length
+            if candidate < distance[neighbor]:
+                distance[neighbor] = candidate
+                closet[neighbor] = closet[node]
+                heapq.heappush(heap, (candidate, neighbor))
+    return np.array(distance, dtype=float), np.array(closet, dtype=int)
+
+
+def route_cables(nodes, pathways, default_cable, slack_ft=10.0, slack_pct=5.0):
+    """Route every device to its nearest closet and total the cable by type
+
+    Run length is the shortest pathway distance plus slack_pct and a fixed
+    slack_ft for service loops and drops. Runs longer than their cable's
+    limit, or with no pathway to any closet, are flagged as needing another
+    closet. Returns (runs by device, totals by cable type).
+    """
+    run_columns = ["Device", "Cable", "Closet", "Path (ft)", "Run (ft)", "Status"]
+    if nodes.empty:
+        return (pd.DataFrame(columns=run_columns),
+                pd.DataFrame(columns=["Cable", "Runs", "Footage (ft)", "Flagged Runs"]))
+
+    index = pd.Series(np.arange(len(nodes)), index=nodes["Name"])
+    known = pathways["From"].isin(index.index) & pathways["To"].isin(index.index)
+    pathways = pathways[known]
+    edges_from = index[pathways["From"]].to_numpy(dtype=int)
+    edges_to = index[pathways["To"]].to_numpy(dtype=int)
+
+    x, y = nodes["X (ft)"].to_numpy(dtype=float), nodes["Y (ft)"].to_numpy(dtype=float)
+    straight = np.hypot(x[edges_from] - x[edges_to], y[edges_from] - y[edges_to])
+    lengths = pathways["Length (ft)"].fillna(pd.Series(straight, index=pathways.index)).to_numpy(dtype=float)
+
+    loose, anchors, drops = _attach_devices(nodes, edges_from, edges_to)
+    edges_from = np.r_[edges_from, loose].astype(int)
+    edges_to = np.r_[edges_to, anchors].astype(int)
+    lengths = np.r_[lengths, drops]
+
+    closets = np.flatnonzero((nodes["Type"] == "Closet").to_numpy())
+    distance, closet = nearest_closets(len(nodes), edges_from, edges_to, lengths, closets)
+
+    devices = np.flatnonzero((nodes["Type"] == "Device").to_numpy())
+    cable = nodes["Cable"].to_numpy()[devices]
+    cable = np.where(cable == "", default_cable, cable)
+    path = distance[devices]
+    run = path * (1 + slack_pct / 100) + slack_ft
+    limit = pd.Series(cable).map(CABLE_MAX_FT).fillna(np.inf).to_numpy()
+    reachable = np.isfinite(path)
+    status = np.select([~reachable, run > limit], ["No pathway to a closet", "Exceeds cable limit"], "OK")
+
+    closet_names = nodes["Name"].to_numpy()
+    runs = pd.DataFrame({
+        "Device": closet_names[devices],
+        "Cable": cable,
+        "Closet": np.where(reachable, closet_names[np.maximum(closet[devices], 0)], ""),
+        "Path (ft)": np.where(reachable, path, np.nan).round(2),
+        "Run (ft)": np.where(reachable, run, np.nan).round(2),
+        "Status": status,
+    })
+    totals = runs.groupby("Cable", sort=False).agg(
+        Runs=("Device", "size"),
+        **{"Footage (ft)": ("Run (ft)", "sum")},
+        **{"Flagged Runs": ("Status", lambda s: int((s != "OK").sum()))},
+    ).reset_index()
+    return runs, totals
@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
 
+from cutlist import STOCK_LENGTHS, empty_piece_table, normalize_pieces, optimize_cut_list
+from framingtakeoff import compute_framing, empty_wall_table, framing_materials, framing_pieces, normalize_walls
+from pricecatalog import catalog_price
+
 def main():
     st.title("Carpentry Project Cost Estimator")
     st.write("Estimate costs for various carpentry projects with trade-specific details.")
@@ -51,15 +55,50 @@ def main():
             "Select type of wood:",
             ["Pine", "Oak", "Maple", "Walnut", "Plywood"]
         )
-        material_price_per_sqft = st.number_input("Enter the price per square foot of wood ($):", min_value=0.0, format="%.2f", step=0.5)
+        material_price_per_sqft = st.number_input("Enter the price per square foot of wood ($):", min_value=0.0, value=catalog_price("Carpentry", wood_type), format="%.2f", step=0.5)
     elif material_type == "Metal":
         metal_type = st.selectbox(
             "Select type of metal:",
             ["Steel Studs", "Aluminum", "Galvanized Steel"]
         )
-        material_price_per_sqft = st.number_input("Enter the price per square foot of metal ($):", min_value=0.0, format="%.2f", step=0.5)
+        material_price_per_sqft = st.number_input("Enter the price per square foot of metal ($):", min_value=0.0, value=catalog_price("Carpentry", metal_type), format="%.2f", step=0.5)
     else:
-        composite_price = st.number_input("Enter the price per square foot of composite material ($):", min_value=0.0, format="%.2f", step=0.5)
+        material_price_per_sqft = st.number_input("Enter the price per square foot of composite material ($):", min_value=0.0, value=catalog_price("Carpentry", "Composite"), format="%.2f", step=0.5)
+
+    # Framing and trim are priced from a cut list rather than by area
+    pricing_method = st.radio("Material pricing:", ["Area x Price per Sqft", "Cut List Optimizer", "Framing Takeoff"], horizontal=True)
+    if pricing_method == "Cut List Optimizer":
+        st.subheader("Required Pieces")
+        st.write("Upload a CSV of required pieces or edit the table below. Lengths are in inches.")
+        uploaded_file = st.file_uploader("Choose a cut list CSV", type="csv")
+        pieces = empty_piece_table()
+        if uploaded_file is not None:
+            try:
+                pieces = normalize_pieces(pd.read_csv(uploaded_file))
+            except Exception as e:
+                st.error(f"Error reading file: {str(e)}")
+        pieces = normalize_pieces(st.data_editor(pieces, num_rows="dynamic", hide_index=True, use_container_width=True, key="piece_table"))
+    elif pricing_method == "Framing Takeoff":
+        st.subheader("Wall Schedule")
+        st.write("Upload a CSV wall schedule or edit the table below. Openings per wall share one width and height.")
+        uploaded_file = st.file_uploader("Choose a wall schedule CSV", type="csv")
+        walls = empty_wall_table()
+        if uploaded_file is not None:
+            try:
+                walls = normalize_walls(pd.read_csv(uploaded_file))
+            except Exception as e:
+                st.error(f"Error reading file: {str(e)}")
+        walls = normalize_walls(st.data_editor(walls, num_rows="dynamic", hide_index=True, use_container_width=True, key="wall_table"))
+        labor_hours_per_member = st.number_input("Framing labor hours per member:", min_value=0.0, value=0.25, format="%.2f", step=0.05)
+        optimize_stock = st.checkbox("Buy stock lengths with the cut list optimizer")
+
+    use_cut_list = pricing_method == "Cut List Optimizer" or (pricing_method == "Framing Takeoff" and optimize_stock)
+    if pricing_method != "Area x Price per Sqft":
+        price_per_board_foot = st.number_input("Enter the price per board foot ($):", min_value=0.0, value=catalog_price("Carpentry", "Board Foot"), format="%.2f", step=0.05)
+    if use_cut_list:
+        stock_lengths = st.multiselect("Stock lengths available (feet):", STOCK_LENGTHS, default=STOCK_LENGTHS)
+        kerf = st.number_input("Saw kerf (inches):", min_value=0.0, value=0.125, format="%.3f", step=0.0625)
+        exact_mode = pricing_method == "Cut List Optimizer" and st.checkbox("Exact mode (small jobs only, slower)")
 
     # Additional Materials
     st.subheader("Additional Materials")
@@ -75,15 +114,60 @@ def main():
     # Additional Costs
     st.subheader("Additional Costs")
     preparation_cost = st.number_input("Enter preparation costs (sanding, cutting, setup) ($):", min_value=0.0, format="%.2f", step=5.0)
-    waste_factor = st.slider("Select waste factor (%)", min_value=5, max_value=20, value=10, step=1)
+    if not use_cut_list:
+        waste_factor = st.slider("Select waste factor (%)", min_value=5, max_value=20, value=10, step=1)
 
     # Calculate Total Cost
     if st.button("Calculate Total Cost"):
         area_sqft = length * width
-        effective_area_sqft = area_sqft * (1 + waste_factor / 100)
+        if pricing_method == "Area x Price per Sqft":
+            effective_area_sqft = area_sqft * (1 + waste_factor / 100)
+
+            # Calculate material cost
+            material_cost = effective_area_sqft * material_price_per_sqft
+        else:
+            if pricing_method == "Framing Takeoff":
+                takeoff = compute_framing(walls)
+                materials = framing_materials(walls, takeoff)
+                quantity = walls["Quantity"].to_numpy()
+                area_sqft = float((walls["Length (ft)"] * walls["Height (ft)"] * quantity).sum())
+                framing_board_feet = float((takeoff["Board Feet"] * quantity).sum())
+                framing_members = int(materials["Pieces"].sum())
+                framing_hours = framing_members * labor_hours_per_member
+                estimated_hours += framing_hours
+
+                st.subheader("Framing Takeoff")
+                st.write(f"**{framing_members} framing members, {materials['Linear Feet'].sum():.2f} linear feet, "
+                         f"{framing_board_feet:.2f} board feet across {int(quantity.sum())} walls.**")
+                st.dataframe(materials.round(2), use_container_width=True)
+                with st.expander("Takeoff by Wall"):
+                    st.dataframe(pd.concat([walls[["Wall", "Quantity"]], takeoff.round(2)], axis=1), use_container_width=True)
+                if use_cut_list:
+                    pieces = framing_pieces(walls, takeoff)
+
+            effective_area_sqft = area_sqft
+            if use_cut_list:
+                cut_plan = optimize_cut_list(pieces, stock_lengths or STOCK_LENGTHS, kerf=kerf, exact=exact_mode)
+                if cut_plan["too_long"]:
+                    st.warning(f"Longer than the longest stock and left out: {', '.join(cut_plan['too_long'])}")
+                if cut_plan["unproven"]:
+                    st.caption(f"Exact search stopped early for {', '.join(cut_plan['unproven'])}; "
+                               "showing the best plan it found.")
+
+                # Material is bought by the board foot; waste is what the cut plan leaves over
+                material_cost = cut_plan["purchased_board_feet"] * price_per_board_foot
+                waste_factor = round(cut_plan["waste_pct"], 2)
+            else:
+                material_cost = framing_board_feet * (1 + waste_factor / 100) * price_per_board_foot
+
+        if use_cut_list:
+            st.subheader("Cut Plan")
+            st.write(f"**{cut_plan['boards']} boards, {cut_plan['purchased_board_feet']:.2f} board feet purchased "
+                     f"for {cut_plan['used_board_feet']:.2f} board feet of pieces.**")
+            st.dataframe(cut_plan["stock_counts"], width=500)
+            with st.expander("Cut Plan by Board"):
+                st.dataframe(cut_plan["plan"], use_container_width=True)
 
-        # Calculate material cost
-        material_cost = effective_area_sqft * material_price_per_sqft
         total_materials_cost = material_cost + fasteners_cost + adhesive_cost + finish_cost
 
         # Calculate labor cost
@@ -135,6 +219,16 @@ def main():
                 round(total_project_cost, 2)
             ]
         })
+        if pricing_method == "Framing Takeoff":
+            input_summary = pd.concat([input_summary, pd.DataFrame({
+                "Parameter": ["Framing Members", "Framing Board Feet", "Framing Labor Hours"],
+                "Value": [framing_members, round(framing_board_feet, 2), round(framing_hours, 2)],
+            })], ignore_index=True)
+        if use_cut_list:
+            input_summary = pd.concat([input_summary, pd.DataFrame({
+                "Parameter": ["Boards Purchased", "Board Feet Purchased", "Price per Board Foot ($)"],
+                "Value": [cut_plan["boards"], round(cut_plan["purchased_board_feet"], 2), round(price_per_board_foot, 2)],
+            })], ignore_index=True)
 
         # Display project summary
         st.subheader("Project Summary and Detailed Cost Breakdown")
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+from tableflags import parse_flags
+
+# Conductor sizes from smallest to largest, AWG then kcmil
+WIRE_SIZES = ["14", "12", "10", "8", "6", "4", "3", "2", "1", "1/0", "2/0", "3/0", "4/0",
+              "250", "300", "350", "400", "500"]
+
+CONDUCTOR_MATERIALS = ["Copper", "Aluminum"]
+
+# Allowable ampacity at 75°C (NEC 310.16), with the small-conductor limits of 240.4(D) applied;
+# aluminum is not used below 12 AWG
+AMPACITY = {
+    "Copper": np.array([15, 20, 30, 50, 65, 85, 100, 115, 130, 150, 175, 200, 230, 255, 285, 310, 335, 380], dtype=float),
+    "Aluminum": np.array([0, 15, 25, 40, 50, 65, 75, 90, 100, 120, 135, 155, 180, 205, 230, 250, 270, 310], dtype=float),
+}
+
+# Resistance in ohms per 1000 ft (NEC Chapter 9, Table 8, uncoated)
+RESISTANCE = {
+    "Copper": np.array([3.07, 1.93, 1.21, 0.764, 0.491, 0.308, 0.245, 0.194, 0.154, 0.122, 0.0967,
+                        0.0766, 0.0608, 0.0515, 0.0429, 0.0367, 0.0321, 0.0258]),
+    "Aluminum": np.array([np.inf, 3.18, 2.00, 1.26, 0.808, 0.508, 0.403, 0.319, 0.253, 0.201, 0.159,
+                          0.126, 0.100, 0.0847, 0.0707, 0.0605, 0.0529, 0.0424]),
+}
+
+# Standard breaker ratings and the equipment ground each needs (NEC 240.6 and 250.122, copper)
+BREAKER_SIZES = np.array([15, 20, 25, 30, 35, 40, 45, 50, 60, 70, 80, 90, 100, 110, 125, 150, 175, 200,
+                          225, 250, 300, 350, 400, 450, 500, 600], dtype=float)
+GROUND_LIMITS = np.array([15, 20, 60, 100, 200, 300, 400, 500, 600], dtype=float)
+GROUND_SIZES = ["14", "12", "10", "8", "6", "4", "3", "2", "1"]
+
+# Circuits, with the value used for new or missing entries; Length is one way
+CIRCUIT_COLUMNS = {
+    "Circuit": "",
+    "Load (A)": 0.0,
+    "Length (ft)": 0.0,
+    "Voltage": 120.0,
+    "Phase": 1.0,
+    "Material": "Copper",
+    "Continuous": True,
+}
+
+
+def empty_circuit_table(num_circuits=3):
+    """Starter circuit schedule for the data editor"""
+    circuits = pd.DataFrame([CIRCUIT_COLUMNS] * num_circuits)
+    circuits["Circuit"] = [str(i + 1) for i in range(num_circuits)]
+    return circuits
+
+
+def normalize_circuits(circuits):
+    """Fill missing columns and values so uploaded or edited schedules size cleanly"""
+    circuits = circuits.copy()
+    for column, default in CIRCUIT_COLUMNS.items():
+        if column not in circuits.columns:
+            circuits[column] = default
+        if isinstance(default, bool):
+            circuits[column] = parse_flags(circuits[column], default)
+        elif isinstance(default, str):
+            circuits[column] = circuits[column].fillna(default).astype(str).str.strip()
+        else:
+            circuits[column] = pd.to_numeric(circuits[column], errors="coerce").fillna(default).clip(lower=0)
+    material = circuits["Material"].str.title().replace({"Cu": "Copper", "Al": "Aluminum", "Aluminium": "Aluminum"})
+    circuits["Material"] = material.where(material.isin(CONDUCTOR_MATERIALS), "Copper")
+    circuits["Phase"] = np.where(circuits["Phase"] >= 3, 3.0, 1.0)
+    return circuits[list(CIRCUIT_COLUMNS)].reset_index(drop=True)
+
+
+def size_circuits(circuits, max_drop_pct=3.0):
+    """Conductor size, breaker, ground and voltage drop for every circuit in one set of array operations
+
+    Continuous loads are sized at 125%. Each circuit starts at the smallest
+    conductor whose ampacity covers the load, then moves up to the first size
+    whose voltage drop is within max_drop_pct (2 x length for single phase,
+    1.732 x length for three phase). Circuits no size can satisfy get the
+    largest size and are flagged.
+    """
+    load = circuits["Load (A)"].to_numpy(dtype=float)
+    length = circuits["Length (ft)"].to_numpy(dtype=float)
+    voltage = circuits["Voltage"].to_numpy(dtype=float)
+    three_phase = circuits["Phase"].to_numpy(dtype=float) >= 3
+    aluminum = (circuits["Material"] == "Aluminum").to_numpy()
+    design = np.where(circuits["Continuous"].to_numpy(dtype=bool), load * 1.25, load)
+
+    # Every circuit against every size as a (circuits x sizes) matrix
+    ampacity = np.where(aluminum[:, None], AMPACITY["Aluminum"][None, :], AMPACITY["Copper"][None, :])
+    resistance = np.where(aluminum[:, None], RESISTANCE["Aluminum"][None, :], RESISTANCE["Copper"][None, :])
+    path_factor = np.where(three_phase, np.sqrt(3), 2.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drop_pct = np.where(voltage[:, None] > 0,
+                            path_factor[:, None] * length[:, None] * resistance * load[:, None] / 1000 / voltage[:, None] * 100,
+                            np.inf)
+    carries = ampacity >= design[:, None]
+    passes = carries & (drop_pct <= max_drop_pct)
+    found = passes.any(axis=1)
+    minimum = np.where(carries.any(axis=1), carries.argmax(axis=1), len(WIRE_SIZES) - 1)
+    chosen = np.where(found, passes.argmax(axis=1), len(WIRE_SIZES) - 1)
+
+    breaker = BREAKER_SIZES[np.minimum(np.searchsorted(BREAKER_SIZES, design - 1e-9), len(BREAKER_SIZES) - 1)]
+    ground = np.array(GROUND_SIZES)[np.minimum(np.searchsorted(GROUND_LIMITS, breaker - 1e-9), len(GROUND_SIZES) - 1)]
+    status = np.select([~carries.any(axis=1), ~found], ["Exceeds largest conductor", "Voltage drop over limit"], "OK")
+
+    sizes = np.array(WIRE_SIZES)
+    rows = np.arange(len(circuits))
+    return pd.DataFrame({
+        "Circuit": circuits["Circuit"].to_numpy(),
+        "Material": circuits["Material"].to_numpy(),
+        "Design Load (A)": design.round(1),
+        "Breaker (A)": breaker,
+        "Ampacity Size": sizes[minimum],
+        "Size": sizes[chosen],
+        "Upsized": chosen > minimum,
+        "Voltage Drop (%)": drop_pct[rows, chosen].round(2),
+        "Ground": ground,
+        "Conductors": np.where(three_phase, 3, 2),
+        "Wire (ft)": length * np.where(three_phase, 3, 2),
+        "Ground (ft)": length,
+        "Status": status,
+    })
+
+
+def footage_by_gauge(sized):
+    """Total feet of conductor per material and size, grounds included as copper, in size order"""
+    phases = pd.DataFrame({"Material": sized["Material"], "Size": sized["Size"], "Footage (ft)": sized["Wire (ft)"]})
+    grounds = pd.DataFrame({"Material": "Copper", "Size": sized["Ground"], "Footage (ft)": sized["Ground (ft)"]})
+    totals = pd.concat([phases, grounds], ignore_index=True)
+    totals = totals.groupby(["Material", "Size"], as_index=False)["Footage (ft)"].sum()
+    totals["_order"] = totals["Size"].map({size: i for i, size in enumerate(WIRE_SIZES)})
+    totals = totals[totals["Footage (ft)"] > 0].sort_values(["Material", "_order"])
+    return totals.drop(columns="_order").reset_index(drop=True)
@@ -0,0 +1,149 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+import drywallappv7
+import paintingappv1
+import flooringappv1
+import electricalappv2
+import HVACappv1
+from estimatecache import make_key
+
+# Trade models evaluated by the composite estimator
+TRADE_MODELS = {
+    "Drywall": drywallappv7,
+    "Painting": paintingappv1,
+    "Flooring": flooringappv1,
+    "Electrical": electricalappv2,
+    "HVAC": HVACappv1,
+}
+
+# Inputs entered once and passed to every trade model that uses them
+SHARED_INPUTS = {
+    "labor_rate": ("Hourly Labor Rate ($)", 0.0),
+    "waste_factor": ("Waste Factor (%)", 10.0),
+}
+
+PHASES = ["Preparation", "Rough-In", "Installation", "Finish", "Permits"]
+
+
+def model_input(label, default, key):
+    """Number input for one model input; counts (int defaults) take whole numbers"""
+    if isinstance(default, int):
+        return st.number_input(label, min_value=0, value=default, step=1, key=key)
+    return st.number_input(label, min_value=0.0, value=default, format="%.2f", key=key)
+
+
+def evaluate_trades(selected_trades, trade_inputs, shared_inputs, cache):
+    """Return line items per trade, re-evaluating only trades whose own inputs changed"""
+    evaluated = []
+    items_by_trade = {}
+    for trade in selected_trades:
+        model = TRADE_MODELS[trade]
+        model_inputs = {
+            name: shared_inputs[name] if name in shared_inputs else trade_inputs[trade][name]
+            for name in model.MODEL_INPUTS
+        }
+        # The signature covers only the inputs this trade depends on
+        signature = make_key(trade, getattr(model, "FORMULA_VERSION", 1), model_inputs)
+        cached = cache.get(trade)
+        if cached is None or cached[0] != signature:
+            cached = (signature, model.line_items(model_inputs))
+            cache[trade] = cached
+            evaluated.append(trade)
+        items_by_trade[trade] = cached[1]
+    return items_by_trade, evaluated
+
+
+def roll_up(items_by_trade, markup_percentage, contingency):
+    """Price every trade's line items in one vectorized pass and group by trade and phase"""
+    trades = list(items_by_trade)
+    rows = [(trade, *item) for trade in trades for item in items_by_trade[trade]]
+    line_df = pd.DataFrame(rows, columns=["Trade", "Phase", "Item", "Quantity", "Unit Cost ($)"])
+
+    trade_index = line_df["Trade"].map({trade: i for i, trade in enumerate(trades)}).to_numpy(dtype=np.int64)
+    phase_index = line_df["Phase"].map({phase: i for i, phase in enumerate(PHASES)}).to_numpy(dtype=np.int64)
+    quantity = line_df["Quantity"].to_numpy(dtype=float)
+    unit_cost = line_df["Unit Cost ($)"].to_numpy(dtype=float)
+
+    cost = quantity * unit_cost
+    line_df["Cost ($)"] = cost.round(2)
+
+    # Sum each (trade, phase) cell with a single bincount over the flattened index
+    by_phase = np.bincount(
+        trade_index * len(PHASES) + phase_index,
+        weights=cost,
+        minlength=len(trades) * len(PHASES),
+    ).reshape(len(trades), len(PHASES))
+
+    subtotal = by_phase.sum(axis=1)
+    markup_amount = subtotal * (markup_percentage / 100)
+    contingency_amount = subtotal * (contingency / 100)
+
+    breakdown = pd.DataFrame(by_phase, index=trades, columns=PHASES)
+    breakdown["Subtotal ($)"] = subtotal
+    breakdown[f"Markup ({markup_percentage}%) ($)"] = markup_amount
+    breakdown[f"Contingency ({contingency}%) ($)"] = contingency_amount
+    breakdown["Total ($)"] = subtotal + markup_amount + contingency_amount
+    breakdown.loc["Project Total"] = breakdown.sum(axis=0)
+    breakdown.index.name = "Trade"
+    return breakdown.round(2), line_df
+
+
+def main():
+    st.title("Composite Project Cost Estimator")
+    st.write("Estimate drywall, painting, flooring, electrical, and HVAC work together with shared inputs.")
+
+    if "composite_line_items" not in st.session_state:
+        st.session_state.composite_line_items = {}
+
+    # Shared Inputs
+    st.subheader("Shared Inputs")
+    shared_inputs = {
+        name: model_input(label, default, f"shared_{name}")
+        for name, (label, default) in SHARED_INPUTS.items()
+    }
+    markup_percentage = st.slider("Markup Percentage (%):", min_value=0, max_value=50, value=20, step=1)
+    contingency = st.slider("Contingency Percentage (%):", min_value=0, max_value=30, value=10, step=1)
+
+    # Trade Inputs
+    st.subheader("Trades")
+    selected_trades = st.multiselect("Trades in this project:", list(TRADE_MODELS), default=list(TRADE_MODELS))
+
+    trade_inputs = {}
+    for trade in selected_trades:
+        with st.expander(f"{trade} Inputs"):
+            trade_inputs[trade] = {
+                name: model_input(label, default, f"{trade}_{name}")
+                for name, (label, default) in TRADE_MODELS[trade].MODEL_INPUTS.items()
+                if name not in SHARED_INPUTS
+            }
+
+    if not selected_trades:
+        st.info("Select at least one trade to build the estimate.")
+        return
+
+    items_by_trade, evaluated = evaluate_trades(
+        selected_trades, trade_inputs, shared_inputs, st.session_state.composite_line_items
+    )
+    breakdown, line_df = roll_up(items_by_trade, markup_percentage, contingency)
+
+    # Display project summary
+    st.subheader("Cost Breakdown by Trade and Phase")
+    st.dataframe(breakdown, width=900)
+    st.caption(f"Re-evaluated this run: {', '.join(evaluated) if evaluated else 'none (all trades cached)'}")
+
+    with st.expander("Line Item Detail"):
+        st.dataframe(line_df, width=900)
+
+    # Download option
+    csv_output = breakdown.to_csv()
+    st.download_button(
+        label="Download Project Breakdown as CSV",
+        data=csv_output,
+        file_name="composite_project_breakdown.csv",
+        mime="text/csv"
+    )
+
+if __name__ == "__main__":
+    main()
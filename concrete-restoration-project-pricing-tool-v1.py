@@ -1,6 +1,9 @@
 import streamlit as st
 import pandas as pd
 
+from pricecatalog import catalog_price
+from surveygrid import TARGET_SURFACES, read_survey, survey_volume
+
 def main():
     st.title("Concrete Restoration Project Pricing Tool")
     st.write("Enter the details of your concrete restoration project to estimate the total cost.")
@@ -25,13 +28,48 @@ def main():
 
     # Project Scope Inputs
     st.subheader("Project Scope")
-    area_sqft = st.number_input("Area to Restore (Square Feet):", min_value=0, step=10)
-    concrete_volume = st.number_input("Volume of Concrete Needed (Cubic Yards):", min_value=0.0, format="%.2f", step=0.1)
+    scope_method = st.radio("Scope from:", ["Enter Area and Volume", "Elevation Survey"], horizontal=True)
+    if scope_method == "Enter Area and Volume":
+        area_sqft = st.number_input("Area to Restore (Square Feet):", min_value=0, step=10)
+        concrete_volume = st.number_input("Volume of Concrete Needed (Cubic Yards):", min_value=0.0, format="%.2f", step=0.1)
+    else:
+        st.write("Upload survey shots as a CSV of X (ft), Y (ft) and Elevation (ft). "
+                 "Full grids are used directly; scattered shots are interpolated onto a grid.")
+        uploaded_file = st.file_uploader("Choose a survey CSV", type="csv")
+        target_surface = st.selectbox("Target Surface:", TARGET_SURFACES)
+        target_elevation = 0.0
+        slope_x_pct = slope_y_pct = 0.0
+        if target_surface != "Best-Fit Plane":
+            target_elevation = st.number_input("Target Elevation at Survey Origin (ft):", value=0.0, format="%.3f", step=0.01)
+        if target_surface == "Sloped Plane":
+            slope_x_pct = st.number_input("Slope Along X (%):", value=0.0, format="%.2f", step=0.25)
+            slope_y_pct = st.number_input("Slope Along Y (%):", value=0.0, format="%.2f", step=0.25)
+        min_thickness_in = st.number_input("Minimum Overlay Thickness (in):", min_value=0.0, value=0.0, format="%.2f", step=0.125)
+        grid_spacing = st.number_input("Interpolation Grid Spacing (ft):", min_value=0.1, value=1.0, format="%.2f", step=0.5)
+        volume_waste = st.slider("Concrete Waste (%):", min_value=0, max_value=25, value=10, step=1)
+
+        area_sqft = 0.0
+        concrete_volume = 0.0
+        if uploaded_file is not None:
+            try:
+                volume = survey_volume(read_survey(uploaded_file), target_surface, target_elevation, slope_x_pct,
+                                       slope_y_pct, min_thickness_in, grid_spacing)
+                area_sqft = round(volume["area_sqft"], 2)
+                concrete_volume = round(volume["fill_cuyd"] * (1 + volume_waste / 100), 2)
+                source = "interpolated grid" if volume["interpolated"] else "survey grid"
+                st.write(f"**{area_sqft:,.2f} sq ft, {volume['fill_cuyd']:.2f} cubic yards of fill "
+                         f"({concrete_volume:.2f} with waste) from a {volume['grid_points']}-point {source}.**")
+                st.write(f"Average depth {volume['average_depth_in']:.2f} in, maximum {volume['max_depth_in']:.2f} in, "
+                         f"high spots to grind {volume['cut_cuyd']:.2f} cubic yards.")
+                if volume["plane_raise_in"] > 0:
+                    st.info(f"Target plane raised {volume['plane_raise_in']:.2f} in to keep the minimum overlay thickness.")
+            except Exception as e:
+                st.error(f"Error reading survey: {str(e)}")
 
     # Material Inputs
     st.subheader("Materials")
-    overlay_cost_per_sqft = st.number_input("Cost per Sqft of Overlay/Resurfacing Material ($):", min_value=0.0, format="%.2f", step=0.1)
-    concrete_cost_per_cubic_yard = st.number_input("Cost per Cubic Yard of Concrete ($):", min_value=0.0, format="%.2f", step=10.0)
+    overlay_cost_per_sqft = st.number_input("Cost per Sqft of Overlay/Resurfacing Material ($):", min_value=0.0, value=catalog_price("Concrete Restoration", "Overlay"), format="%.2f", step=0.1)
+    concrete_cost_per_cubic_yard = st.number_input("Cost per Cubic Yard of Concrete ($):", min_value=0.0, value=catalog_price("Concrete Restoration", "Concrete"), format="%.2f", step=10.0)
     sealant_cost = st.number_input("Cost of Sealant/Waterproofing Materials ($):", min_value=0.0, format="%.2f", step=5.0)
     repair_materials_cost = st.number_input("Cost of Repair Materials (Epoxy, Patches, etc.) ($):", min_value=0.0, format="%.2f", step=5.0)
     reinforcement_cost = st.number_input("Cost of Reinforcement Materials (Rebar, Carbon Fiber) ($):", min_value=0.0, format="%.2f", step=10.0)
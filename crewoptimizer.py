@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+# Hours per day paid at the regular rate before overtime applies
+REGULAR_HOURS_PER_DAY = 8.0
+
+
+def optimize_crew(total_labor_hours, deadline_days, lead_rate, helper_rate=0.0,
+                  equipment_cost_per_day=0.0, shift_hours=(8.0,), min_leads=1, max_leads=20,
+                  max_helpers=0, max_helpers_per_lead=2.0, helper_productivity=0.5,
+                  overtime_multiplier=1.5):
+    """Score every lead/helper/shift combination and return feasible crews, cheapest first"""
+    # Candidate grid: leads along axis 0, helpers along axis 1, shift length along axis 2
+    leads = np.arange(min_leads, max_leads + 1, dtype=float)[:, None, None]
+    helpers = np.arange(0, max_helpers + 1, dtype=float)[None, :, None]
+    hours = np.asarray(shift_hours, dtype=float)[None, None, :]
+
+    # Helpers count toward output at a fraction of a lead's productivity
+    daily_output = hours * (leads + helper_productivity * helpers)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days = np.ceil(total_labor_hours / daily_output)
+    days = np.where(daily_output > 0, days, np.inf)
+
+    # Every worker is paid for full days on site, with overtime past the regular shift
+    regular = np.minimum(hours, REGULAR_HOURS_PER_DAY)
+    overtime = np.maximum(hours - REGULAR_HOURS_PER_DAY, 0.0)
+    paid_hours_per_day = regular + overtime * overtime_multiplier
+    labor_cost = days * paid_hours_per_day * (leads * lead_rate + helpers * helper_rate)
+    equipment_cost = days * equipment_cost_per_day
+    total_cost = labor_cost + equipment_cost
+
+    feasible = (days <= deadline_days) & (helpers <= leads * max_helpers_per_lead)
+
+    shape = np.broadcast_shapes(leads.shape, helpers.shape, hours.shape)
+    crews = pd.DataFrame({
+        "Leads": np.broadcast_to(leads, shape)[feasible].astype(int),
+        "Helpers": np.broadcast_to(helpers, shape)[feasible].astype(int),
+        "Hours per Day": np.broadcast_to(hours, shape)[feasible],
+        "Days": days[feasible].astype(int),
+        "Worked Hours per Worker": (days * hours)[feasible],
+        "Paid Hours per Worker": (days * paid_hours_per_day)[feasible],
+        "Labor Cost ($)": labor_cost[feasible].round(2),
+        "Equipment Cost ($)": equipment_cost[feasible].round(2),
+        "Total Cost ($)": total_cost[feasible].round(2),
+    })
+    return crews.sort_values(["Total Cost ($)", "Days"], kind="stable").reset_index(drop=True)
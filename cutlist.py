@@ -0,0 +1,203 @@
+import bisect
+import math
+import re
+from functools import reduce
+
+import pandas as pd
+
+# Stock lengths offered by the estimator, in feet
+STOCK_LENGTHS = [8, 10, 12, 16]
+
+# Largest job solved exactly; bigger jobs use the best-fit-decreasing heuristic
+EXACT_MAX_PIECES = 16
+
+# Search nodes the exact solver may visit before settling for the best plan found so far
+EXACT_NODE_BUDGET = 200000
+
+# Columns of the required-pieces table, with the value used for new or missing entries
+PIECE_COLUMNS = {
+    "Description": "",
+    "Nominal Size": "2x4",
+    "Length (in)": 0.0,
+    "Quantity": 1,
+}
+
+
+def empty_piece_table(num_pieces=4):
+    """Starter pieces table for the data editor"""
+    pieces = pd.DataFrame([PIECE_COLUMNS] * num_pieces)
+    pieces["Description"] = [f"Piece {i + 1}" for i in range(num_pieces)]
+    return pieces
+
+
+def normalize_pieces(pieces):
+    """Fill missing columns and values so uploaded or edited tables solve cleanly"""
+    pieces = pieces.copy()
+    for column, default in PIECE_COLUMNS.items():
+        if column not in pieces.columns:
+            pieces[column] = default
+        if isinstance(default, str):
+            pieces[column] = pieces[column].fillna(default).astype(str).str.strip()
+        else:
+            pieces[column] = pd.to_numeric(pieces[column], errors="coerce").fillna(default).clip(lower=0)
+    pieces["Quantity"] = pieces["Quantity"].astype(int)
+    return pieces[list(PIECE_COLUMNS)].reset_index(drop=True)
+
+
+def board_feet(nominal_size, length_ft):
+    """Board feet of a nominal size such as '2x4' at the given length"""
+    match = re.match(r"\s*(\d+(?:\.\d+)?)\s*[xX]\s*(\d+(?:\.\d+)?)", nominal_size)
+    if not match:
+        return 0.0
+    thickness, width = float(match.group(1)), float(match.group(2))
+    return thickness * width * length_ft / 12
+
+
+def _smallest_stock(load, stock_inches):
+    i = bisect.bisect_left(stock_inches, load - 1e-9)
+    return stock_inches[i] if i < len(stock_inches) else None
+
+
+def _best_fit_decreasing(lengths, stock_inches, kerf):
+    # Open boards at the longest stock and keep them in a list sorted by remaining length
+    longest = stock_inches[-1]
+    boards = []
+    remaining = []
+    for length in sorted(lengths, reverse=True):
+        need = length + kerf
+        i = bisect.bisect_left(remaining, (need - 1e-9, -1))
+        if i < len(remaining):
+            capacity, board = remaining.pop(i)
+        else:
+            board = len(boards)
+            boards.append([])
+            capacity = longest + kerf
+        boards[board].append(length)
+        bisect.insort(remaining, (capacity - need, board))
+    return boards
+
+
+def _purchase(boards, stock_inches, kerf):
+    # Stock bought for a plan: the shortest length holding each board's cuts and kerfs
+    return sum(_smallest_stock(sum(board) + kerf * (len(board) - 1), stock_inches) for board in boards)
+
+
+def _exact(lengths, stock_inches, kerf, node_budget=EXACT_NODE_BUDGET):
+    """Cheapest board assignment by branch and bound, as (boards, proven optimal)
+
+    The search starts from the best-fit-decreasing plan and prunes any branch
+    whose bought stock plus the remaining pieces, less the slack left on the
+    boards already open, cannot beat it. Past node_budget nodes it stops and
+    returns the best plan found, which is never worse than the heuristic.
+    """
+    lengths = sorted(lengths, reverse=True)
+    longest = stock_inches[-1]
+    heuristic = _best_fit_decreasing(lengths, stock_inches, kerf)
+    best = {"cost": _purchase(heuristic, stock_inches, kerf), "boards": heuristic}
+    # Piece length still to place after each index
+    remaining = [sum(lengths[index:]) for index in range(len(lengths) + 1)]
+    # Stock is bought in steps of the lengths' common divisor, so shortfalls round up to a whole step
+    step = reduce(math.gcd, [int(round(stock)) for stock in stock_inches])
+    if any(abs(stock - round(stock)) > 1e-9 for stock in stock_inches):
+        step = 0
+    nodes = [0]
+
+    def search(index, loads, boards):
+        nodes[0] += 1
+        if nodes[0] > node_budget:
+            return
+        stock = [_smallest_stock(load - kerf, stock_inches) for load in loads]
+        cost = sum(stock)
+        if index == len(lengths):
+            if cost < best["cost"] - 1e-9:
+                best["cost"] = cost
+                best["boards"] = [list(board) for board in boards]
+            return
+        # Pieces not yet placed fill the open boards' slack first, then need stock of their own
+        slack = sum(stock) - sum(loads) + kerf * len(loads)
+        shortfall = max(remaining[index] - slack, 0.0)
+        if step:
+            shortfall = math.ceil(shortfall / step - 1e-9) * step
+        if cost + shortfall >= best["cost"] - 1e-9:
+            return
+        need = lengths[index] + kerf
+        tried = set()
+        for i, load in enumerate(loads):
+            if load + need <= longest + kerf + 1e-9 and load not in tried:
+                tried.add(load)
+                loads[i] += need
+                boards[i].append(lengths[index])
+                search(index + 1, loads, boards)
+                boards[i].pop()
+                loads[i] -= need
+        loads.append(need)
+        boards.append([lengths[index]])
+        search(index + 1, loads, boards)
+        boards.pop()
+        loads.pop()
+
+    search(0, [], [])
+    return best["boards"], nodes[0] <= node_budget
+
+
+def optimize_cut_list(pieces, stock_lengths=STOCK_LENGTHS, kerf=0.125, exact=False):
+    """Assign required pieces to stock boards and return the cut plan and totals
+
+    Lengths in the pieces table are inches and stock lengths are feet. Returns
+    a dict with the cut plan, stock counts and board feet purchased and used;
+    unproven lists the sizes whose exact search ran out of its node budget.
+    """
+    stock_inches = sorted(float(length) * 12 for length in stock_lengths)
+    plan_rows = []
+    too_long = []
+    unproven = []
+    used_board_feet = 0.0
+
+    for nominal_size, group in pieces[pieces["Quantity"] > 0].groupby("Nominal Size", sort=True):
+        lengths = []
+        for length, quantity, description in zip(group["Length (in)"], group["Quantity"], group["Description"]):
+            if length <= 0:
+                continue
+            if length > stock_inches[-1]:
+                too_long.append(description)
+                continue
+            lengths.extend([float(length)] * int(quantity))
+            used_board_feet += board_feet(nominal_size, length / 12) * quantity
+        if not lengths:
+            continue
+
+        if exact and len(lengths) <= EXACT_MAX_PIECES:
+            boards, proven = _exact(lengths, stock_inches, kerf)
+            if not proven:
+                unproven.append(nominal_size)
+        else:
+            boards = _best_fit_decreasing(lengths, stock_inches, kerf)
+
+        for board in boards:
+            # Buy the shortest stock length that still holds this board's cuts
+            load = sum(board) + kerf * (len(board) - 1)
+            stock = _smallest_stock(load, stock_inches)
+            plan_rows.append({
+                "Nominal Size": nominal_size,
+                "Stock Length (ft)": stock / 12,
+                "Cuts (in)": ", ".join(f"{length:g}" for length in board),
+                "Offcut (in)": round(stock - load, 2),
+                "Board Feet": board_feet(nominal_size, stock / 12),
+            })
+
+    plan = pd.DataFrame(plan_rows, columns=["Nominal Size", "Stock Length (ft)", "Cuts (in)", "Offcut (in)", "Board Feet"])
+    stock_counts = (
+        plan.groupby(["Nominal Size", "Stock Length (ft)"]).size().rename("Boards").reset_index()
+        if len(plan) else pd.DataFrame(columns=["Nominal Size", "Stock Length (ft)", "Boards"])
+    )
+    purchased_board_feet = float(plan["Board Feet"].sum()) if len(plan) else 0.0
+    return {
+        "plan": plan,
+        "stock_counts": stock_counts,
+        "boards": len(plan),
+        "purchased_board_feet": purchased_board_feet,
+        "used_board_feet": used_board_feet,
+        "waste_pct": (purchased_board_feet - used_board_feet) / used_board_feet * 100 if used_board_feet else 0.0,
+        "too_long": too_long,
+        "unproven": unproven,
+    }
@@ -0,0 +1,124 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# Methods able to locate each utility type
+DETECTION_METHODS = {
+    "Gas Lines": ["Electromagnetic", "Ground Penetrating Radar (GPR)", "Acoustic Detection"],
+    "Water Lines": ["Electromagnetic", "Acoustic Detection", "Ground Penetrating Radar (GPR)"],
+    "Sewer Lines": ["Ground Penetrating Radar (GPR)", "Electromagnetic", "Acoustic Detection"],
+    "Electric Cables": ["Electromagnetic", "Induction Locators"],
+    "Telecom Cables": ["Electromagnetic", "Ground Penetrating Radar (GPR)"],
+    "Fiber Optic Cables": ["Electromagnetic", "Ground Penetrating Radar (GPR)"],
+    "Oil Pipelines": ["Electromagnetic", "Ground Penetrating Radar (GPR)", "Magnetic Locator"],
+}
+
+# Equipment day rate and square feet one crew sweeps per day, with the value used for missing entries
+METHOD_COLUMNS = {
+    "Method": "",
+    "Equipment per Day ($)": 0.0,
+    "Sq Ft per Crew Day": 20000.0,
+}
+
+DEFAULT_METHOD_RATES = {
+    "Electromagnetic": (150.0, 40000.0),
+    "Ground Penetrating Radar (GPR)": (350.0, 15000.0),
+    "Acoustic Detection": (200.0, 20000.0),
+    "Induction Locators": (120.0, 45000.0),
+    "Magnetic Locator": (100.0, 30000.0),
+}
+
+
+def default_method_table():
+    """Starter method rates for the data editor"""
+    return pd.DataFrame([
+        {"Method": method, "Equipment per Day ($)": rate, "Sq Ft per Crew Day": productivity}
+        for method, (rate, productivity) in DEFAULT_METHOD_RATES.items()
+    ])
+
+
+def normalize_methods(methods):
+    """Fill missing columns and values so edited rate tables score cleanly"""
+    methods = methods.copy()
+    for column, default in METHOD_COLUMNS.items():
+        if column not in methods.columns:
+            methods[column] = default
+        if isinstance(default, str):
+            methods[column] = methods[column].fillna(default).astype(str).str.strip()
+        else:
+            methods[column] = pd.to_numeric(methods[column], errors="coerce").fillna(default).clip(lower=0)
+    methods = methods[methods["Method"] != ""].drop_duplicates(subset="Method")
+    return methods[list(METHOD_COLUMNS)].reset_index(drop=True)
+
+
+def method_costs(methods, area_sqft, crew_cost_per_day):
+    """Sweep days and cost of running each method over the whole site"""
+    productivity = methods["Sq Ft per Crew Day"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore"):
+        days = np.where(productivity > 0, np.ceil(area_sqft / productivity - 1e-9), np.inf)
+    days = np.maximum(days, 0.0)
+    cost = days * (methods["Equipment per Day ($)"].to_numpy(dtype=float) + crew_cost_per_day)
+    return days, np.where(np.isfinite(cost), cost, np.inf)
+
+
+def combination_costs(utilities, methods, area_sqft, crew_cost_per_day, detection_methods=DETECTION_METHODS):
+    """Cost of locating each utility with each method on its own, blank where the method cannot find it
+
+    Infinite where a method can find the utility but has no sweep rate.
+    """
+    days, cost = method_costs(methods, area_sqft, crew_cost_per_day)
+    names = methods["Method"].tolist()
+    able = np.array([[name in detection_methods.get(utility, []) for name in names] for utility in utilities],
+                    dtype=bool).reshape(len(utilities), len(names))
+    return pd.DataFrame(np.where(able, cost[None, :], np.nan), index=utilities, columns=names)
+
+
+def plan_detection(utilities, methods, area_sqft, crew_cost_per_day, detection_methods=DETECTION_METHODS):
+    """Cheapest set of methods that locates every selected utility
+
+    One sweep of a method covers every utility it can detect, so the search is
+    over sets of methods rather than per-utility choices: every subset is a row
+    of a boolean matrix, coverage and cost are matrix products, and the number
+    of utilities only adds columns. Ties go to the plan with fewer methods.
+    Returns (plan by utility, ranked feasible method sets); both are empty when
+    some utility has no usable method.
+    """
+    methods = methods.reset_index(drop=True)
+    names = methods["Method"].to_numpy()
+    days, cost = method_costs(methods, area_sqft, crew_cost_per_day)
+    able = combination_costs(utilities, methods, area_sqft, crew_cost_per_day, detection_methods).notna().to_numpy()
+
+    plan_columns = ["Utility", "Method", "Days", "Method Cost ($)"]
+    ranked_columns = ["Methods", "Days", "Cost ($)"]
+    usable = np.isfinite(cost)
+    if not utilities or not (able & usable[None, :]).any(axis=1).all():
+        return pd.DataFrame(columns=plan_columns), pd.DataFrame(columns=ranked_columns)
+
+    # Only methods that find at least one selected utility are worth enumerating
+    candidates = np.flatnonzero(able.any(axis=0) & usable)
+    subsets = np.array(list(itertools.product([False, True], repeat=len(candidates))), dtype=bool)[1:]
+    covered = (subsets.astype(int) @ able[:, candidates].T.astype(int)) > 0
+    feasible = covered.all(axis=1)
+    subsets = subsets[feasible]
+    subset_cost = subsets @ cost[candidates]
+    subset_days = subsets @ days[candidates]
+    order = np.lexsort((subsets.sum(axis=1), subset_cost))
+
+    ranked = pd.DataFrame({
+        "Methods": [", ".join(names[candidates[row]]) for row in subsets[order]],
+        "Days": subset_days[order],
+        "Cost ($)": subset_cost[order].round(2),
+    })
+
+    # Each utility is swept by the cheapest chosen method that can find it
+    chosen = candidates[subsets[order[0]]]
+    utility_cost = np.where(able[:, chosen], cost[chosen][None, :], np.inf)
+    assigned = chosen[utility_cost.argmin(axis=1)]
+    plan = pd.DataFrame({
+        "Utility": list(utilities),
+        "Method": names[assigned],
+        "Days": days[assigned],
+        "Method Cost ($)": cost[assigned].round(2),
+    })
+    return plan, ranked
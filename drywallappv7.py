@@ -1,15 +1,200 @@
 import streamlit as st
 import pandas as pd
 
+from drywallcutting import SHEET_SIZES, empty_surface_table, normalize_surfaces, plan_project
+from estimatecache import ESTIMATE_CACHE, cached_estimate
+from pricecatalog import catalog_price
+
+# Bump whenever the calculation below changes so cached estimates are not reused
+FORMULA_VERSION = 2
+
+
+def calculate_estimate(inputs):
+    """Compute the drywall cost breakdown and summary table for a set of inputs
+
+    The breakdown's lines are (phase, item, quantity, unit cost) and are what
+    the composite estimator prices.
+    """
+    price_per_sheet = inputs["price_per_sheet"]
+    num_of_sheets = inputs["num_of_sheets"]
+    num_of_cuts = inputs["num_of_cuts"]
+    hours_of_labor = inputs["hours_of_labor"]
+    labor_rate = inputs["labor_rate"]
+    screw_cost = inputs["screw_cost"]
+    tape_mud_cost = inputs["tape_mud_cost"]
+    drywall_tape_cost = inputs["drywall_tape_cost"]
+    primer_paint_cost = inputs["primer_paint_cost"]
+    floor_prep_cost = inputs["floor_prep_cost"]
+    waste_factor = inputs["waste_factor"]
+
+    # Calculate the effective number of sheets accounting for waste
+    effective_num_of_sheets = num_of_sheets * (1 + waste_factor / 100)
+
+    # Calculate material costs
+    total_material_cost = price_per_sheet * effective_num_of_sheets
+    total_screw_cost = screw_cost * effective_num_of_sheets
+    total_tape_mud_cost = tape_mud_cost * effective_num_of_sheets
+    total_drywall_tape_cost = drywall_tape_cost * effective_num_of_sheets
+    total_paint_cost = primer_paint_cost * effective_num_of_sheets
+
+    # Total installation costs (includes all additional materials)
+    total_installation_materials = (total_screw_cost +
+                                    total_tape_mud_cost +
+                                    total_drywall_tape_cost +
+                                    total_paint_cost +
+                                    floor_prep_cost)
+
+    # Calculate labor costs
+    total_labor_cost = hours_of_labor * labor_rate
+
+    # Calculate the total project cost
+    total_cost = total_material_cost + total_installation_materials + total_labor_cost
+
+    breakdown = {
+        "effective_num_of_sheets": effective_num_of_sheets,
+        "total_material_cost": total_material_cost,
+        "total_screw_cost": total_screw_cost,
+        "total_tape_mud_cost": total_tape_mud_cost,
+        "total_drywall_tape_cost": total_drywall_tape_cost,
+        "total_paint_cost": total_paint_cost,
+        "total_installation_materials": total_installation_materials,
+        "total_labor_cost": total_labor_cost,
+        "total_cost": total_cost,
+        "lines": [
+            ("Preparation", "Floor/Room Prep Materials", 1, floor_prep_cost),
+            ("Installation", "Drywall Sheets", effective_num_of_sheets, price_per_sheet),
+            ("Installation", "Screws/Nails", effective_num_of_sheets, screw_cost),
+            ("Installation", "Drywall Labor (hours)", hours_of_labor, labor_rate),
+            ("Finish", "Joint Compound", effective_num_of_sheets, tape_mud_cost),
+            ("Finish", "Drywall Tape", effective_num_of_sheets, drywall_tape_cost),
+            ("Finish", "Primer and Paint", effective_num_of_sheets, primer_paint_cost),
+        ],
+    }
+
+    # Create a DataFrame to store user inputs and calculated values
+    input_summary = pd.DataFrame({
+        "Parameter": [
+            "Price per Drywall Sheet ($)",
+            "Number of Drywall Sheets (with waste factor)",
+            "Number of Cuts Required",
+            "Hours of Labor Required",
+            "Hourly Labor Rate ($)",
+            "Cost of Screws/Nails per Sheet ($)",
+            "Cost of Joint Compound (Mud) per Sheet ($)",
+            "Cost of Drywall Tape per Sheet ($)",
+            "Cost of Primer and Paint per Sheet ($)",
+            "Floor/Room Prep Materials Cost ($)",
+            "Waste Factor (%)",
+            "Total Material Cost ($)",
+            "Total Screw/Nail Cost ($)",
+            "Total Joint Compound Cost ($)",
+            "Total Drywall Tape Cost ($)",
+            "Total Primer and Paint Cost ($)",
+            "Total Floor/Room Prep Cost ($)",
+            "Total Installation Material Cost ($)",
+            "Total Labor Cost ($)",
+            "Estimated Total Project Cost ($)"
+        ],
+        "Value": [
+            round(price_per_sheet, 2),
+            round(effective_num_of_sheets, 2),
+            num_of_cuts,
+            round(hours_of_labor, 2),
+            round(labor_rate, 2),
+            round(screw_cost, 2),
+            round(tape_mud_cost, 2),
+            round(drywall_tape_cost, 2),
+            round(primer_paint_cost, 2),
+            round(floor_prep_cost, 2),
+            waste_factor,
+            round(total_material_cost, 2),
+            round(total_screw_cost, 2),
+            round(total_tape_mud_cost, 2),
+            round(total_drywall_tape_cost, 2),
+            round(total_paint_cost, 2),
+            round(floor_prep_cost, 2),
+            round(total_installation_materials, 2),
+            round(total_labor_cost, 2),
+            round(total_cost, 2)
+        ]
+    })
+
+    return breakdown, input_summary
+
+
+# Inputs the composite project estimator collects for line_items()
+MODEL_INPUTS = {
+    "price_per_sheet": ("Price per Drywall Sheet ($)", 0.0),
+    "num_of_sheets": ("Number of Drywall Sheets", 0),
+    "num_of_cuts": ("Number of Cuts Required", 0),
+    "hours_of_labor": ("Hours of Labor", 0.0),
+    "labor_rate": ("Hourly Labor Rate ($)", 0.0),
+    "screw_cost": ("Screws/Nails per Sheet ($)", 0.0),
+    "tape_mud_cost": ("Joint Compound per Sheet ($)", 0.0),
+    "drywall_tape_cost": ("Drywall Tape per Sheet ($)", 0.0),
+    "primer_paint_cost": ("Primer and Paint per Sheet ($)", 0.0),
+    "floor_prep_cost": ("Floor/Room Prep Materials ($)", 0.0),
+    "waste_factor": ("Waste Factor (%)", 10.0),
+}
+
+
+def line_items(inputs):
+    """Cost lines as (phase, item, quantity, unit cost) for the composite estimator"""
+    return calculate_estimate(inputs)[0]["lines"]
+
+
+def sheet_optimizer_takeoff():
+    """Surface table, sheet sizes and prices for the Sheet Optimizer; returns (price per sheet, sheets, cuts)"""
+    st.subheader("Walls and Ceilings")
+    st.write("Upload a CSV with one row per wall or ceiling or edit the table below. "
+             "Identical surfaces are laid out once and offcuts are shared across the whole project.")
+    uploaded_file = st.file_uploader("Choose a surface table CSV", type="csv")
+    surfaces = empty_surface_table()
+    if uploaded_file is not None:
+        try:
+            surfaces = normalize_surfaces(pd.read_csv(uploaded_file))
+        except Exception as e:
+            st.error(f"Error reading file: {str(e)}")
+    surfaces = normalize_surfaces(st.data_editor(surfaces, num_rows="dynamic", hide_index=True, use_container_width=True, key="surface_table"))
+
+    sheet_sizes = st.multiselect("Sheet sizes to use:", list(SHEET_SIZES), default=["4x8", "4x12"])
+    sheet_prices = {
+        name: st.number_input(f"Enter the price per {name} sheet ($):", min_value=0.0, value=catalog_price("Drywall", f"Drywall Sheet {name}"), format="%.2f", step=0.5)
+        for name in sheet_sizes
+    }
+
+    sheet_plan = plan_project(surfaces, sheet_sizes or ["4x8"])
+    num_of_sheets = sheet_plan["total_sheets"]
+    num_of_cuts = sheet_plan["cuts"]
+    # Average sheet price so the per-sheet cost lines stay unchanged
+    sheet_cost = sum(count * sheet_prices.get(name, 0.0) for name, count in sheet_plan["sheets"].items())
+    price_per_sheet = sheet_cost / num_of_sheets if num_of_sheets else 0.0
+
+    sheet_counts = ", ".join(f"{count} x {name}" for name, count in sheet_plan["sheets"].items()) or "none"
+    st.write(f"**Sheets: {sheet_counts} ({num_of_sheets} total), {num_of_cuts} cuts, "
+             f"{sheet_plan['offcuts_reused']} pieces cut from offcuts. "
+             f"{sheet_plan['net_area']:,.1f} sq ft hung after {sheet_plan['cutout_area']:,.1f} sq ft of openings.**")
+    with st.expander("Cut List"):
+        st.dataframe(sheet_plan["cut_list"], use_container_width=True)
+    return price_per_sheet, num_of_sheets, num_of_cuts
+
+
 # Main function for the Streamlit application
 def main():
     st.title("Comprehensive Drywall Project Cost Estimator")
     st.write("Enter the details of your drywall project below to get an estimated cost.")
 
+    # Sheet takeoff: typed counts or computed from wall and ceiling dimensions
+    takeoff_mode = st.radio("Sheet takeoff:", ["Enter Sheets and Cuts", "Sheet Optimizer"], horizontal=True)
+
     # User Inputs
-    price_per_sheet = st.number_input("Enter the price per drywall sheet ($):", min_value=0.0, format="%.2f", step=0.5)
-    num_of_sheets = st.number_input("Enter the number of drywall sheets:", min_value=0, step=1)
-    num_of_cuts = st.number_input("Enter the number of cuts required:", min_value=0, step=1)
+    if takeoff_mode == "Enter Sheets and Cuts":
+        price_per_sheet = st.number_input("Enter the price per drywall sheet ($):", min_value=0.0, value=catalog_price("Drywall", "Drywall Sheet"), format="%.2f", step=0.5)
+        num_of_sheets = st.number_input("Enter the number of drywall sheets:", min_value=0, step=1)
+        num_of_cuts = st.number_input("Enter the number of cuts required:", min_value=0, step=1)
+    else:
+        price_per_sheet, num_of_sheets, num_of_cuts = sheet_optimizer_takeoff()
+
     hours_of_labor = st.number_input("Enter the hours of labor required:", min_value=0.0, format="%.2f", step=0.5)
     labor_rate = st.number_input("Enter the hourly labor rate ($):", min_value=0.0, format="%.2f", step=0.5)
 
@@ -19,93 +204,46 @@ def main():
     drywall_tape_cost = st.number_input("Enter the cost of drywall tape per sheet ($):", min_value=0.0, format="%.2f", step=0.5)
     primer_paint_cost = st.number_input("Enter the cost of primer and paint per sheet ($):", min_value=0.0, format="%.2f", step=0.5)
     floor_prep_cost = st.number_input("Enter the cost of floor/room prep materials (e.g., drop cloths, tape) ($):", min_value=0.0, format="%.2f", step=0.5)
-    waste_factor = st.slider("Select the waste factor (%)", min_value=0, max_value=20, value=10, step=1)
+    if takeoff_mode == "Enter Sheets and Cuts":
+        waste_factor = st.slider("Select the waste factor (%)", min_value=0, max_value=20, value=10, step=1)
+    else:
+        # The optimizer's sheet count already includes every offcut
+        waste_factor = 0
 
     # Button to calculate the cost
     if st.button("Calculate Total Cost"):
-        # Calculate the effective number of sheets accounting for waste
-        effective_num_of_sheets = num_of_sheets * (1 + waste_factor / 100)
-
-        # Calculate material costs
-        total_material_cost = price_per_sheet * effective_num_of_sheets
-        total_screw_cost = screw_cost * effective_num_of_sheets
-        total_tape_mud_cost = tape_mud_cost * effective_num_of_sheets
-        total_drywall_tape_cost = drywall_tape_cost * effective_num_of_sheets
-        total_paint_cost = primer_paint_cost * effective_num_of_sheets
-
-        # Total installation costs (includes all additional materials)
-        total_installation_materials = (total_screw_cost + 
-                                        total_tape_mud_cost + 
-                                        total_drywall_tape_cost + 
-                                        total_paint_cost + 
-                                        floor_prep_cost)
-
-        # Calculate labor costs
-        total_labor_cost = hours_of_labor * labor_rate
-
-        # Calculate the total project cost
-        total_cost = total_material_cost + total_installation_materials + total_labor_cost
-
-        # Create a DataFrame to store user inputs and calculated values
-        input_summary = pd.DataFrame({
-            "Parameter": [
-                "Price per Drywall Sheet ($)",
-                "Number of Drywall Sheets (with waste factor)",
-                "Number of Cuts Required",
-                "Hours of Labor Required",
-                "Hourly Labor Rate ($)",
-                "Cost of Screws/Nails per Sheet ($)",
-                "Cost of Joint Compound (Mud) per Sheet ($)",
-                "Cost of Drywall Tape per Sheet ($)",
-                "Cost of Primer and Paint per Sheet ($)",
-                "Floor/Room Prep Materials Cost ($)",
-                "Waste Factor (%)",
-                "Total Material Cost ($)",
-                "Total Screw/Nail Cost ($)",
-                "Total Joint Compound Cost ($)",
-                "Total Drywall Tape Cost ($)",
-                "Total Primer and Paint Cost ($)",
-                "Total Floor/Room Prep Cost ($)",
-                "Total Installation Material Cost ($)",
-                "Total Labor Cost ($)",
-                "Estimated Total Project Cost ($)"
-            ],
-            "Value": [
-                round(price_per_sheet, 2),
-                round(effective_num_of_sheets, 2),
-                num_of_cuts,
-                round(hours_of_labor, 2),
-                round(labor_rate, 2),
-                round(screw_cost, 2),
-                round(tape_mud_cost, 2),
-                round(drywall_tape_cost, 2),
-                round(primer_paint_cost, 2),
-                round(floor_prep_cost, 2),
-                waste_factor,
-                round(total_material_cost, 2),
-                round(total_screw_cost, 2),
-                round(total_tape_mud_cost, 2),
-                round(total_drywall_tape_cost, 2),
-                round(total_paint_cost, 2),
-                round(floor_prep_cost, 2),
-                round(total_installation_materials, 2),
-                round(total_labor_cost, 2),
-                round(total_cost, 2)
-            ]
-        })
+        inputs = {
+            "price_per_sheet": price_per_sheet,
+            "num_of_sheets": num_of_sheets,
+            "num_of_cuts": num_of_cuts,
+            "hours_of_labor": hours_of_labor,
+            "labor_rate": labor_rate,
+            "screw_cost": screw_cost,
+            "tape_mud_cost": tape_mud_cost,
+            "drywall_tape_cost": drywall_tape_cost,
+            "primer_paint_cost": primer_paint_cost,
+            "floor_prep_cost": floor_prep_cost,
+            "waste_factor": waste_factor,
+        }
+
+        # Identical inputs reuse the breakdown, summary and CSV computed by any earlier session
+        estimate = cached_estimate("drywall", FORMULA_VERSION, inputs, calculate_estimate)
 
         # Display project summary including input values
         st.subheader("Project Summary and Detailed Cost Breakdown")
-        st.dataframe(input_summary, width=600)
+        st.dataframe(estimate.summary, width=600)
 
         # Option to download the full summary as a CSV file
-        csv_output = input_summary.to_csv(index=False)
         st.download_button(
             label="Download Project Summary as CSV",
-            data=csv_output,
+            data=estimate.csv_bytes,
             file_name="comprehensive_drywall_project_summary.csv",
             mime="text/csv"
         )
 
+        cache_stats = ESTIMATE_CACHE.stats()
+        st.caption(f"Estimate cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                   f"{cache_stats['size']}/{cache_stats['max_entries']} entries")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,177 @@
+import math
+
+import pandas as pd
+
+from estimatecache import LRUCache
+
+# Sheet sizes offered by the estimator as (width, length) in feet
+SHEET_SIZES = {"4x8": (4.0, 8.0), "4x10": (4.0, 10.0), "4x12": (4.0, 12.0)}
+
+# Columns of the surface table, with the value used for new or missing entries
+SURFACE_COLUMNS = {
+    "Surface": "",
+    "Type": "Wall",
+    "Length (ft)": 0.0,
+    "Height/Width (ft)": 8.0,
+    "Quantity": 1,
+    "Openings": 0,
+    "Opening Width (ft)": 3.0,
+    "Opening Height (ft)": 6.67,
+    "Sill Height (ft)": 0.0,
+}
+
+CUT_LIST_COLUMNS = ["Row", "Piece Length (ft)", "Piece Width (ft)", "Source", "Cutouts"]
+
+# Identical surfaces (same dimensions, openings and sheet length) are laid out once per process
+SURFACE_PLAN_CACHE = LRUCache(max_entries=2048)
+
+
+def empty_surface_table(num_surfaces=4):
+    """Starter surface table for the data editor"""
+    surfaces = pd.DataFrame([SURFACE_COLUMNS] * num_surfaces)
+    surfaces["Surface"] = [f"Wall {i + 1}" for i in range(num_surfaces)]
+    return surfaces
+
+
+def normalize_surfaces(surfaces):
+    """Fill missing columns and values so uploaded or edited tables plan cleanly"""
+    surfaces = surfaces.copy()
+    for column, default in SURFACE_COLUMNS.items():
+        if column not in surfaces.columns:
+            surfaces[column] = default
+        if isinstance(default, str):
+            surfaces[column] = surfaces[column].fillna(default).astype(str)
+        else:
+            surfaces[column] = pd.to_numeric(surfaces[column], errors="coerce").fillna(default).clip(lower=0)
+    surfaces["Type"] = surfaces["Type"].where(surfaces["Type"].str.title() == "Ceiling", "Wall").str.title()
+    return surfaces[list(SURFACE_COLUMNS)].reset_index(drop=True)
+
+
+def _take_offcut(offcuts, length, width):
+    # Best-fit offcut: the smallest area that still holds the piece
+    best = None
+    for i, (offcut_length, offcut_width) in enumerate(offcuts):
+        if offcut_length >= length - 1e-9 and offcut_width >= width - 1e-9:
+            if best is None or offcut_length * offcut_width < offcuts[best][0] * offcuts[best][1]:
+                best = i
+    return None if best is None else offcuts.pop(best)
+
+
+def surface_pieces(kind, length, height, openings, longest_sheet, sheet_width):
+    """Lay one wall or ceiling out in horizontal courses of sheet-width pieces
+
+    Full sheets run straight across openings, which are cut out afterwards, so
+    an opening never splits a course into extra runs. openings is a tuple of
+    (count, width, height, sill height), spaced evenly along the surface.
+    Returns (row, piece length, piece width, cutouts, cutout area) tuples;
+    pieces that would fall entirely inside an opening are not hung.
+    """
+    signature = (kind, round(length, 4), round(height, 4), openings, longest_sheet, sheet_width)
+    cached = SURFACE_PLAN_CACHE.get(signature)
+    if cached is not None:
+        return cached
+
+    placed = []
+    count, opening_width, opening_height, sill = openings
+    for i in range(int(count)):
+        center = length * (i + 1) / (count + 1)
+        placed.append((max(center - opening_width / 2, 0.0), min(center + opening_width / 2, length),
+                       sill, min(sill + opening_height, height)))
+
+    pieces = []
+    num_rows = max(int(math.ceil(height / sheet_width - 1e-9)), 0)
+    for row in range(num_rows):
+        row_bottom = row * sheet_width
+        row_top = min(row_bottom + sheet_width, height)
+        start = 0.0
+        while start < length - 1e-9:
+            end = min(start + longest_sheet, length)
+            cutouts = 0
+            cutout_area = 0.0
+            for left, right, bottom, top in placed:
+                overlap_x = min(right, end) - max(left, start)
+                overlap_y = min(top, row_top) - max(bottom, row_bottom)
+                if overlap_x > 1e-9 and overlap_y > 1e-9:
+                    cutouts += 1
+                    cutout_area += overlap_x * overlap_y
+            if cutout_area < (end - start) * (row_top - row_bottom) - 1e-9:
+                pieces.append((row + 1, round(end - start, 4), round(row_top - row_bottom, 4), cutouts, cutout_area))
+            start = end
+
+    pieces = tuple(pieces)
+    SURFACE_PLAN_CACHE.put(signature, pieces)
+    return pieces
+
+
+def plan_project(surfaces, sheet_sizes, min_offcut=2.0):
+    """Plan every surface in the table against one offcut pool and roll up sheets, cuts and the cut list
+
+    Pieces from all surfaces and quantities are cut largest first, each from
+    the best-fitting offcut left anywhere in the project or else from the
+    smallest sheet that holds it. Every trim and rip is a cut; offcuts shorter
+    than min_offcut are scrap.
+    """
+    sizes = sorted((SHEET_SIZES[name][1], SHEET_SIZES[name][0], name) for name in sheet_sizes)
+    sheet_width = max(width for _, width, _ in sizes)
+    longest = sizes[-1]
+
+    pieces = []
+    total_area = 0.0
+    cutout_area = 0.0
+    for surface in surfaces.to_dict("records"):
+        quantity = int(surface["Quantity"])
+        length = float(surface["Length (ft)"])
+        height = float(surface["Height/Width (ft)"])
+        if quantity == 0 or length <= 0 or height <= 0:
+            continue
+        openings = (int(surface["Openings"]), float(surface["Opening Width (ft)"]),
+                    float(surface["Opening Height (ft)"]), float(surface["Sill Height (ft)"]))
+        layout = surface_pieces(surface["Type"], length, height, openings, longest[0], sheet_width)
+        total_area += length * height * quantity
+        cutout_area += sum(piece[4] for piece in layout) * quantity
+        pieces.extend((surface["Surface"],) + piece[:4] for piece in layout for _ in range(quantity))
+
+    sheets = {name: 0 for _, _, name in sizes}
+    cuts = 0
+    offcuts = []
+    cut_rows = []
+    for surface, row, piece_length, piece_width, cutouts in sorted(pieces, key=lambda piece: -piece[2] * piece[3]):
+        offcut = _take_offcut(offcuts, piece_length, piece_width)
+        if offcut is not None:
+            source_length, source_width, source = offcut[0], offcut[1], "Offcut"
+        else:
+            # Smallest sheet that fits the piece, otherwise the longest available
+            for source_length, source_width, name in sizes:
+                if source_length >= piece_length - 1e-9 and source_width >= piece_width - 1e-9:
+                    break
+            else:
+                source_length, source_width, name = longest
+            sheets[name] += 1
+            source = f"New {name}"
+
+        # Guillotine cut: trim to length, then rip to width
+        if source_length - piece_length > 1e-9:
+            cuts += 1
+            if source_length - piece_length >= min_offcut:
+                offcuts.append((source_length - piece_length, source_width))
+        if source_width - piece_width > 1e-9:
+            cuts += 1
+            if source_width - piece_width >= 1.0 and piece_length >= min_offcut:
+                offcuts.append((piece_length, source_width - piece_width))
+        cuts += cutouts
+        cut_rows.append((surface, row, round(piece_length, 2), round(piece_width, 2), source, cutouts))
+
+    # Identical pieces of repeated surfaces collapse into one cut-list line with a quantity
+    cut_list = pd.DataFrame(cut_rows, columns=["Surface"] + CUT_LIST_COLUMNS)
+    cut_list = cut_list.groupby(["Surface"] + CUT_LIST_COLUMNS, sort=False).size().reset_index(name="Quantity")
+    cut_list = cut_list[["Surface", "Quantity"] + CUT_LIST_COLUMNS]
+    totals = {name: count for name, count in sheets.items() if count}
+    return {
+        "sheets": totals,
+        "total_sheets": sum(totals.values()),
+        "cuts": cuts,
+        "cut_list": cut_list,
+        "offcuts_reused": int(cut_list.loc[cut_list["Source"] == "Offcut", "Quantity"].sum()),
+        "net_area": total_area - cutout_area,
+        "cutout_area": cutout_area,
+    }
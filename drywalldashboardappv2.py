@@ -2,15 +2,24 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from drywallappv7 import sheet_optimizer_takeoff
+
 # Main function for the Streamlit application
 def main():
     st.title("Comprehensive Drywall Project Cost Estimator")
     st.write("Enter the details of your drywall project below to get an estimated cost.")
 
+    # Sheet takeoff: typed counts or computed from wall and ceiling dimensions
+    takeoff_mode = st.radio("Sheet takeoff:", ["Enter Sheets and Cuts", "Sheet Optimizer"], horizontal=True)
+
     # User Inputs
-    price_per_sheet = st.number_input("Enter the price per drywall sheet ($):", min_value=0.0, format="%.2f", step=0.5)
-    num_of_sheets = st.number_input("Enter the number of drywall sheets:", min_value=0, step=1)
-    num_of_cuts = st.number_input("Enter the number of cuts required:", min_value=0, step=1)
+    if takeoff_mode == "Enter Sheets and Cuts":
+        price_per_sheet = st.number_input("Enter the price per drywall sheet ($):", min_value=0.0, format="%.2f", step=0.5)
+        num_of_sheets = st.number_input("Enter the number of drywall sheets:", min_value=0, step=1)
+        num_of_cuts = st.number_input("Enter the number of cuts required:", min_value=0, step=1)
+    else:
+        price_per_sheet, num_of_sheets, num_of_cuts = sheet_optimizer_takeoff()
+
     hours_of_labor = st.number_input("Enter the hours of labor required:", min_value=0.0, format="%.2f", step=0.5)
     labor_rate = st.number_input("Enter the hourly labor rate ($):", min_value=0.0, format="%.2f", step=0.5)
 
@@ -20,7 +29,11 @@ def main():
     drywall_tape_cost = st.number_input("Enter the cost of drywall tape per sheet ($):", min_value=0.0, format="%.2f", step=0.5)
     primer_paint_cost = st.number_input("Enter the cost of primer and paint per sheet ($):", min_value=0.0, format="%.2f", step=0.5)
     floor_prep_cost = st.number_input("Enter the cost of floor/room prep materials (e.g., drop cloths, tape) ($):", min_value=0.0, format="%.2f", step=0.5)
-    waste_factor = st.slider("Select the waste factor (%)", min_value=0, max_value=20, value=10, step=1)
+    if takeoff_mode == "Enter Sheets and Cuts":
+        waste_factor = st.slider("Select the waste factor (%)", min_value=0, max_value=20, value=10, step=1)
+    else:
+        # The optimizer's sheet count already includes every offcut
+        waste_factor = 0
 
     # Button to calculate the cost
     if st.button("Calculate Total Cost"):
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+from networks import accumulate_downstream, accumulate_upstream, below, parent_index, tree_order, unknown_parents
+
+# Duct segments, with the value used for new or missing entries. A blank Parent means the
+# segment leaves the air handler; Terminal CFM is what the segment's own outlets deliver.
+DUCT_COLUMNS = {
+    "Segment": "",
+    "Parent": "",
+    "Length (ft)": 0.0,
+    "Terminal CFM": 0.0,
+    "Elbows": 0.0,
+    "Takeoffs": 0.0,
+    "Shape": "Round",
+}
+
+DUCT_SHAPES = ["Round", "Rectangular"]
+
+# Equivalent straight length added for each fitting (ft)
+ELBOW_EQUIVALENT_FT = 10.0
+TAKEOFF_EQUIVALENT_FT = 25.0
+
+# Galvanized sheet by gauge: largest duct dimension it covers (in) and weight (lb per sq ft)
+GAUGES = [
+    (26, 12.0, 0.906),
+    (24, 18.0, 1.156),
+    (22, 30.0, 1.406),
+    (20, 54.0, 1.656),
+    (18, np.inf, 2.156),
+]
+
+# Round sizes stocked, in inches
+ROUND_SIZES = np.r_[np.arange(4, 24, 1), np.arange(24, 62, 2)].astype(float)
+
+
+def empty_duct_table():
+    """Starter duct tree for the data editor"""
+    return pd.DataFrame([
+        {"Segment": "Trunk", "Parent": "", "Length (ft)": 30.0, "Terminal CFM": 0.0, "Elbows": 1.0, "Takeoffs": 0.0, "Shape": "Rectangular"},
+        {"Segment": "Branch 1", "Parent": "Trunk", "Length (ft)": 15.0, "Terminal CFM": 200.0, "Elbows": 1.0, "Takeoffs": 1.0, "Shape": "Round"},
+        {"Segment": "Branch 2", "Parent": "Trunk", "Length (ft)": 20.0, "Terminal CFM": 200.0, "Elbows": 2.0, "Takeoffs": 1.0, "Shape": "Round"},
+    ])
+
+
+def normalize_ducts(ducts):
+    """Fill missing columns and values so uploaded or edited tables size cleanly"""
+    ducts = ducts.copy()
+    for column, default in DUCT_COLUMNS.items():
+        if column not in ducts.columns:
+            ducts[column] = default
+        if isinstance(default, str):
+            ducts[column] = ducts[column].fillna(default).astype(str).str.strip()
+        else:
+            ducts[column] = pd.to_numeric(ducts[column], errors="coerce").fillna(default).clip(lower=0)
+    shape = ducts["Shape"].str.title()
+    ducts["Shape"] = shape.where(shape.isin(DUCT_SHAPES), "Round")
+    ducts = ducts[ducts["Segment"] != ""].drop_duplicates(subset="Segment")
+    return ducts[list(DUCT_COLUMNS)].reset_index(drop=True)
+
+
+def _rectangular_width(diameter, height):
+    # Narrowest even width whose Huebscher equivalent diameter matches the round size
+    widths = np.arange(4, 122, 2, dtype=float)
+    a, b = widths[None, :], height[:, None]
+    equivalent = 1.30 * (a * b) ** 0.625 / (a + b) ** 0.25
+    enough = equivalent >= diameter[:, None] - 1e-9
+    return np.where(enough.any(axis=1), widths[enough.argmax(axis=1)], widths[-1])
+
+
+def size_ducts(ducts, friction_rate=0.08, rect_height=8.0, fitting_loss_pct=0.0, seam_waste_pct=15.0):
+    """Equal-friction sizes, static pressure and sheet metal for a duct tree
+
+    One breadth-first pass orders the tree; airflow then accumulates leaf to
+    root and pressure loss root to leaf in that order. Each segment gets the
+    smallest stocked round size whose friction loss is at or below
+    friction_rate (in. w.c. per 100 ft), and rectangular segments take the
+    narrowest width at rect_height with the same equivalent diameter.
+    Returns (sized segments, critical-path static pressure in in. w.c.).
+    """
+    parent = parent_index(ducts["Segment"], ducts["Parent"])
+    order = tree_order(parent)
+    # A misspelled Parent would otherwise start its own tree and undersize the real trunk
+    orphan = unknown_parents(ducts["Segment"], ducts["Parent"])
+    connected = np.zeros(len(ducts), dtype=bool)
+    connected[order] = True
+    connected &= ~orphan & ~below(orphan.astype(float), parent, order)
+
+    # Leaf to root: each segment carries its own outlets plus everything downstream
+    cfm = accumulate_upstream(ducts["Terminal CFM"].to_numpy(dtype=float), parent, order)
+
+    # Friction loss per 100 ft of round duct: 0.109136 q^1.9 / D^5.02
+    with np.errstate(divide="ignore"):
+        ideal = (0.109136 * cfm ** 1.9 / friction_rate) ** (1 / 5.02) if friction_rate > 0 else np.full(len(cfm), np.inf)
+    stocked = np.searchsorted(ROUND_SIZES, ideal - 1e-9)
+    diameter = np.where(cfm > 0, ROUND_SIZES[np.minimum(stocked, len(ROUND_SIZES) - 1)], 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        actual_rate = np.where(diameter > 0, 0.109136 * cfm ** 1.9 / diameter ** 5.02, 0.0)
+        velocity = np.where(diameter > 0, cfm / (np.pi * (diameter / 12) ** 2 / 4), 0.0)
+
+    rectangular = (ducts["Shape"] == "Rectangular").to_numpy()
+    height = np.where(rectangular & (diameter > 0), np.minimum(rect_height, diameter), 0.0)
+    width = np.where(height > 0, _rectangular_width(diameter, np.maximum(height, 1.0)), 0.0)
+
+    length = ducts["Length (ft)"].to_numpy(dtype=float)
+    equivalent = (length + ducts["Elbows"].to_numpy(dtype=float) * ELBOW_EQUIVALENT_FT
+                  + ducts["Takeoffs"].to_numpy(dtype=float) * TAKEOFF_EQUIVALENT_FT)
+    loss = actual_rate * equivalent / 100 * (1 + fitting_loss_pct / 100)
+
+    # Root to leaf: pressure drop from the air handler to the end of each segment
+    path = np.where(connected, accumulate_downstream(loss, parent, order), np.nan)
+
+    perimeter_in = np.where(rectangular, 2 * (width + height), np.pi * diameter)
+    area = perimeter_in / 12 * length * (1 + seam_waste_pct / 100)
+    largest = np.where(rectangular, np.maximum(width, height), diameter)
+    gauge_index = np.searchsorted([limit for _, limit, _ in GAUGES], largest - 1e-9)
+    gauge = np.array([g for g, _, _ in GAUGES])[gauge_index]
+    weight = area * np.array([w for _, _, w in GAUGES])[gauge_index]
+
+    sized = pd.DataFrame({
+        "Segment": ducts["Segment"].to_numpy(),
+        "CFM": cfm,
+        "Size": np.where(rectangular & (width > 0),
+                         [f"{w:g} x {h:g}" for w, h in zip(width, height)],
+                         [f'{d:g}" round' if d > 0 else "" for d in diameter]),
+        "Velocity (fpm)": velocity.round(0),
+        "Friction (in/100 ft)": actual_rate.round(3),
+        "Equivalent Length (ft)": equivalent,
+        "Pressure Drop (in. w.c.)": loss.round(3),
+        "Path Pressure (in. w.c.)": path.round(3),
+        "Gauge": gauge,
+        "Sheet Metal (sq ft)": area.round(1),
+        "Weight (lb)": weight.round(1),
+        "Status": np.select([orphan, ~connected], ["Parent not found", "Not connected to the air handler"], "OK"),
+    })
+    critical = float(np.nanmax(path)) if connected.any() else 0.0
+    return sized, critical
@@ -1,6 +1,113 @@
 import streamlit as st
 import pandas as pd
 
+from circuitschedule import empty_circuit_table, footage_by_gauge, normalize_circuits, size_circuits
+from panelbalance import PANEL_SPACES, PANEL_SYSTEMS, balance_panel
+from pricecatalog import catalog_price
+
+# Inputs the composite project estimator collects for line_items()
+MODEL_INPUTS = {
+    "wire_cost": ("Cost of Wire per Foot ($)", 0.0),
+    "wire_length": ("Total Wire Length (Feet)", 0.0),
+    "num_outlets": ("Number of Outlets/Switches", 0),
+    "cost_per_outlet": ("Cost per Outlet/Switch ($)", 0.0),
+    "num_fixtures": ("Number of Light Fixtures", 0),
+    "cost_per_fixture": ("Cost per Light Fixture ($)", 0.0),
+    "panel_cost": ("Electrical Panel Cost ($)", 0.0),
+    "conduit_cost": ("Conduit and Fittings ($)", 0.0),
+    "junction_boxes": ("Junction Boxes ($)", 0.0),
+    "misc_materials": ("Miscellaneous Materials ($)", 0.0),
+    "num_electricians": ("Number of Electricians", 1),
+    "hours_per_electrician": ("Hours per Electrician", 0.0),
+    "labor_rate": ("Hourly Rate per Electrician ($)", 0.0),
+    "permit_cost": ("Permit Costs ($)", 0.0),
+    "inspection_cost": ("Inspection Costs ($)", 0.0),
+}
+
+
+# Trade-specific material costs: input name -> (phase, line item); absent inputs cost nothing
+TRADE_MATERIALS = {
+    "alarm_system_cost": ("Installation", "Alarm System"),
+    "network_wiring_cost": ("Rough-In", "Network Wiring"),
+    "pole_install_cost": ("Installation", "Pole Installation"),
+    "transformer_cost": ("Installation", "Transformer"),
+}
+
+
+def calculate_estimate(inputs):
+    """Costs and cost lines for a set of electrical inputs, before markup and contingency
+
+    Lines are (phase, item, quantity, unit cost) and are what the composite
+    estimator prices. Trade-specific costs in TRADE_MATERIALS are optional.
+    """
+    total_labor_hours = inputs["num_electricians"] * inputs["hours_per_electrician"]
+    lines = [
+        ("Rough-In", "Wire (feet)", inputs["wire_length"], inputs["wire_cost"]),
+        ("Rough-In", "Conduit and Fittings", 1, inputs["conduit_cost"]),
+        ("Rough-In", "Junction Boxes", 1, inputs["junction_boxes"]),
+        ("Rough-In", "Electrical Panel", 1, inputs["panel_cost"]),
+        ("Rough-In", "Miscellaneous Materials", 1, inputs["misc_materials"]),
+        ("Rough-In", "Electrician Labor (hours)", total_labor_hours, inputs["labor_rate"]),
+        ("Finish", "Outlets/Switches", inputs["num_outlets"], inputs["cost_per_outlet"]),
+        ("Finish", "Light Fixtures", inputs["num_fixtures"], inputs["cost_per_fixture"]),
+        ("Permits", "Permits and Inspections", 1, inputs["permit_cost"] + inputs["inspection_cost"]),
+    ] + [(phase, item, 1, inputs[name]) for name, (phase, item) in TRADE_MATERIALS.items() if name in inputs]
+    costs = {item: quantity * unit_cost for _, item, quantity, unit_cost in lines}
+
+    total_labor_cost = costs["Electrician Labor (hours)"]
+    total_permit_inspect = costs["Permits and Inspections"]
+    subtotal = sum(costs.values())
+    return {
+        "total_wire_cost": costs["Wire (feet)"],
+        "total_outlet_cost": costs["Outlets/Switches"],
+        "total_fixture_cost": costs["Light Fixtures"],
+        "total_materials": subtotal - total_labor_cost - total_permit_inspect,
+        "total_labor_hours": total_labor_hours,
+        "total_labor_cost": total_labor_cost,
+        "total_permit_inspect": total_permit_inspect,
+        "subtotal": subtotal,
+        "lines": lines,
+    }
+
+
+def line_items(inputs):
+    """Cost lines as (phase, item, quantity, unit cost) for the composite estimator"""
+    return calculate_estimate(inputs)["lines"]
+
+
+def circuit_schedule_wire():
+    """Circuit schedule input sized for ampacity and voltage drop; returns (wire cost per foot, wire length, circuits)"""
+    st.write("Enter each circuit's load, one-way length, voltage, phase (1 or 3) and conductor material. "
+             "Conductors are sized for ampacity, then upsized until voltage drop is within the limit.")
+    circuit_file = st.file_uploader("Upload Circuit Schedule (CSV)", type=["csv"], key="circuit_upload")
+    circuit_table = empty_circuit_table()
+    if circuit_file is not None:
+        try:
+            circuit_table = normalize_circuits(pd.read_csv(circuit_file))
+        except Exception as e:
+            st.error(f"Error reading file: {str(e)}")
+    circuits = normalize_circuits(st.data_editor(
+        circuit_table, num_rows="dynamic", hide_index=True, use_container_width=True, key="circuit_editor"))
+    max_drop_pct = st.number_input("Maximum Voltage Drop (%):", min_value=0.5, value=3.0, step=0.5)
+
+    sized = size_circuits(circuits, max_drop_pct)
+    st.dataframe(sized, use_container_width=True)
+    if (sized["Status"] != "OK").any():
+        st.warning(f"{int((sized['Status'] != 'OK').sum())} circuits cannot meet the ampacity or voltage drop limit with the largest conductor.")
+
+    # Each gauge is priced on its own; the schedule total becomes the wire line
+    gauges = footage_by_gauge(sized)
+    gauges["Price per Foot ($)"] = [catalog_price("Electrical", f"{material} Wire {size}")
+                                    for material, size in zip(gauges["Material"], gauges["Size"])]
+    gauges = st.data_editor(gauges, hide_index=True, use_container_width=True, key="gauge_editor",
+                            disabled=["Material", "Size", "Footage (ft)"])
+    gauge_cost = (gauges["Footage (ft)"] * pd.to_numeric(gauges["Price per Foot ($)"], errors="coerce").fillna(0.0)).sum()
+    wire_length = float(gauges["Footage (ft)"].sum())
+    wire_cost = gauge_cost / wire_length if wire_length else 0.0
+    st.write(f"**{wire_length:,.0f} ft of conductor across {len(gauges)} sizes: ${gauge_cost:,.2f}.**")
+    return wire_cost, wire_length, circuits
+
+
 def main():
     st.title("Comprehensive Electrical Project Cost Estimator")
     st.write("Enter the details of your electrical project below to get an estimated cost.")
@@ -26,8 +133,41 @@ def main():
 
     # General Material Inputs (Applicable to All Trades)
     st.subheader("Materials")
-    wire_cost = st.number_input("Cost of Wire per Foot ($):", min_value=0.0, format="%.2f", step=0.1)
-    wire_length = st.number_input("Total Wire Length Needed (Feet):", min_value=0, step=1)
+    panel_price = 0.0
+    wire_mode = st.radio("Wire quantities:", ["Enter Totals", "Circuit Schedule"], horizontal=True)
+    if wire_mode == "Enter Totals":
+        wire_cost = st.number_input("Cost of Wire per Foot ($):", min_value=0.0, value=catalog_price("Electrical", "Wire"), format="%.2f", step=0.1)
+        wire_length = st.number_input("Total Wire Length Needed (Feet):", min_value=0, step=1)
+    else:
+        wire_cost, wire_length, circuits = circuit_schedule_wire()
+
+        if st.checkbox("Balance the panel and size the service from this schedule"):
+            col1, col2 = st.columns(2)
+            with col1:
+                panel_system = st.selectbox("Panel System:", list(PANEL_SYSTEMS))
+            with col2:
+                demand_factor_pct = st.number_input("Demand Factor (%):", min_value=0.0, max_value=100.0, value=100.0, step=5.0)
+                spare_pct = st.number_input("Spare Spaces (%):", min_value=0.0, value=20.0, step=5.0)
+            # The balancer lives across reruns so circuits added to the schedule are placed incrementally
+            panel = balance_panel(circuits, PANEL_SYSTEMS[panel_system], demand_factor_pct, spare_pct,
+                                  st.session_state.get("panel_balancer"))
+            st.session_state["panel_balancer"] = panel["balancer"]
+            st.dataframe(panel["schedule"], use_container_width=True)
+            st.dataframe(panel["phases"], use_container_width=True)
+
+            # The balanced heaviest phase sets the service, replacing the size picked above
+            service_size = f"{panel['service_amps']}A"
+            panel_price = catalog_price("Electrical", f"{panel['service_amps']}A Panel") * panel["panels"]
+            panel_count = f"{panel['panels']} x " if panel["panels"] > 1 else ""
+            st.write(f"**Phase imbalance {panel['imbalance_pct']:.1f}%; demand {panel['demand_amps']:,.1f} A on the "
+                     f"heaviest phase. Service: {service_size}, {panel_count}{panel['panel_spaces']}-space panel "
+                     f"({panel['spaces_used']} spaces used).**")
+            if panel["service_status"] != "OK":
+                st.warning(f"{panel['service_status']}: {panel['demand_amps']:,.1f} A on the heaviest phase needs a "
+                           "larger or split service.")
+            if panel["panels"] > 1:
+                st.warning(f"{panel['spaces_used']} spaces plus spares exceed the largest {PANEL_SPACES[-1]}-space "
+                           f"panelboard; the schedule is split over {panel['panels']} panels.")
 
     num_outlets = st.number_input("Number of Outlets/Switches:", min_value=0, step=1)
     cost_per_outlet = st.number_input("Cost per Outlet/Switch ($):", min_value=0.0, format="%.2f", step=0.5)
@@ -35,7 +175,7 @@ def main():
     num_fixtures = st.number_input("Number of Light Fixtures:", min_value=0, step=1)
     cost_per_fixture = st.number_input("Cost per Light Fixture ($):", min_value=0.0, format="%.2f", step=0.5)
 
-    panel_cost = st.number_input("Electrical Panel Cost ($):", min_value=0.0, format="%.2f", step=10.0)
+    panel_cost = st.number_input("Electrical Panel Cost ($):", min_value=0.0, value=panel_price, format="%.2f", step=10.0)
 
     # Additional Fields Based on Contractor Type
     if contractor_type == "Low Voltage Electrician":
@@ -70,28 +210,39 @@ def main():
     contingency = st.slider("Contingency Percentage (%):", min_value=0, max_value=30, value=10, step=1)
 
     if st.button("Calculate Total Cost"):
-        # Calculate material costs
-        total_wire_cost = wire_cost * wire_length
-        total_outlet_cost = num_outlets * cost_per_outlet
-        total_fixture_cost = num_fixtures * cost_per_fixture
-        total_materials = (total_wire_cost + total_outlet_cost + total_fixture_cost + 
-                         panel_cost + conduit_cost + junction_boxes + misc_materials)
+        inputs = {
+            "wire_cost": wire_cost,
+            "wire_length": wire_length,
+            "num_outlets": num_outlets,
+            "cost_per_outlet": cost_per_outlet,
+            "num_fixtures": num_fixtures,
+            "cost_per_fixture": cost_per_fixture,
+            "panel_cost": panel_cost,
+            "conduit_cost": conduit_cost,
+            "junction_boxes": junction_boxes,
+            "misc_materials": misc_materials,
+            "num_electricians": num_electricians,
+            "hours_per_electrician": hours_per_electrician,
+            "labor_rate": hourly_rate,
+            "permit_cost": permit_cost,
+            "inspection_cost": inspection_cost,
+        }
 
         # Include trade-specific costs
         if contractor_type == "Low Voltage Electrician":
-            total_materials += alarm_system_cost + network_wiring_cost
+            inputs.update(alarm_system_cost=alarm_system_cost, network_wiring_cost=network_wiring_cost)
         elif contractor_type == "Lineworker":
-            total_materials += pole_install_cost + transformer_cost
-
-        # Calculate labor costs
-        total_labor_hours = num_electricians * hours_per_electrician
-        total_labor_cost = total_labor_hours * hourly_rate
-
-        # Calculate permit and inspection costs
-        total_permit_inspect = permit_cost + inspection_cost
+            inputs.update(pole_install_cost=pole_install_cost, transformer_cost=transformer_cost)
 
-        # Calculate subtotal
-        subtotal = total_materials + total_labor_cost + total_permit_inspect
+        estimate = calculate_estimate(inputs)
+        total_wire_cost = estimate["total_wire_cost"]
+        total_outlet_cost = estimate["total_outlet_cost"]
+        total_fixture_cost = estimate["total_fixture_cost"]
+        total_materials = estimate["total_materials"]
+        total_labor_hours = estimate["total_labor_hours"]
+        total_labor_cost = estimate["total_labor_cost"]
+        total_permit_inspect = estimate["total_permit_inspect"]
+        subtotal = estimate["subtotal"]
 
         # Calculate markup and contingency
         markup_amount = subtotal * (markup_percentage / 100)
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict, namedtuple
+
+# Result of one estimate: the computed line values, the summary table and the CSV download
+EstimateResult = namedtuple("EstimateResult", ["breakdown", "summary", "csv_bytes"])
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Size-bounded least-recently-used cache with hit/miss counters"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value for key and mark it as recently used"""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries when full"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+def _normalize(value):
+    # Numbers hash the same whether Streamlit returned an int or a float
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return round(float(value), 6)
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted(_normalize(v) for v in value)
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return str(value)
+
+
+def make_key(trade, formula_version, inputs):
+    """Build a canonical hash for a trade, its formula version and the inputs"""
+    payload = json.dumps(
+        {"trade": trade, "version": formula_version, "inputs": _normalize(inputs)},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Shared by every session served from this process
+ESTIMATE_CACHE = LRUCache(max_entries=512)
+
+
+def cached_estimate(trade, formula_version, inputs, compute, cache=ESTIMATE_CACHE):
+    """Return the estimate for these inputs, calling compute(inputs) only on a cache miss"""
+    key = make_key(trade, formula_version, inputs)
+    result = cache.get(key)
+    if result is None:
+        breakdown, summary = compute(inputs)
+        csv_bytes = summary.to_csv(index=False).encode("utf-8")
+        result = EstimateResult(breakdown, summary, csv_bytes)
+        cache.put(key, result)
+    return result
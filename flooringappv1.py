@@ -1,6 +1,65 @@
 import streamlit as st
 import pandas as pd
 
+from flooringlayout import parse_polygons, plan_layout
+from pricecatalog import catalog_price
+
+# Inputs the composite project estimator collects for line_items()
+MODEL_INPUTS = {
+    "room_length": ("Room Length (feet)", 0.0),
+    "room_width": ("Room Width (feet)", 0.0),
+    "price_per_sqft": ("Flooring Price per Square Foot ($)", 0.0),
+    "underlayment_cost_sqft": ("Underlayment Cost per Square Foot ($)", 0.0),
+    "trim_molding_length": ("Trim/Molding Length (feet)", 0.0),
+    "trim_cost_per_foot": ("Trim/Molding Cost per Foot ($)", 0.0),
+    "adhesive_cost": ("Adhesive/Mortar Cost ($)", 0.0),
+    "floor_prep_cost": ("Floor Preparation Cost ($)", 0.0),
+    "hours_of_labor": ("Hours of Labor", 0.0),
+    "labor_rate": ("Hourly Labor Rate ($)", 0.0),
+    "waste_factor": ("Waste Factor (%)", 10.0),
+}
+
+
+def calculate_estimate(inputs):
+    """Areas, costs and cost lines for a set of flooring inputs
+
+    The floor area is the room's length times width and the purchased area adds
+    the waste factor, unless a plank layout passes its own floor_area and
+    purchased_area. Lines are (phase, item, quantity, unit cost) and are what
+    the composite estimator prices.
+    """
+    total_sqft = inputs.get("floor_area", inputs["room_length"] * inputs["room_width"])
+    effective_sqft = inputs.get("purchased_area", total_sqft * (1 + inputs["waste_factor"] / 100))
+    lines = [
+        ("Preparation", "Floor Preparation", 1, inputs["floor_prep_cost"]),
+        ("Installation", "Underlayment (sq ft)", total_sqft, inputs["underlayment_cost_sqft"]),
+        ("Installation", "Flooring (sq ft)", effective_sqft, inputs["price_per_sqft"]),
+        ("Installation", "Adhesive/Mortar", 1, inputs["adhesive_cost"]),
+        ("Installation", "Flooring Labor (hours)", inputs["hours_of_labor"], inputs["labor_rate"]),
+        ("Finish", "Trim/Molding (feet)", inputs["trim_molding_length"], inputs["trim_cost_per_foot"]),
+    ]
+    costs = {item: quantity * unit_cost for _, item, quantity, unit_cost in lines}
+
+    flooring_material_cost = costs["Flooring (sq ft)"]
+    labor_cost = costs["Flooring Labor (hours)"]
+    return {
+        "total_sqft": total_sqft,
+        "effective_sqft": effective_sqft,
+        "flooring_material_cost": flooring_material_cost,
+        "underlayment_cost": costs["Underlayment (sq ft)"],
+        "trim_cost": costs["Trim/Molding (feet)"],
+        "labor_cost": labor_cost,
+        "total_installation_materials": sum(costs.values()) - flooring_material_cost - labor_cost,
+        "total_cost": sum(costs.values()),
+        "lines": lines,
+    }
+
+
+def line_items(inputs):
+    """Cost lines as (phase, item, quantity, unit cost) for the composite estimator"""
+    return calculate_estimate(inputs)["lines"]
+
+
 def main():
     st.title("Comprehensive Flooring Installation Cost Estimator")
     st.write("Enter the details of your flooring project below to get an estimated cost.")
@@ -16,7 +75,7 @@ def main():
         "Select flooring type:",
         ["Hardwood", "Laminate", "Vinyl", "Tile", "Carpet"]
     )
-    price_per_sqft = st.number_input("Enter the price per square foot of flooring ($):", min_value=0.0, format="%.2f", step=0.5)
+    price_per_sqft = st.number_input("Enter the price per square foot of flooring ($):", min_value=0.0, value=catalog_price("Flooring", flooring_type), format="%.2f", step=0.5)
     
     # Additional Materials
     st.subheader("Additional Materials")
@@ -33,33 +92,74 @@ def main():
     # Additional Costs
     st.subheader("Additional Costs")
     floor_prep_cost = st.number_input("Enter floor preparation costs (leveling, removal of old flooring, etc.) ($):", min_value=0.0, format="%.2f", step=10.0)
-    waste_factor = st.slider("Select waste factor (%)", min_value=5, max_value=20, value=10, step=1)
 
-    if st.button("Calculate Total Cost"):
-        # Calculate total square footage with waste factor
-        total_sqft = room_length * room_width
-        effective_sqft = total_sqft * (1 + waste_factor / 100)
-        
-        # Calculate costs
-        flooring_material_cost = effective_sqft * price_per_sqft
-        underlayment_cost = total_sqft * underlayment_cost_sqft
-        trim_cost = trim_molding_length * trim_cost_per_foot
-        labor_cost = hours_of_labor * labor_rate
-        
-        # Calculate total installation materials cost
-        total_installation_materials = (
-            underlayment_cost +
-            trim_cost +
-            adhesive_cost +
-            floor_prep_cost
-        )
-        
-        # Calculate total project cost
-        total_cost = (
-            flooring_material_cost +
-            total_installation_materials +
-            labor_cost
+    # Waste: flat percentage or computed from a plank/tile layout
+    waste_mode = st.radio("Waste calculation:", ["Flat Waste Factor", "Layout Optimizer"], horizontal=True)
+    if waste_mode == "Flat Waste Factor":
+        waste_factor = st.slider("Select waste factor (%)", min_value=5, max_value=20, value=10, step=1)
+    else:
+        st.write("Enter each room outline as x, y vertices in feet, one per line. Separate rooms with a blank line.")
+        room_outlines = st.text_area(
+            "Room outlines:",
+            value=f"0, 0\n{room_length:g}, 0\n{room_length:g}, {room_width:g}\n0, {room_width:g}",
+            height=150
         )
+        plank_length_in = st.number_input("Plank/tile length (inches):", min_value=1.0, value=48.0, format="%.2f", step=1.0)
+        plank_width_in = st.number_input("Plank/tile width (inches):", min_value=1.0, value=5.0, format="%.2f", step=0.5)
+        min_piece_in = st.number_input("Shortest usable offcut (inches):", min_value=0.0, value=8.0, format="%.2f", step=1.0)
+        min_stagger_in = st.number_input("Minimum joint stagger between rows (inches):", min_value=0.0, value=6.0, format="%.2f", step=1.0)
+        units_per_box = st.number_input("Planks/tiles per box:", min_value=1, value=20, step=1)
+
+    if st.button("Calculate Total Cost"):
+        inputs = {
+            "room_length": room_length,
+            "room_width": room_width,
+            "price_per_sqft": price_per_sqft,
+            "underlayment_cost_sqft": underlayment_cost_sqft,
+            "trim_molding_length": trim_molding_length,
+            "trim_cost_per_foot": trim_cost_per_foot,
+            "adhesive_cost": adhesive_cost,
+            "floor_prep_cost": floor_prep_cost,
+            "hours_of_labor": hours_of_labor,
+            "labor_rate": labor_rate,
+        }
+        if waste_mode == "Flat Waste Factor":
+            inputs["waste_factor"] = waste_factor
+        else:
+            try:
+                polygons = parse_polygons(room_outlines)
+            except ValueError as e:
+                st.error(f"Error reading room outlines: {str(e)}")
+                return
+
+            # Place planks row by row, reusing offcuts, to get the real material order
+            layout = plan_layout(
+                polygons, plank_length_in / 12, plank_width_in / 12,
+                min_piece=min_piece_in / 12, min_stagger=min_stagger_in / 12
+            )
+            waste_factor = round(layout["waste_pct"], 2)
+            inputs.update({
+                "waste_factor": waste_factor,
+                "floor_area": layout["floor_area"],
+                "purchased_area": layout["purchased_area"],
+            })
+            boxes = -(-layout["planks"] // units_per_box)
+
+            st.subheader("Layout Results")
+            st.write(f"**{layout['planks']:,} planks/tiles ({boxes:,} boxes) cover {layout['floor_area']:,.2f} sq ft "
+                     f"with {waste_factor}% real waste.**")
+            st.caption(f"{layout['offcuts_left']} reusable offcuts left over "
+                       f"({layout['offcut_length_left']:.2f} linear feet).")
+
+        estimate = calculate_estimate(inputs)
+        total_sqft = estimate["total_sqft"]
+        effective_sqft = estimate["effective_sqft"]
+        flooring_material_cost = estimate["flooring_material_cost"]
+        underlayment_cost = estimate["underlayment_cost"]
+        trim_cost = estimate["trim_cost"]
+        labor_cost = estimate["labor_cost"]
+        total_installation_materials = estimate["total_installation_materials"]
+        total_cost = estimate["total_cost"]
 
         # Create summary DataFrame
         input_summary = pd.DataFrame({
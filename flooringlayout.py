@@ -0,0 +1,167 @@
+import bisect
+import math
+
+import numpy as np
+
+
+def parse_polygons(text):
+    """Parse 'x, y' vertex lines into polygons; a blank line starts the next room"""
+    polygons = []
+    current = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            if current:
+                polygons.append(np.array(current, dtype=float))
+                current = []
+            continue
+        x, y = (float(v) for v in line.replace(";", ",").split(",")[:2])
+        current.append((x, y))
+    if current:
+        polygons.append(np.array(current, dtype=float))
+    for polygon in polygons:
+        if len(polygon) < 3:
+            raise ValueError("Each room outline needs at least three vertices")
+    return polygons
+
+
+def polygon_area(polygon):
+    """Shoelace area of a polygon given as an (n, 2) array"""
+    x, y = polygon[:, 0], polygon[:, 1]
+    return 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+def _crossings(polygon, y_lines):
+    # x of every edge crossing for every horizontal line, NaN where the edge misses the line
+    x0, y0 = polygon[:, 0], polygon[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+    y = y_lines[:, None]
+    spans = ((y0 <= y) & (y1 > y)) | ((y1 <= y) & (y0 > y))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+    return np.where(spans, x, np.nan)
+
+
+def row_runs(polygon, row_width):
+    """Lengths of the plank runs needed in each row, computed for all rows at once"""
+    y_min, y_max = polygon[:, 1].min(), polygon[:, 1].max()
+    num_rows = max(int(math.ceil((y_max - y_min) / row_width - 1e-9)), 0)
+    if num_rows == 0:
+        return [], np.zeros(0)
+
+    bottoms = y_min + np.arange(num_rows) * row_width
+    tops = np.minimum(bottoms + row_width, y_max)
+    # Sample each row band just inside its bottom, middle and top edges
+    inset = 1e-6 * max(row_width, 1.0)
+    samples = np.stack([bottoms + inset, (bottoms + tops) / 2, tops - inset], axis=1)
+    crossings = np.sort(_crossings(polygon, samples.ravel()), axis=1).reshape(num_rows, 3, -1)
+
+    runs = []
+    for row in crossings:
+        intervals = []
+        for line in row:
+            line = line[~np.isnan(line)]
+            intervals.extend(zip(line[0::2], line[1::2]))
+        # Merge the sampled intervals so the run covers the whole band
+        intervals.sort()
+        merged = []
+        for start, end in intervals:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        runs.append([end - start for start, end in merged if end - start > 1e-9])
+
+    # Fraction of a full plank width used by each row (the last row is usually ripped)
+    row_fraction = (tops - bottoms) / row_width
+    return runs, row_fraction
+
+
+class OffcutPool:
+    """Sorted pool of reusable plank offcuts"""
+
+    def __init__(self, min_piece):
+        self.min_piece = min_piece
+        self.lengths = []
+
+    def add(self, length):
+        if length >= self.min_piece:
+            bisect.insort(self.lengths, length)
+            return True
+        return False
+
+    def take_at_least(self, length):
+        """Remove and return the shortest offcut at least this long, or None"""
+        i = bisect.bisect_left(self.lengths, length - 1e-9)
+        if i == len(self.lengths):
+            return None
+        return self.lengths.pop(i)
+
+    def take_longest(self, avoid=None, stagger=0.0):
+        """Remove and return the longest offcut whose end joint clears the previous row's"""
+        for i in range(len(self.lengths) - 1, -1, -1):
+            if avoid is None or abs(self.lengths[i] - avoid) >= stagger:
+                return self.lengths.pop(i)
+        return None
+
+
+def plan_layout(polygons, plank_length, plank_width, min_piece=0.5, min_stagger=0.5):
+    """Simulate row-by-row placement with offcut reuse and return the material plan
+
+    Lengths are in feet. Returns a dict with planks purchased, floor area,
+    purchased area, real waste percentage and offcuts left over.
+    """
+    pool = OffcutPool(min_piece)
+    planks = 0
+    rip_waste_area = 0.0
+    floor_area = float(sum(polygon_area(polygon) for polygon in polygons))
+    previous_start = None
+
+    for polygon in polygons:
+        runs, row_fraction = row_runs(polygon, plank_width)
+        for row, fraction in zip(runs, row_fraction):
+            row_planks = 0
+            for run in row:
+                remaining = run
+                # Start the run from an offcut whose joint is staggered from the row below
+                start = pool.take_longest(avoid=previous_start, stagger=min_stagger)
+                if start is None:
+                    if previous_start is not None and abs(plank_length - previous_start) < min_stagger:
+                        # Two full-plank starts in a row would line up joints; cut a starter
+                        start = plank_length / 2
+                        pool.add(plank_length - start)
+                    else:
+                        start = plank_length
+                    row_planks += 1
+                if start >= remaining:
+                    pool.add(start - remaining)
+                    previous_start = remaining
+                    continue
+                previous_start = start
+                remaining -= start
+
+                full = int(remaining // plank_length)
+                row_planks += full
+                remaining -= full * plank_length
+                if remaining > 1e-9:
+                    # Finish the run with the shortest offcut that fits, else cut a new plank
+                    end_piece = pool.take_at_least(remaining)
+                    if end_piece is None:
+                        end_piece = plank_length
+                        row_planks += 1
+                    pool.add(end_piece - remaining)
+            planks += row_planks
+            # Ripped rows leave a strip of every plank they use
+            rip_waste_area += row_planks * plank_length * plank_width * (1 - fraction)
+
+    purchased_area = float(planks * plank_length * plank_width)
+    waste_pct = (purchased_area - floor_area) / floor_area * 100 if floor_area else 0.0
+    return {
+        "planks": planks,
+        "floor_area": floor_area,
+        "purchased_area": purchased_area,
+        "waste_pct": float(waste_pct),
+        "rip_waste_area": max(float(rip_waste_area), 0.0),
+        "offcuts_left": len(pool.lengths),
+        "offcut_length_left": float(sum(pool.lengths)),
+    }
@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+
+from cutlist import PIECE_COLUMNS
+
+# Columns of the wall schedule, with the value used for new or missing entries
+WALL_COLUMNS = {
+    "Wall": "",
+    "Length (ft)": 0.0,
+    "Height (ft)": 8.0,
+    "Quantity": 1,
+    "Openings": 0,
+    "Opening Width (ft)": 3.0,
+    "Opening Height (ft)": 6.67,
+    "Stud Spacing (in)": 16.0,
+    "Blocking Rows": 0,
+    "Stud Size": "2x4",
+    "Header Size": "2x10",
+}
+
+TAKEOFF_COLUMNS = [
+    "Studs",
+    "Jack Studs",
+    "Cripples",
+    "Blocking",
+    "Header Plies",
+    "Stud Length (in)",
+    "Jack Length (in)",
+    "Cripple Length (in)",
+    "Plate (LF)",
+    "Header (LF)",
+    "Blocking (LF)",
+    "Board Feet",
+]
+
+# Actual thickness of dimensional lumber; one bottom plate and a doubled top plate
+PLATE_THICKNESS_IN = 1.5
+PLATES = 3
+# Each header bears 1.5 in on a jack stud at either end and is built from two plies
+HEADER_BEARING_IN = 3.0
+HEADER_PLIES = 2
+# Longest plate stock before a run has to be spliced
+PLATE_STOCK_IN = 192.0
+
+
+def empty_wall_table(num_walls=4):
+    """Starter wall schedule for the data editor"""
+    walls = pd.DataFrame([WALL_COLUMNS] * num_walls)
+    walls["Wall"] = [f"Wall {i + 1}" for i in range(num_walls)]
+    return walls
+
+
+def normalize_walls(walls):
+    """Fill missing columns and values so uploaded or edited schedules compute cleanly"""
+    walls = walls.copy()
+    for column, default in WALL_COLUMNS.items():
+        if column not in walls.columns:
+            walls[column] = default
+        if isinstance(default, str):
+            walls[column] = walls[column].fillna(default).astype(str).str.strip()
+        else:
+            walls[column] = pd.to_numeric(walls[column], errors="coerce").fillna(default).clip(lower=0)
+    walls["Stud Spacing (in)"] = walls["Stud Spacing (in)"].where(walls["Stud Spacing (in)"] > 0, 16.0)
+    for column in ["Quantity", "Openings", "Blocking Rows"]:
+        walls[column] = walls[column].astype(int)
+    return walls[list(WALL_COLUMNS)].reset_index(drop=True)
+
+
+def _nominal_dims(sizes):
+    # Nominal thickness and width columns parsed from sizes such as '2x4'; unparseable sizes are 0
+    dims = sizes.str.extract(r"^\s*(\d+(?:\.\d+)?)\s*[xX]\s*(\d+(?:\.\d+)?)")
+    return dims[0].astype(float).fillna(0.0).to_numpy(), dims[1].astype(float).fillna(0.0).to_numpy()
+
+
+def _actual_width(nominal_width):
+    # Dressed width: 1/2 in under nominal up to 6 in, 3/4 in under above that
+    return np.where(nominal_width > 6, nominal_width - 0.75, np.maximum(nominal_width - 0.5, 0.0))
+
+
+def compute_framing(walls):
+    """Vectorized member counts, lengths and board feet for every wall in the schedule
+
+    Counts are for a single wall; multiply by Quantity for the schedule total.
+    """
+    length = walls["Length (ft)"].to_numpy(dtype=float)
+    height = walls["Height (ft)"].to_numpy(dtype=float)
+    openings = walls["Openings"].to_numpy(dtype=float)
+    opening_width = walls["Opening Width (ft)"].to_numpy(dtype=float)
+    opening_height = walls["Opening Height (ft)"].to_numpy(dtype=float)
+    spacing = walls["Stud Spacing (in)"].to_numpy(dtype=float)
+    blocking_rows = walls["Blocking Rows"].to_numpy(dtype=float)
+    has_wall = (length > 0) & (height > 0)
+
+    # Studs on layout plus the end stud, less the ones each opening displaces; every
+    # opening adds a king and a jack stud at each side and cripples above its header
+    on_layout = np.where(has_wall, np.ceil(length * 12 / spacing - 1e-9) + 1, 0.0)
+    displaced = np.minimum(openings * np.floor(opening_width * 12 / spacing), np.maximum(on_layout - 2, 0))
+    studs = on_layout - displaced + 2 * openings
+    jacks = 2 * openings
+    cripples = openings * np.maximum(np.floor(opening_width * 12 / spacing), 1)
+
+    stud_length = np.maximum(height * 12 - PLATES * PLATE_THICKNESS_IN, 0.0)
+    stud_thickness, stud_width = _nominal_dims(walls["Stud Size"])
+    header_thickness, header_width = _nominal_dims(walls["Header Size"])
+    header_depth = _actual_width(header_width)
+    jack_length = np.maximum(opening_height * 12 - PLATE_THICKNESS_IN, 0.0)
+    cripple_length = np.maximum(stud_length - jack_length - header_depth, 0.0)
+
+    plate_lf = np.where(has_wall, PLATES * length, 0.0)
+    header_lf = openings * HEADER_PLIES * (opening_width + HEADER_BEARING_IN / 12)
+    # Blocking runs the clear wall between openings, one piece per bay per row
+    blocking_lf = blocking_rows * np.maximum(length - openings * opening_width, 0.0) * has_wall
+    blocking = blocking_rows * np.maximum(studs - jacks - 1, 0.0)
+
+    stud_lf = (studs * stud_length + jacks * jack_length + cripples * cripple_length) / 12
+    board_feet = (stud_thickness * stud_width * (stud_lf + plate_lf + blocking_lf)
+                  + header_thickness * header_width * header_lf) / 12
+
+    return pd.DataFrame(
+        np.column_stack([studs, jacks, cripples, blocking, openings * HEADER_PLIES, stud_length,
+                         jack_length, cripple_length, plate_lf, header_lf, blocking_lf, board_feet]),
+        columns=TAKEOFF_COLUMNS,
+        index=walls.index,
+    )
+
+
+def framing_materials(walls, takeoff):
+    """Roll the per-wall takeoff up into material quantities by member and lumber size"""
+    quantity = walls["Quantity"].to_numpy(dtype=float)
+    stud_sizes = walls["Stud Size"]
+    members = [
+        ("Studs", stud_sizes, takeoff["Studs"], takeoff["Studs"] * takeoff["Stud Length (in)"] / 12),
+        ("Jack Studs", stud_sizes, takeoff["Jack Studs"], takeoff["Jack Studs"] * takeoff["Jack Length (in)"] / 12),
+        ("Cripples", stud_sizes, takeoff["Cripples"], takeoff["Cripples"] * takeoff["Cripple Length (in)"] / 12),
+        ("Plates", stud_sizes, None, takeoff["Plate (LF)"]),
+        ("Blocking", stud_sizes, takeoff["Blocking"], takeoff["Blocking (LF)"]),
+        ("Headers", walls["Header Size"], takeoff["Header Plies"], takeoff["Header (LF)"]),
+    ]
+    frames = []
+    for item, sizes, pieces, linear_feet in members:
+        frames.append(pd.DataFrame({
+            "Item": item,
+            "Nominal Size": sizes.to_numpy(),
+            "Pieces": (pieces.to_numpy() if pieces is not None else 0.0) * quantity,
+            "Linear Feet": linear_feet.to_numpy() * quantity,
+        }))
+    materials = pd.concat(frames, ignore_index=True)
+    materials = materials.groupby(["Item", "Nominal Size"], sort=False, as_index=False).sum()
+    thickness, width = _nominal_dims(materials["Nominal Size"])
+    materials["Board Feet"] = thickness * width * materials["Linear Feet"] / 12
+    return materials[(materials["Pieces"] > 0) | (materials["Linear Feet"] > 0)].reset_index(drop=True)
+
+
+def framing_pieces(walls, takeoff):
+    """Required pieces for the cut-list optimizer, with identical pieces merged"""
+    quantity = walls["Quantity"].to_numpy(dtype=float)
+    stud_sizes = walls["Stud Size"].to_numpy()
+    opening_width = walls["Opening Width (ft)"].to_numpy(dtype=float) * 12
+    spacing = walls["Stud Spacing (in)"].to_numpy(dtype=float)
+
+    # Plate runs longer than the longest stock are spliced into full lengths plus a remainder
+    plate_in = takeoff["Plate (LF)"].to_numpy() * 12 / PLATES
+    full_plates = np.floor(plate_in / PLATE_STOCK_IN)
+    plate_rest = plate_in - full_plates * PLATE_STOCK_IN
+
+    parts = [
+        ("Stud", stud_sizes, takeoff["Stud Length (in)"].to_numpy(), takeoff["Studs"].to_numpy()),
+        ("Jack Stud", stud_sizes, takeoff["Jack Length (in)"].to_numpy(), takeoff["Jack Studs"].to_numpy()),
+        ("Cripple", stud_sizes, takeoff["Cripple Length (in)"].to_numpy(), takeoff["Cripples"].to_numpy()),
+        ("Plate", stud_sizes, np.full_like(plate_in, PLATE_STOCK_IN), full_plates * PLATES),
+        ("Plate", stud_sizes, plate_rest, np.where(plate_rest > 0, PLATES, 0)),
+        ("Blocking", stud_sizes, np.maximum(spacing - PLATE_THICKNESS_IN, 0.0), takeoff["Blocking"].to_numpy()),
+        ("Header", walls["Header Size"].to_numpy(), opening_width + HEADER_BEARING_IN, takeoff["Header Plies"].to_numpy()),
+    ]
+    frames = [
+        pd.DataFrame({"Description": name, "Nominal Size": sizes, "Length (in)": np.round(lengths, 3),
+                      "Quantity": counts * quantity})
+        for name, sizes, lengths, counts in parts
+    ]
+    pieces = pd.concat(frames, ignore_index=True)
+    pieces = pieces[(pieces["Quantity"] > 0) & (pieces["Length (in)"] > 0)]
+    pieces = pieces.groupby(["Description", "Nominal Size", "Length (in)"], sort=False, as_index=False)["Quantity"].sum()
+    pieces["Quantity"] = pieces["Quantity"].astype(int)
+    return pieces[list(PIECE_COLUMNS)]
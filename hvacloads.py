@@ -0,0 +1,121 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# Peak solar gain through clear glass by the direction a window faces (Btu/h per sq ft), before SHGC
+SOLAR_GAIN = {
+    "N": 40.0,
+    "NE": 130.0,
+    "E": 200.0,
+    "SE": 160.0,
+    "S": 120.0,
+    "SW": 160.0,
+    "W": 200.0,
+    "NW": 130.0,
+    "Skylight": 250.0,
+}
+
+# Rooms, with the value used for new or missing entries
+ROOM_COLUMNS = {
+    "Room": "",
+    "Floor Area (sq ft)": 0.0,
+    "Ceiling Height (ft)": 8.0,
+    "Exterior Wall (sq ft)": 0.0,
+    "Window (sq ft)": 0.0,
+    "Orientation": "S",
+    "Roof (sq ft)": 0.0,
+    "Occupants": 0.0,
+    "Equipment (W)": 0.0,
+}
+
+# Nominal tonnage of packaged and split units; larger loads use several of the biggest unit
+UNIT_TONS = [1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 5.0, 7.5, 10.0, 12.5, 15.0, 20.0, 25.0]
+
+# Sensible and latent gain per seated occupant (Btu/h)
+OCCUPANT_SENSIBLE = 250.0
+OCCUPANT_LATENT = 200.0
+BTU_PER_WATT = 3.412
+BTU_PER_TON = 12000.0
+
+
+def empty_room_table(num_rooms=3):
+    """Starter room table for the data editor"""
+    rooms = pd.DataFrame([ROOM_COLUMNS] * num_rooms)
+    rooms["Room"] = [f"Room {i + 1}" for i in range(num_rooms)]
+    return rooms
+
+
+def normalize_rooms(rooms):
+    """Fill missing columns and values so uploaded or edited tables compute cleanly"""
+    rooms = rooms.copy()
+    for column, default in ROOM_COLUMNS.items():
+        if column not in rooms.columns:
+            rooms[column] = default
+        if isinstance(default, str):
+            rooms[column] = rooms[column].fillna(default).astype(str).str.strip()
+        else:
+            rooms[column] = pd.to_numeric(rooms[column], errors="coerce").fillna(default).clip(lower=0)
+    orientation = rooms["Orientation"].str.upper().replace({"SKYLIGHT": "Skylight"})
+    rooms["Orientation"] = orientation.where(orientation.isin(list(SOLAR_GAIN)), "S")
+    return rooms[list(ROOM_COLUMNS)].reset_index(drop=True)
+
+
+def room_loads(rooms, wall_u=0.08, window_u=0.35, roof_u=0.03, shgc=0.4, outdoor_summer=95.0,
+               indoor_cooling=75.0, outdoor_winter=20.0, indoor_heating=70.0, infiltration_ach=0.5,
+               moisture_grains=30.0, supply_delta_t=20.0, heating_supply_delta_t=40.0):
+    """Simplified peak cooling gain and heating loss for every room, as whole-column arrays
+
+    Envelope conduction uses U x A x design temperature difference; windows add
+    solar gain for the way they face. Infiltration is an air-change rate on the
+    room volume, with latent gain from the outdoor-indoor moisture difference in
+    grains. Airflow is the larger of what the sensible cooling needs at
+    supply_delta_t and what the heating needs at heating_supply_delta_t.
+    """
+    area = rooms["Floor Area (sq ft)"].to_numpy(dtype=float)
+    volume = area * rooms["Ceiling Height (ft)"].to_numpy(dtype=float)
+    window = rooms["Window (sq ft)"].to_numpy(dtype=float)
+    wall = np.maximum(rooms["Exterior Wall (sq ft)"].to_numpy(dtype=float) - window, 0.0)
+    roof = rooms["Roof (sq ft)"].to_numpy(dtype=float)
+    occupants = rooms["Occupants"].to_numpy(dtype=float)
+    equipment = rooms["Equipment (W)"].to_numpy(dtype=float) * BTU_PER_WATT
+
+    envelope_ua = wall_u * wall + window_u * window + roof_u * roof
+    infiltration_cfm = infiltration_ach * volume / 60
+    cooling_dt = max(outdoor_summer - indoor_cooling, 0.0)
+    heating_dt = max(indoor_heating - outdoor_winter, 0.0)
+
+    solar = window * shgc * rooms["Orientation"].map(SOLAR_GAIN).to_numpy(dtype=float)
+    sensible = ((envelope_ua + 1.08 * infiltration_cfm) * cooling_dt + solar
+                + occupants * OCCUPANT_SENSIBLE + equipment)
+    latent = occupants * OCCUPANT_LATENT + 0.68 * infiltration_cfm * moisture_grains
+    heating = (envelope_ua + 1.08 * infiltration_cfm) * heating_dt
+
+    cooling_cfm = sensible / (1.08 * supply_delta_t) if supply_delta_t > 0 else np.zeros(len(rooms))
+    heating_cfm = heating / (1.08 * heating_supply_delta_t) if heating_supply_delta_t > 0 else np.zeros(len(rooms))
+    airflow = np.maximum(cooling_cfm, heating_cfm)
+    cooling = sensible + latent
+    return pd.DataFrame({
+        "Room": rooms["Room"].to_numpy(),
+        "Cooling Sensible (Btu/h)": sensible.round(0),
+        "Cooling Latent (Btu/h)": latent.round(0),
+        "Cooling (Btu/h)": cooling.round(0),
+        "Heating (Btu/h)": heating.round(0),
+        "Tons": (cooling / BTU_PER_TON).round(2),
+        "Airflow (CFM)": airflow.round(0),
+    })
+
+
+def select_units(cooling_btuh, safety_pct=10.0, unit_tons=UNIT_TONS):
+    """Smallest nominal unit covering the load plus safety margin, as (unit tons, number of units)
+
+    Loads beyond the largest unit are split evenly across several units, each
+    sized to its share.
+    """
+    required = cooling_btuh * (1 + safety_pct / 100) / BTU_PER_TON
+    if required <= 0:
+        return 0.0, 0
+    sizes = sorted(unit_tons)
+    count = max(math.ceil(required / sizes[-1] - 1e-9), 1)
+    share = required / count
+    return next(size for size in sizes if size >= share - 1e-9), count
@@ -0,0 +1,249 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from polygons import parse_vertex_strings
+
+HEAD_PATTERNS = ["Square", "Triangular"]
+
+# Zone types that get heads; hardscape is left dry
+IRRIGATED_TYPES = ["Lawn", "Bed"]
+
+# Laterals are first searched for among heads this many spacings apart, widening as needed
+NEIGHBOR_RADIUS = 1.5
+
+
+def _inside(px, py, vx, vy, tolerance=1e-6):
+    # Even-odd ray casting for every point against one outline, counting boundary points as inside
+    x0, y0 = vx[None, :], vy[None, :]
+    x1, y1 = np.roll(vx, -1)[None, :], np.roll(vy, -1)[None, :]
+    px, py = px[:, None], py[:, None]
+    spans = (y0 > py) != (y1 > py)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing_x = x0 + (py - y0) * (x1 - x0) / (y1 - y0)
+    inside = (spans & (px < crossing_x)).sum(axis=1) % 2 == 1
+
+    dx, dy = x1 - x0, y1 - y0
+    length_sq = np.where(dx * dx + dy * dy > 0, dx * dx + dy * dy, 1.0)
+    t = np.clip(((px - x0) * dx + (py - y0) * dy) / length_sq, 0.0, 1.0)
+    on_edge = (np.hypot(px - (x0 + t * dx), py - (y0 + t * dy)) <= tolerance).any(axis=1)
+    return inside | on_edge
+
+
+def place_heads(zones, spacing, pattern="Triangular"):
+    """Sprinkler head positions on square or triangular spacing inside each irrigated zone"""
+    owner, x, y = parse_vertex_strings(zones["Vertices"])
+    irrigated = zones["Type"].isin(IRRIGATED_TYPES).to_numpy()
+    row_step = spacing * math.sqrt(3) / 2 if pattern == "Triangular" else spacing
+
+    zone_ids, head_x, head_y = [], [], []
+    starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]]) if len(owner) else []
+    ends = np.r_[starts[1:], len(owner)] if len(owner) else []
+    for start, end in zip(starts, ends):
+        zone = owner[start]
+        if not irrigated[zone]:
+            continue
+        vx, vy = x[start:end], y[start:end]
+        rows = np.arange(vy.min(), vy.max() + row_step / 2, row_step)
+        columns = np.arange(vx.min(), vx.max() + spacing, spacing)
+        grid_x = columns[None, :] + np.zeros((len(rows), 1))
+        if pattern == "Triangular":
+            # Every other row shifts half a spacing so heads form equilateral triangles
+            grid_x = grid_x + (np.arange(len(rows)) % 2)[:, None] * spacing / 2
+        grid_y = np.broadcast_to(rows[:, None], grid_x.shape)
+        px, py = grid_x.ravel(), grid_y.ravel()
+        keep = _inside(px, py, vx, vy)
+        if not keep.any():
+            # Small zones still get a head at their vertex centroid
+            px, py, keep = np.array([vx.mean()]), np.array([vy.mean()]), np.array([True])
+        zone_ids.append(np.full(int(keep.sum()), zone))
+        head_x.append(px[keep])
+        head_y.append(py[keep])
+
+    if not zone_ids:
+        return pd.DataFrame({"Zone": pd.Series(dtype=int), "X": pd.Series(dtype=float), "Y": pd.Series(dtype=float)})
+    return pd.DataFrame({"Zone": np.concatenate(zone_ids), "X": np.concatenate(head_x), "Y": np.concatenate(head_y)})
+
+
+def _neighbor_pairs(x, y, radius):
+    # Spatial grid index: only heads in the same or an adjacent cell can be within radius
+    cells = pd.DataFrame({"cx": np.floor(x / radius).astype(np.int64), "cy": np.floor(y / radius).astype(np.int64),
+                          "i": np.arange(len(x))})
+    pairs = []
+    for offset_x, offset_y in [(0, 0), (1, 0), (1, 1), (0, 1), (-1, 1)]:
+        shifted = cells.assign(cx=cells["cx"] + offset_x, cy=cells["cy"] + offset_y).rename(columns={"i": "j"})
+        matched = cells.merge(shifted, on=["cx", "cy"])
+        if offset_x == 0 and offset_y == 0:
+            matched = matched[matched["i"] < matched["j"]]
+        pairs.append(matched[["i", "j"]].to_numpy())
+    pairs = np.concatenate(pairs) if pairs else np.zeros((0, 2), dtype=np.int64)
+    length = np.hypot(x[pairs[:, 0]] - x[pairs[:, 1]], y[pairs[:, 0]] - y[pairs[:, 1]])
+    close = length <= radius
+    return pairs[close], length[close]
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _ring_offsets(ring):
+    # Grid cell offsets at exactly this Chebyshev distance from a cell
+    if ring == 0:
+        return np.zeros((1, 2), dtype=np.int64)
+    side = np.arange(-ring, ring + 1)
+    inner = side[1:-1]
+    return np.concatenate([
+        np.column_stack([side, np.full(len(side), -ring)]),
+        np.column_stack([side, np.full(len(side), ring)]),
+        np.column_stack([np.full(len(inner), -ring), inner]),
+        np.column_stack([np.full(len(inner), ring), inner]),
+    ])
+
+
+def _closest_outside(x, y, group, component, searching, cell):
+    """Shortest edge from every searching component to another component of its own group
+
+    Points search rings of grid cells around their own; a component stops once
+    its best edge is shorter than anything the next ring can hold. After a few
+    rings the cells double in size, so far-apart components are reached in a
+    handful of passes. Returns per-component arrays (length, i, j).
+    """
+    best = np.full(len(x), np.inf)
+    best_i = np.full(len(x), -1)
+    best_j = np.full(len(x), -1)
+    active = np.flatnonzero(searching[component])
+    while len(active):
+        cx, cy = np.floor(x / cell).astype(np.int64), np.floor(y / cell).astype(np.int64)
+        keys = (cx << 32) ^ (cy & 0xFFFFFFFF)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        for ring in range(3):
+            offsets = _ring_offsets(ring)
+            point = np.repeat(active, len(offsets))
+            qx = cx[point] + np.tile(offsets[:, 0], len(active))
+            qy = cy[point] + np.tile(offsets[:, 1], len(active))
+            query = (qx << 32) ^ (qy & 0xFFFFFFFF)
+            lo = np.searchsorted(sorted_keys, query, side="left")
+            counts = np.searchsorted(sorted_keys, query, side="right") - lo
+            i = np.repeat(point, counts)
+            j = order[np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())]
+            outside = (group[i] == group[j]) & (component[i] != component[j])
+            i, j = i[outside], j[outside]
+            if len(i):
+                length = np.hypot(x[i] - x[j], y[i] - y[j])
+                # Shortest candidate per component, kept if it beats what earlier rings found
+                first = np.lexsort((length, component[i]))
+                comp = component[i][first]
+                lead = np.r_[True, comp[1:] != comp[:-1]]
+                comp, k = comp[lead], first[lead]
+                better = length[k] < best[comp]
+                best[comp[better]] = length[k][better]
+                best_i[comp[better]] = i[k][better]
+                best_j[comp[better]] = j[k][better]
+            # Cells in the next ring are at least ring * cell away
+            active = active[best[component[active]] > ring * cell]
+            if not len(active):
+                break
+        cell *= 2
+    return best, best_i, best_j
+
+
+def spanning_forest(x, y, group, radius):
+    """Minimum spanning tree of the points in each group, returned as (total length, edges)
+
+    Edges up to radius come from a spatial grid index and are joined shortest
+    first (Kruskal). The pieces left are then joined Boruvka-style: each round
+    every component but the largest of its group adds its shortest edge to
+    another component, found by a widening grid search around its own points.
+    Both steps only add edges the minimum tree contains, so the trees are exact.
+    """
+    parent = np.arange(len(x))
+    edges = []
+    total = 0.0
+
+    def join(candidates, length):
+        # Shortest edges first, skipping any that would close a loop
+        nonlocal total
+        for k in np.argsort(length, kind="stable"):
+            i, j = _find(parent, candidates[k, 0]), _find(parent, candidates[k, 1])
+            if i != j:
+                parent[i] = j
+                edges.append((int(candidates[k, 0]), int(candidates[k, 1])))
+                total += float(length[k])
+
+    pairs, length = _neighbor_pairs(x, y, radius)
+    same_group = group[pairs[:, 0]] == group[pairs[:, 1]]
+    join(pairs[same_group], length[same_group])
+
+    while True:
+        # Every point's root, by pointer jumping
+        component = parent.copy()
+        while (component[component] != component).any():
+            component = component[component]
+        roots, sizes = np.unique(component, return_counts=True)
+        root_group = group[roots]
+        pieces = pd.Series(1, index=root_group).groupby(level=0).transform("size").to_numpy()
+        if (pieces <= 1).all():
+            break
+        # The largest piece of each group is reached from the others, so it never needs to search
+        largest = pd.DataFrame({"group": root_group, "size": sizes}).groupby("group")["size"].idxmax().to_numpy()
+        searching = np.zeros(len(x), dtype=bool)
+        searching[roots[pieces > 1]] = True
+        searching[roots[largest]] = False
+        best, best_i, best_j = _closest_outside(x, y, group, component, searching, radius)
+        found = np.flatnonzero(np.isfinite(best))
+        join(np.column_stack([best_i[found], best_j[found]]), best[found])
+    return total, edges
+
+
+def plan_irrigation(zones, spacing, pattern="Triangular", heads_per_valve=8, stations_per_controller=12,
+                    source=(0.0, 0.0)):
+    """Place heads, group them onto valves and route lateral and main pipe
+
+    Each zone's heads are split into valve circuits of at most heads_per_valve.
+    Laterals follow the spanning tree of each circuit; the main follows the
+    spanning tree joining every valve (at its head nearest the source) plus a
+    run from the point of connection to the nearest valve. Returns a dict of heads, counts, pipe footage and a
+    per-zone table.
+    """
+    heads = place_heads(zones, spacing, pattern)
+    if heads.empty:
+        return {"heads": heads, "num_heads": 0, "valves": 0, "controllers": 0,
+                "lateral_ft": 0.0, "main_ft": 0.0, "pipe_ft": 0.0, "zones": pd.DataFrame()}
+
+    # Split each zone's heads, in row order, into valve circuits
+    position = heads.groupby("Zone").cumcount().to_numpy()
+    zone_heads = heads.groupby("Zone")["Zone"].transform("size").to_numpy()
+    circuits = np.ceil(zone_heads / heads_per_valve).astype(int)
+    heads["Valve"] = heads.groupby(["Zone", position * circuits // zone_heads], sort=False).ngroup()
+
+    x, y = heads["X"].to_numpy(dtype=float), heads["Y"].to_numpy(dtype=float)
+    valve = heads["Valve"].to_numpy()
+    lateral_ft, _ = spanning_forest(x, y, valve, NEIGHBOR_RADIUS * spacing)
+
+    # Each valve sits at its circuit's head nearest the point of connection
+    to_source = np.hypot(x - source[0], y - source[1])
+    valve_heads = heads.assign(_d=to_source).sort_values("_d").groupby("Valve").head(1)
+    main_x, main_y = valve_heads["X"].to_numpy(), valve_heads["Y"].to_numpy()
+    main_ft, _ = spanning_forest(main_x, main_y, np.zeros(len(main_x), dtype=int), NEIGHBOR_RADIUS * spacing)
+    # The point of connection feeds the valve nearest it, however far outside the site it is
+    main_ft += float(valve_heads["_d"].min())
+
+    num_valves = int(valve.max()) + 1
+    by_zone = heads.groupby("Zone").agg(Heads=("X", "size"), Valves=("Valve", "nunique"))
+    by_zone.insert(0, "Zone", zones.loc[by_zone.index, "Zone"].to_numpy())
+    by_zone.insert(0, "Lot", zones.loc[by_zone.index, "Lot"].to_numpy())
+    return {
+        "heads": heads,
+        "num_heads": len(heads),
+        "valves": num_valves,
+        "controllers": int(math.ceil(num_valves / stations_per_controller)),
+        "lateral_ft": lateral_ft,
+        "main_ft": main_ft,
+        "pipe_ft": lateral_ft + main_ft,
+        "zones": by_zone.reset_index(drop=True),
+    }
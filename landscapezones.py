@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from polygons import parse_vertex_strings, polygon_metrics
+
+# Material placed in each zone type, its unit, and the default placement depth in inches
+ZONE_TYPES = {
+    "Lawn": ("Sod", "sq ft", 0.0),
+    "Bed": ("Mulch", "cu yd", 3.0),
+    "Hardscape": ("Pavers", "sq ft", 4.0),
+}
+
+# Zone outlines, with the value used for new or missing entries
+ZONE_COLUMNS = {
+    "Lot": "Lot 1",
+    "Zone": "",
+    "Type": "Lawn",
+    "Vertices": "",
+    "Depth (in)": np.nan,
+}
+
+# Long-format vertex files carry one row per outline corner
+VERTEX_COLUMNS = ["Lot", "Zone", "Type", "X (ft)", "Y (ft)"]
+
+ZONE_TAKEOFF_COLUMNS = ["Area (sq ft)", "Perimeter (ft)", "Edging (ft)", "Material", "Quantity", "Unit",
+                        "Base Gravel (tons)", "Topsoil (cu yd)"]
+
+# Compacted gravel base under hardscape
+GRAVEL_TONS_PER_CUYD = 1.4
+
+
+def empty_zone_table(num_zones=3):
+    """Starter zone table for the data editor"""
+    zones = pd.DataFrame([ZONE_COLUMNS] * num_zones)
+    zones["Zone"] = [f"Zone {i + 1}" for i in range(num_zones)]
+    zones["Type"] = list(ZONE_TYPES)[:num_zones] + ["Lawn"] * max(num_zones - len(ZONE_TYPES), 0)
+    return zones
+
+
+def normalize_zones(zones):
+    """Fill missing columns and values so uploaded or edited tables compute cleanly"""
+    zones = zones.copy()
+    for column, default in ZONE_COLUMNS.items():
+        if column not in zones.columns:
+            zones[column] = default
+        if isinstance(default, str):
+            zones[column] = zones[column].fillna(default).astype(str).str.strip()
+    zone_type = zones["Type"].str.title()
+    zones["Type"] = zone_type.where(zone_type.isin(list(ZONE_TYPES)), "Lawn")
+    # Blank depths take the zone type's default
+    default_depth = zones["Type"].map({name: depth for name, (_, _, depth) in ZONE_TYPES.items()})
+    zones["Depth (in)"] = pd.to_numeric(zones["Depth (in)"], errors="coerce").fillna(default_depth).clip(lower=0)
+    return zones[list(ZONE_COLUMNS)].reset_index(drop=True)
+
+
+def read_zones(csv_source):
+    """Load zones from a zone-table CSV or a long-format CSV with one row per vertex"""
+    data = pd.read_csv(csv_source)
+    if "Vertices" in data.columns or not {"X (ft)", "Y (ft)"}.issubset(data.columns):
+        return normalize_zones(data)
+
+    for column in ["Lot", "Zone", "Type"]:
+        if column not in data.columns:
+            data[column] = ZONE_COLUMNS[column]
+    data[["Lot", "Zone", "Type"]] = data[["Lot", "Zone", "Type"]].fillna("").astype(str)
+    coordinates = data["X (ft)"].astype(str) + "," + data["Y (ft)"].astype(str)
+    group = data.groupby(["Lot", "Zone", "Type"], sort=False)
+    zones = group.size().reset_index()[["Lot", "Zone", "Type"]]
+    zones["Vertices"] = coordinates.groupby([data["Lot"], data["Zone"], data["Type"]], sort=False).agg("; ".join).to_numpy()
+    if "Depth (in)" in data.columns:
+        zones["Depth (in)"] = group["Depth (in)"].first().to_numpy()
+    return normalize_zones(zones)
+
+
+def zone_takeoff(zones, waste_pct=5.0):
+    """Vectorized area, perimeter, edging and material quantity for every zone"""
+    owner, x, y = parse_vertex_strings(zones["Vertices"])
+    area, perimeter, _, _ = polygon_metrics(owner, x, y, len(zones))
+
+    zone_type = zones["Type"].to_numpy()
+    depth_ft = zones["Depth (in)"].to_numpy(dtype=float) / 12
+    lawn, bed, hardscape = zone_type == "Lawn", zone_type == "Bed", zone_type == "Hardscape"
+
+    # Sod and pavers are bought by area with waste; mulch by volume at the bed depth
+    quantity = np.select([lawn | hardscape, bed], [area * (1 + waste_pct / 100), area * depth_ft / 27], 0.0)
+    # Beds are edged all around and hardscape gets edge restraint; lawn edges are shared with them
+    edging = np.where(bed | hardscape, perimeter, 0.0)
+    gravel = np.where(hardscape, area * depth_ft / 27 * GRAVEL_TONS_PER_CUYD, 0.0)
+    topsoil = np.where(lawn, area * depth_ft / 27, 0.0)
+
+    materials = {name: ZONE_TYPES[name][0] for name in ZONE_TYPES}
+    units = {name: ZONE_TYPES[name][1] for name in ZONE_TYPES}
+    return pd.DataFrame({
+        "Area (sq ft)": area,
+        "Perimeter (ft)": perimeter,
+        "Edging (ft)": edging,
+        "Material": zones["Type"].map(materials).to_numpy(),
+        "Quantity": quantity,
+        "Unit": zones["Type"].map(units).to_numpy(),
+        "Base Gravel (tons)": gravel,
+        "Topsoil (cu yd)": topsoil,
+    }, index=zones.index)
+
+
+def material_totals(takeoff):
+    """Total quantity of every material across all zones, including edging, gravel and topsoil"""
+    totals = takeoff.groupby(["Material", "Unit"], sort=False, as_index=False)["Quantity"].sum()
+    extras = pd.DataFrame({
+        "Material": ["Edging", "Base Gravel", "Topsoil"],
+        "Unit": ["ft", "tons", "cu yd"],
+        "Quantity": [takeoff["Edging (ft)"].sum(), takeoff["Base Gravel (tons)"].sum(), takeoff["Topsoil (cu yd)"].sum()],
+    })
+    totals = pd.concat([totals, extras], ignore_index=True)
+    return totals[totals["Quantity"] > 0].reset_index(drop=True)
+
+
+def lot_totals(zones, takeoff):
+    """Area by zone type and edging for every lot, for per-lot maintenance pricing"""
+    lot_ids, lots = pd.factorize(zones["Lot"])
+    by_lot = pd.DataFrame({"Lot": lots})
+    for name in ZONE_TYPES:
+        by_lot[f"{name} (sq ft)"] = np.bincount(
+            lot_ids, weights=np.where(zones["Type"] == name, takeoff["Area (sq ft)"], 0.0), minlength=len(lots))
+    by_lot["Edging (ft)"] = np.bincount(lot_ids, weights=takeoff["Edging (ft)"].to_numpy(), minlength=len(lots))
+    return by_lot
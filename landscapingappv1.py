@@ -1,6 +1,11 @@
 import streamlit as st
 import pandas as pd
 
+from irrigationlayout import HEAD_PATTERNS, plan_irrigation
+from landscapezones import empty_zone_table, lot_totals, material_totals, normalize_zones, read_zones, zone_takeoff
+from polygons import invalid_outlines
+from pricecatalog import catalog_price
+
 def main():
     st.title("Landscaping Project Cost Estimator")
     st.write("Enter the details of your landscaping project below to get an estimated cost.")
@@ -19,7 +24,33 @@ def main():
          "Industrial", "Resort/Hotel"]
     )
 
-    total_square_footage = st.number_input("Total Project Area (Square Feet):", min_value=0, step=100)
+    area_method = st.radio("Areas from:", ["Enter Totals", "Zone Polygons"], horizontal=True)
+    if area_method == "Enter Totals":
+        total_square_footage = st.number_input("Total Project Area (Square Feet):", min_value=0, step=100)
+    else:
+        st.write("Upload a zone table CSV (Lot, Zone, Type, Vertices as 'x, y; x, y; ...', Depth (in)) or a CSV "
+                 "with one row per vertex (Lot, Zone, Type, X (ft), Y (ft)), or edit the table below. "
+                 "Types are Lawn, Bed and Hardscape.")
+        uploaded_file = st.file_uploader("Choose a zone CSV", type="csv")
+        zones = empty_zone_table()
+        if uploaded_file is not None:
+            try:
+                zones = read_zones(uploaded_file)
+            except Exception as e:
+                st.error(f"Error reading file: {str(e)}")
+        zones = normalize_zones(st.data_editor(zones, num_rows="dynamic", hide_index=True, use_container_width=True, key="zone_table"))
+        zone_waste = st.slider("Sod and Paver Waste (%):", min_value=0, max_value=20, value=5, step=1)
+
+        takeoff = zone_takeoff(zones, zone_waste)
+        rejected = invalid_outlines(zones["Vertices"])
+        if rejected.any():
+            st.warning(f"{int(rejected.sum())} zones have vertices that do not form an outline of at least three "
+                       "valid 'x, y' points and were left out.")
+        lots = lot_totals(zones, takeoff)
+        total_square_footage = round(float(takeoff["Area (sq ft)"].sum()), 2)
+        st.write(f"**{total_square_footage:,.2f} sq ft in {len(zones)} zones across {len(lots)} lots.**")
+        with st.expander("Totals by Lot"):
+            st.dataframe(lots.round(2), use_container_width=True)
 
     # Materials selection based on project type
     st.subheader("Materials")
@@ -40,8 +71,18 @@ def main():
     )
     
     # Material quantities and costs
-    material_quantity = st.number_input("Material Quantity (Units/Square Feet):", min_value=0, step=10)
-    cost_per_unit = st.number_input("Cost per Unit ($):", min_value=0.0, format="%.2f", step=0.1)
+    if area_method == "Enter Totals":
+        material_quantity = st.number_input("Material Quantity (Units/Square Feet):", min_value=0, step=10)
+        cost_per_unit = st.number_input("Cost per Unit ($):", min_value=0.0, value=catalog_price("Landscaping", material_type), format="%.2f", step=0.1)
+    else:
+        # Every material the zones call for is priced, not just the primary one
+        st.write("Zone material quantities (edit the unit costs):")
+        zone_materials = material_totals(takeoff)
+        zone_materials["Cost per Unit ($)"] = [catalog_price("Landscaping", name) for name in zone_materials["Material"]]
+        zone_materials = st.data_editor(zone_materials.round(2), disabled=["Material", "Unit", "Quantity"], hide_index=True,
+                                        use_container_width=True, key="zone_material_prices")
+        material_quantity = "; ".join(f"{quantity:,.2f} {unit} {name}" for name, unit, quantity
+                                      in zip(zone_materials["Material"], zone_materials["Unit"], zone_materials["Quantity"]))
 
     # Equipment and supplies based on project type
     st.subheader("Equipment and Supplies")
@@ -55,9 +96,31 @@ def main():
         equipment_rental = st.number_input("Equipment Rental Cost ($):", min_value=0.0, step=10.0)
         tools_cost = st.number_input("Specialized Tools Cost ($):", min_value=0.0, step=10.0)
     elif project_type == "Irrigation System":
-        pipe_length = st.number_input("Total Pipe Length (Feet):", min_value=0, step=50)
-        num_heads = st.number_input("Number of Sprinkler Heads:", min_value=0, step=1)
-        control_units = st.number_input("Number of Control Units:", min_value=0, step=1)
+        irrigation_method = "Enter Quantities"
+        if area_method == "Zone Polygons":
+            irrigation_method = st.radio("Irrigation quantities:", ["Enter Quantities", "Generate Layout"], horizontal=True)
+        if irrigation_method == "Enter Quantities":
+            pipe_length = st.number_input("Total Pipe Length (Feet):", min_value=0, step=50)
+            num_heads = st.number_input("Number of Sprinkler Heads:", min_value=0, step=1)
+            control_units = st.number_input("Number of Control Units:", min_value=0, step=1)
+        else:
+            head_spacing = st.number_input("Head-to-Head Spacing (Feet):", min_value=1.0, value=15.0, format="%.1f", step=1.0)
+            head_pattern = st.selectbox("Head Pattern:", HEAD_PATTERNS, index=1)
+            heads_per_valve = st.number_input("Maximum Heads per Valve:", min_value=1, value=8, step=1)
+            stations_per_controller = st.number_input("Stations per Controller:", min_value=1, value=12, step=1)
+            source_x = st.number_input("Point of Connection X (Feet):", value=0.0, format="%.1f", step=5.0)
+            source_y = st.number_input("Point of Connection Y (Feet):", value=0.0, format="%.1f", step=5.0)
+
+            # Lawn and bed zones get heads; laterals and main follow minimum spanning trees
+            layout = plan_irrigation(zones, head_spacing, head_pattern, heads_per_valve, stations_per_controller,
+                                     (source_x, source_y))
+            pipe_length = round(layout["pipe_ft"], 2)
+            num_heads = layout["num_heads"]
+            control_units = layout["controllers"]
+            st.write(f"**{num_heads} heads on {layout['valves']} valves and {control_units} controllers, "
+                     f"{layout['lateral_ft']:,.1f} ft of lateral and {layout['main_ft']:,.1f} ft of main.**")
+            if not layout["zones"].empty:
+                st.dataframe(layout["zones"], use_container_width=True)
     
     # Additional Materials
     st.subheader("Additional Materials")
@@ -87,7 +150,10 @@ def main():
 
     if st.button("Calculate Total Cost"):
         # Calculate material costs
-        total_material_cost = material_quantity * cost_per_unit
+        if area_method == "Enter Totals":
+            total_material_cost = material_quantity * cost_per_unit
+        else:
+            total_material_cost = float((zone_materials["Quantity"] * zone_materials["Cost per Unit ($)"].fillna(0)).sum())
         total_materials = (total_material_cost + soil_amendments + 
                          drainage_materials + misc_supplies)
 
@@ -158,6 +224,11 @@ def main():
                 round(total_cost, 2)
             ]
         })
+        if project_type == "Irrigation System" and irrigation_method == "Generate Layout":
+            summary = pd.concat([summary, pd.DataFrame({
+                "Parameter": ["Sprinkler Heads", "Valves", "Control Units", "Lateral Pipe (ft)", "Main Pipe (ft)"],
+                "Value": [num_heads, layout["valves"], control_units, round(layout["lateral_ft"], 2), round(layout["main_ft"], 2)],
+            })], ignore_index=True)
 
         # Display project summary
         st.subheader("Project Summary and Cost Breakdown")
@@ -0,0 +1,260 @@
+import numpy as np
+import pandas as pd
+
+# Columns of point and polyline mark files; polylines repeat their Mark ID on every vertex, in order
+MARK_COLUMNS = {
+    "Mark ID": "",
+    "Utility": "Unknown",
+    "Depth (ft)": np.nan,
+    "Method": "",
+    "X (ft)": np.nan,
+    "Y (ft)": np.nan,
+}
+
+RECORD_COLUMNS = ["Mark ID", "Kind", "Utility", "Depth (ft)", "Method"]
+
+
+def _normalize_marks(marks, kind):
+    marks = marks.copy()
+    for column, default in MARK_COLUMNS.items():
+        if column not in marks.columns:
+            marks[column] = default
+        if isinstance(default, str):
+            marks[column] = marks[column].fillna(default).astype(str).str.strip()
+        else:
+            marks[column] = pd.to_numeric(marks[column], errors="coerce")
+    marks = marks.dropna(subset=["X (ft)", "Y (ft)"])
+    blank = marks["Mark ID"] == ""
+    marks.loc[blank, "Mark ID"] = [f"{kind} {i + 1}" for i in np.flatnonzero(blank.to_numpy())]
+    return marks[list(MARK_COLUMNS)].reset_index(drop=True)
+
+
+def read_marks(csv_source, kind="Point"):
+    """Load point marks, or polyline marks with one row per vertex, from a CSV"""
+    return _normalize_marks(pd.read_csv(csv_source), kind)
+
+
+def parse_polyline(text):
+    """Parse 'x,y; x,y; ...' into an (n, 2) array of vertices, skipping malformed pairs"""
+    vertices = []
+    for pair in str(text).split(";"):
+        values = pair.split(",")
+        try:
+            vertices.append((float(values[0]), float(values[1])))
+        except (IndexError, ValueError):
+            continue
+    return np.array(vertices, dtype=float).reshape(-1, 2)
+
+
+def point_segment_distance(px, py, ax, ay, bx, by):
+    """Distance from points to segments, elementwise over broadcast arrays"""
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(length_sq > 0, ((px - ax) * dx + (py - ay) * dy) / length_sq, 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    return np.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def segment_distance(ax, ay, bx, by, cx, cy, dx, dy):
+    """Shortest distance between segments AB and CD, elementwise; zero where they cross"""
+    def orientation(px, py, qx, qy, rx, ry):
+        return np.sign((qx - px) * (ry - py) - (qy - py) * (rx - px))
+
+    crosses = ((orientation(ax, ay, bx, by, cx, cy) * orientation(ax, ay, bx, by, dx, dy) < 0)
+               & (orientation(cx, cy, dx, dy, ax, ay) * orientation(cx, cy, dx, dy, bx, by) < 0))
+    nearest = np.minimum.reduce([
+        point_segment_distance(ax, ay, cx, cy, dx, dy),
+        point_segment_distance(bx, by, cx, cy, dx, dy),
+        point_segment_distance(cx, cy, ax, ay, bx, by),
+        point_segment_distance(dx, dy, ax, ay, bx, by),
+    ])
+    return np.where(crosses, 0.0, nearest)
+
+
+def clip_to_box(x0, y0, x1, y1, xmin, ymin, xmax, ymax):
+    """Liang-Barsky parameter range (t0, t1) of each segment inside a box, elementwise; empty where t0 > t1"""
+    t0, t1 = np.zeros(np.shape(x0)), np.ones(np.shape(x0))
+    for p, q in [(x0 - x1, x0 - xmin), (x1 - x0, xmax - x0), (y0 - y1, y0 - ymin), (y1 - y0, ymax - y0)]:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = q / p
+        outside = (p == 0) & (q < 0)
+        t0 = np.where(p < 0, np.maximum(t0, r), t0)
+        t1 = np.where(p > 0, np.minimum(t1, r), t1)
+        t1 = np.where(outside, -1.0, t1)
+    return t0, t1
+
+
+class LocateStore:
+    """Locate marks held as segments (points are zero-length) behind a uniform grid index"""
+
+    def __init__(self, points=None, lines=None, cell_size=None):
+        records = []
+        segments = []
+        if points is not None and len(points):
+            points = _normalize_marks(points, "Point")
+            records.append(points.assign(Kind="Point")[RECORD_COLUMNS])
+            xy = points[["X (ft)", "Y (ft)"]].to_numpy(dtype=float)
+            segments.append((np.arange(len(points)), xy, xy))
+        if lines is not None and len(lines):
+            lines = _normalize_marks(lines, "Line")
+            # Consecutive vertices of the same Mark ID form the line's segments
+            _, line_index = np.unique(lines["Mark ID"].to_numpy(), return_inverse=True)
+            first = lines.groupby("Mark ID", sort=True).first().reset_index()
+            offset = sum(len(r) for r in records)
+            records.append(first.assign(Kind="Line")[RECORD_COLUMNS])
+            xy = lines[["X (ft)", "Y (ft)"]].to_numpy(dtype=float)
+            same = line_index[1:] == line_index[:-1]
+            segments.append((line_index[1:][same] + offset, xy[:-1][same], xy[1:][same]))
+
+        self.records = (pd.concat(records, ignore_index=True) if records
+                        else pd.DataFrame(columns=RECORD_COLUMNS))
+        if segments:
+            self.owner = np.concatenate([owner for owner, _, _ in segments])
+            start = np.concatenate([a for _, a, _ in segments])
+            end = np.concatenate([b for _, _, b in segments])
+        else:
+            self.owner, start, end = np.zeros(0, dtype=int), np.zeros((0, 2)), np.zeros((0, 2))
+        self.x0, self.y0 = start[:, 0], start[:, 1]
+        self.x1, self.y1 = end[:, 0], end[:, 1]
+        self.cell_size = cell_size or self._default_cell_size()
+        self._build_index()
+
+    def _default_cell_size(self):
+        # Aim for a few segments per cell across the occupied extent
+        if len(self.owner) == 0:
+            return 10.0
+        width = max(np.ptp(np.r_[self.x0, self.x1]), np.ptp(np.r_[self.y0, self.y1]), 1.0)
+        return max(width / np.sqrt(len(self.owner)) * 2, 1.0)
+
+    def _cells(self, xmin, ymin, xmax, ymax):
+        # Every grid cell touched by each bounding box, as (box index, cell key) pairs
+        cx0 = np.floor(xmin / self.cell_size).astype(np.int64)
+        cy0 = np.floor(ymin / self.cell_size).astype(np.int64)
+        cx1 = np.floor(xmax / self.cell_size).astype(np.int64)
+        cy1 = np.floor(ymax / self.cell_size).astype(np.int64)
+        nx, ny = cx1 - cx0 + 1, cy1 - cy0 + 1
+        box = np.repeat(np.arange(len(cx0)), nx * ny)
+        within = np.arange(len(box)) - np.repeat(np.cumsum(nx * ny) - nx * ny, nx * ny)
+        cell_x = cx0[box] + within % nx[box]
+        cell_y = cy0[box] + within // nx[box]
+        return box, (cell_x << 32) ^ (cell_y & 0xFFFFFFFF)
+
+    def _build_index(self):
+        box, keys = self._cells(np.minimum(self.x0, self.x1), np.minimum(self.y0, self.y1),
+                                np.maximum(self.x0, self.x1), np.maximum(self.y0, self.y1))
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._segments = box[order]
+
+    def _candidates(self, xmin, ymin, xmax, ymax):
+        # Query box index and segment index for every segment sharing a grid cell with a query box
+        box, keys = self._cells(np.atleast_1d(xmin), np.atleast_1d(ymin), np.atleast_1d(xmax), np.atleast_1d(ymax))
+        lo = np.searchsorted(self._keys, keys, side="left")
+        hi = np.searchsorted(self._keys, keys, side="right")
+        counts = hi - lo
+        query = np.repeat(box, counts)
+        position = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        pairs = np.unique(np.column_stack([query, self._segments[position]]), axis=0)
+        return pairs[:, 0], pairs[:, 1]
+
+    def __len__(self):
+        return len(self.records)
+
+    def _near_pairs(self, vertices, distance):
+        # Query segment, store segment and gap for every store segment within distance of a query segment
+        if len(self.owner) == 0 or len(vertices) < 2:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0)
+        # Long query segments are split into cell-sized pieces so their boxes hug the line
+        sx, sy = vertices[:-1, 0], vertices[:-1, 1]
+        ex, ey = vertices[1:, 0], vertices[1:, 1]
+        pieces = np.maximum(np.ceil(np.hypot(ex - sx, ey - sy) / self.cell_size), 1).astype(int)
+        parent = np.repeat(np.arange(len(pieces)), pieces)
+        step = np.arange(len(parent)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+        t0, t1 = step / pieces[parent], (step + 1) / pieces[parent]
+        ax, ay = sx[parent] + t0 * (ex - sx)[parent], sy[parent] + t0 * (ey - sy)[parent]
+        bx, by = sx[parent] + t1 * (ex - sx)[parent], sy[parent] + t1 * (ey - sy)[parent]
+        query, segment = self._candidates(np.minimum(ax, bx) - distance, np.minimum(ay, by) - distance,
+                                          np.maximum(ax, bx) + distance, np.maximum(ay, by) + distance)
+        gap = segment_distance(ax[query], ay[query], bx[query], by[query],
+                               self.x0[segment], self.y0[segment], self.x1[segment], self.y1[segment])
+        close = gap <= distance
+        return parent[query[close]], segment[close], gap[close]
+
+    def query_bbox(self, xmin, ymin, xmax, ymax):
+        """Records with any part inside the box"""
+        if len(self.owner) == 0:
+            return self.records.iloc[0:0]
+        _, segment = self._candidates(xmin, ymin, xmax, ymax)
+        t0, t1 = clip_to_box(self.x0[segment], self.y0[segment], self.x1[segment], self.y1[segment],
+                             xmin, ymin, xmax, ymax)
+        hits = np.unique(self.owner[segment[t0 <= t1]])
+        return self.records.iloc[hits]
+
+    def query_near_line(self, vertices, distance):
+        """Records within distance of a polyline, with the closest distance and query segment
+
+        vertices is an (n, 2) array of the polyline's corners in order.
+        """
+        vertices = np.asarray(vertices, dtype=float)
+        empty = self.records.iloc[0:0].assign(**{"Distance (ft)": [], "Query Segment": []})
+        parent, segment, gap = self._near_pairs(vertices, distance)
+        if len(segment) == 0:
+            return empty
+
+        hits = pd.DataFrame({"record": self.owner[segment], "Distance (ft)": gap, "Query Segment": parent})
+        hits = hits.sort_values("Distance (ft)", kind="stable").drop_duplicates("record")
+        result = self.records.iloc[hits["record"].to_numpy()].copy()
+        result["Distance (ft)"] = hits["Distance (ft)"].round(2).to_numpy()
+        result["Query Segment"] = hits["Query Segment"].to_numpy()
+        return result
+
+    def query_spans_along_line(self, vertices, distance):
+        """Where records come within distance of a polyline, as spans along its segments
+
+        One row per record segment reaching into a query segment's band: the
+        record, the query segment, the closest distance and the span of the
+        query segment's axis (feet from its start) the clipped piece runs
+        alongside. Spans near a segment's ends may start before 0 or end past
+        its length.
+        """
+        vertices = np.asarray(vertices, dtype=float)
+        columns = RECORD_COLUMNS + ["Query Segment", "Distance (ft)", "Start (ft)", "End (ft)"]
+        parent, segment, _ = self._near_pairs(vertices, distance)
+        if len(segment) == 0:
+            return pd.DataFrame(columns=columns)
+        # A store segment can meet several pieces of one query segment; measure it once against the whole segment
+        parent, segment = np.unique(np.column_stack([parent, segment]), axis=0).T
+
+        # Store segment ends in each query segment's frame: u along its axis, v across it
+        sx, sy = vertices[parent, 0], vertices[parent, 1]
+        dx, dy = vertices[parent + 1, 0] - sx, vertices[parent + 1, 1] - sy
+        length = np.hypot(dx, dy)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ux, uy = np.where(length > 0, dx / length, 1.0), np.where(length > 0, dy / length, 0.0)
+        u0 = (self.x0[segment] - sx) * ux + (self.y0[segment] - sy) * uy
+        v0 = (self.y0[segment] - sy) * ux - (self.x0[segment] - sx) * uy
+        u1 = (self.x1[segment] - sx) * ux + (self.y1[segment] - sy) * uy
+        v1 = (self.y1[segment] - sy) * ux - (self.x1[segment] - sx) * uy
+
+        # Clip to the band around the segment; the rounded ends of the distance zone lie inside its box
+        t0, t1 = clip_to_box(u0, v0, u1, v1, -distance, -distance, length + distance, distance)
+        inside = t0 <= t1
+        start, end = u0 + t0 * (u1 - u0), u0 + t1 * (u1 - u0)
+        gap = segment_distance(sx, sy, sx + dx, sy + dy,
+                               self.x0[segment], self.y0[segment], self.x1[segment], self.y1[segment])
+
+        spans = self.records.iloc[self.owner[segment[inside]]][RECORD_COLUMNS].reset_index(drop=True)
+        spans["Query Segment"] = parent[inside]
+        spans["Distance (ft)"] = gap[inside].round(2)
+        spans["Start (ft)"] = np.minimum(start, end)[inside]
+        spans["End (ft)"] = np.maximum(start, end)[inside]
+        return spans
+
+    def summary(self):
+        """Mark counts and depth range by utility"""
+        return self.records.groupby("Utility").agg(
+            Marks=("Mark ID", "size"),
+            **{"Min Depth (ft)": ("Depth (ft)", "min")},
+            **{"Max Depth (ft)": ("Depth (ft)", "max")},
+        ).reset_index()
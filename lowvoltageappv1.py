@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
 
+from cablerouting import empty_node_table, empty_pathway_table, normalize_nodes, normalize_pathways, route_cables
+from pricecatalog import catalog_price
+from rackpacking import PANEL_PORTS, RACK_SIZES, SWITCH_PORTS, allocate_racks
+
 def main():
     st.title("Low Voltage Project Cost Estimator")
     st.write("Enter the details of your low voltage project below to get an estimated cost.")
@@ -40,23 +44,96 @@ def main():
         cable_types[project_type]
     )
     
-    cable_length = st.number_input("Total Cable Length Needed (Feet):", min_value=0, step=50)
-    cost_per_foot = st.number_input("Cost per Foot ($):", min_value=0.0, format="%.2f", step=0.1)
+    cable_method = st.radio("Cable quantities:", ["Enter Totals", "Route on Floor Plan"], horizontal=True)
+    if cable_method == "Enter Totals":
+        cable_length = st.number_input("Total Cable Length Needed (Feet):", min_value=0, step=50)
+        cost_per_foot = st.number_input("Cost per Foot ($):", min_value=0.0, value=catalog_price("Low Voltage", cable_type), format="%.2f", step=0.1)
+    else:
+        st.write("Nodes are closets (MDF/IDF), pathway junctions and devices with X/Y positions in feet. "
+                 f"Devices without a pathway drop to the nearest closet or junction; a blank Cable uses {cable_type}.")
+        nodes_file = st.file_uploader("Choose a nodes CSV", type="csv")
+        pathways_file = st.file_uploader("Choose a pathways CSV", type="csv")
+        nodes = empty_node_table()
+        pathways = empty_pathway_table()
+        try:
+            if nodes_file is not None:
+                nodes = pd.read_csv(nodes_file)
+            if pathways_file is not None:
+                pathways = pd.read_csv(pathways_file)
+        except Exception as e:
+            st.error(f"Error reading file: {str(e)}")
+        nodes = normalize_nodes(st.data_editor(normalize_nodes(nodes), num_rows="dynamic", hide_index=True, use_container_width=True, key="cable_nodes"))
+        pathways = normalize_pathways(st.data_editor(normalize_pathways(pathways), num_rows="dynamic", hide_index=True, use_container_width=True, key="cable_pathways"))
+        slack_ft = st.number_input("Slack per Run for Service Loops and Drops (Feet):", min_value=0.0, value=10.0, format="%.1f", step=1.0)
+        slack_pct = st.slider("Routing Slack (%):", min_value=0, max_value=25, value=5, step=1)
+
+        runs, cable_totals = route_cables(nodes, pathways, cable_type, slack_ft, slack_pct)
+        flagged = runs[runs["Status"] != "OK"]
+        if not flagged.empty:
+            st.warning(f"{len(flagged)} runs exceed their cable's length limit or have no pathway; "
+                       "they need an additional closet.")
+        cable_totals["Cost per Foot ($)"] = [catalog_price("Low Voltage", name) for name in cable_totals["Cable"]]
+        cable_totals = st.data_editor(cable_totals.round(2), disabled=["Cable", "Runs", "Footage (ft)", "Flagged Runs"],
+                                      hide_index=True, use_container_width=True, key="cable_prices")
+        cable_length = round(float(cable_totals["Footage (ft)"].sum()), 2)
+        with st.expander("Runs by Device"):
+            st.dataframe(runs, use_container_width=True)
 
     # Equipment counts based on project type
     st.subheader("Equipment and Terminations")
     
+    rack_equipment_cost = 0.0
+    size_racks = False
+
+    # Routed floor plans count their own devices
+    routed_devices = len(runs) if cable_method == "Route on Floor Plan" else None
+    if routed_devices is not None:
+        st.write(f"Devices routed from the floor plan: **{routed_devices}**")
     if project_type == "Network Cabling":
-        num_drops = st.number_input("Number of Network Drops:", min_value=0, step=1)
-        num_patches = st.number_input("Number of Patch Panels:", min_value=0, step=1)
-        num_racks = st.number_input("Number of Equipment Racks:", min_value=0, step=1)
+        num_drops = routed_devices if routed_devices is not None else st.number_input("Number of Network Drops:", min_value=0, step=1)
+        size_racks = st.checkbox("Size patch panels and racks from the drop count")
+        if not size_racks:
+            num_patches = st.number_input("Number of Patch Panels:", min_value=0, step=1)
+            num_racks = st.number_input("Number of Equipment Racks:", min_value=0, step=1)
+        else:
+            ports_per_panel = st.selectbox("Ports per Patch Panel:", PANEL_PORTS)
+            panel_ru = st.number_input("Patch Panel Height (RU):", min_value=1, value=1 if ports_per_panel == 24 else 2, step=1)
+            switch_ports = st.selectbox("Ports per Switch:", SWITCH_PORTS, index=1)
+            managers_per_panel = st.number_input("Horizontal Cable Managers per Panel:", min_value=0.0, value=1.0, format="%.1f", step=0.5)
+            rack_ru = st.selectbox("Rack Size (RU):", RACK_SIZES)
+            reserved_ru = st.number_input("RU Reserved per Rack (UPS, Shelves):", min_value=0, value=4, step=1)
+            spare_pct = st.slider("Spare Ports for Growth (%):", min_value=0, max_value=50, value=10, step=5)
+
+            # Routed drops are packed per closet; typed drop counts go into a single closet
+            if cable_method == "Route on Floor Plan":
+                drops_by_closet = runs[runs["Closet"] != ""].groupby("Closet").size().to_dict()
+            else:
+                drops_by_closet = {"Closet": num_drops}
+            allocation, elevation = allocate_racks(drops_by_closet, ports_per_panel, switch_ports, rack_ru, reserved_ru,
+                                                   spare_pct, panel_ru, 1, managers_per_panel)
+            num_patches = int(allocation["Panels"].sum())
+            num_racks = int(allocation["Racks"].sum())
+            num_switches = int(allocation["Switches"].sum())
+            num_managers = int(allocation["Managers"].sum())
+            st.write(f"**{num_patches} patch panels, {num_switches} switches and {num_managers} cable managers "
+                     f"in {num_racks} racks.**")
+            st.dataframe(allocation, use_container_width=True)
+            with st.expander("Rack Elevations"):
+                st.dataframe(elevation, use_container_width=True)
+
+            cost_per_panel = st.number_input("Cost per Patch Panel ($):", min_value=0.0, value=catalog_price("Low Voltage", f"{ports_per_panel}-Port Patch Panel"), format="%.2f", step=5.0)
+            cost_per_switch = st.number_input("Cost per Switch ($):", min_value=0.0, value=catalog_price("Low Voltage", f"{switch_ports}-Port Switch"), format="%.2f", step=10.0)
+            cost_per_manager = st.number_input("Cost per Cable Manager ($):", min_value=0.0, value=catalog_price("Low Voltage", "Cable Manager"), format="%.2f", step=5.0)
+            cost_per_rack = st.number_input("Cost per Rack ($):", min_value=0.0, value=catalog_price("Low Voltage", f"{rack_ru}U Rack"), format="%.2f", step=10.0)
+            rack_equipment_cost = (num_patches * cost_per_panel + num_switches * cost_per_switch
+                                   + num_managers * cost_per_manager + num_racks * cost_per_rack)
     elif project_type == "Security Cameras":
-        num_cameras = st.number_input("Number of Cameras:", min_value=0, step=1)
+        num_cameras = routed_devices if routed_devices is not None else st.number_input("Number of Cameras:", min_value=0, step=1)
         num_nvr = st.number_input("Number of NVR/DVR Units:", min_value=0, step=1)
         num_monitors = st.number_input("Number of Monitors:", min_value=0, step=1)
     elif project_type == "Access Control":
         num_doors = st.number_input("Number of Doors:", min_value=0, step=1)
-        num_readers = st.number_input("Number of Card Readers:", min_value=0, step=1)
+        num_readers = routed_devices if routed_devices is not None else st.number_input("Number of Card Readers:", min_value=0, step=1)
         num_controllers = st.number_input("Number of Controllers:", min_value=0, step=1)
     
     # Common equipment costs
@@ -91,8 +168,11 @@ def main():
 
     if st.button("Calculate Total Cost"):
         # Calculate material costs
-        total_cable_cost = cable_length * cost_per_foot
-        total_materials = (total_cable_cost + equipment_cost + connector_cost + 
+        if cable_method == "Enter Totals":
+            total_cable_cost = cable_length * cost_per_foot
+        else:
+            total_cable_cost = float((cable_totals["Footage (ft)"] * cable_totals["Cost per Foot ($)"].fillna(0)).sum())
+        total_materials = (total_cable_cost + equipment_cost + rack_equipment_cost + connector_cost + 
                          mounting_hardware + cable_management + misc_materials)
 
         # Calculate labor costs
@@ -164,6 +244,16 @@ def main():
                 round(total_cost, 2)
             ]
         })
+        if size_racks:
+            summary = pd.concat([summary, pd.DataFrame({
+                "Parameter": ["Patch Panels", "Switches", "Cable Managers", "Racks", "Panel and Rack Equipment ($)"],
+                "Value": [num_patches, num_switches, num_managers, num_racks, round(rack_equipment_cost, 2)],
+            })], ignore_index=True)
+        if cable_method == "Route on Floor Plan":
+            summary = pd.concat([summary, pd.DataFrame({
+                "Parameter": ["Routed Devices", "Runs Needing Another Closet"],
+                "Value": [routed_devices, len(flagged)],
+            })], ignore_index=True)
 
         # Display project summary
         st.subheader("Project Summary and Cost Breakdown")
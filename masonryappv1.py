@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
 
+from crewoptimizer import optimize_crew
+from masonrytakeoff import BOND_FACTORS, UNIT_SIZES, empty_wall_table, masonry_materials, normalize_walls, wall_takeoff
+from pricecatalog import catalog_price
+
 def main():
     st.title("Comprehensive Masonry Project Cost Estimator")
     st.write("Enter the details of your masonry project below to get an estimated cost.")
@@ -19,21 +23,54 @@ def main():
 
     # Material Inputs
     st.subheader("Materials")
-    
+    quantity_method = st.radio("Material quantities:", ["Enter Quantities", "Wall Takeoff"], horizontal=True)
+    num_blocks = 0
+    cost_per_block = 0.0
+    if quantity_method == "Wall Takeoff":
+        st.write(f"Upload a CSV of walls or edit the table below. Units: {', '.join(UNIT_SIZES)}. "
+                 f"Bonds: {', '.join(BOND_FACTORS)}.")
+        uploaded_file = st.file_uploader("Choose a wall table CSV", type="csv")
+        walls = empty_wall_table()
+        if uploaded_file is not None:
+            try:
+                walls = normalize_walls(pd.read_csv(uploaded_file))
+            except Exception as e:
+                st.error(f"Error reading file: {str(e)}")
+        walls = normalize_walls(st.data_editor(walls, num_rows="dynamic", hide_index=True, use_container_width=True, key="masonry_wall_table"))
+        unit_waste = st.slider("Unit Waste (%):", min_value=0, max_value=20, value=5, step=1)
+        mortar_waste = st.slider("Mortar Waste (%):", min_value=0, max_value=50, value=10, step=1)
+
+        takeoff_materials = masonry_materials(walls, wall_takeoff(walls), unit_waste, mortar_waste)
+        units = takeoff_materials.set_index("Unit")["Units with Waste"]
+        num_bricks = int(units[units.index.str.endswith("Brick")].sum())
+        num_blocks = int(units[units.index.str.startswith("CMU")].sum())
+        stone_area = round(float(takeoff_materials.loc[takeoff_materials["Unit"] == "Stone Veneer", "Net Area (sq ft)"].sum()), 2)
+        mortar_bags = int(takeoff_materials["Mortar Bags"].sum())
+        st.write(f"**{num_bricks} bricks, {num_blocks} blocks, {stone_area} sq ft of stone and {mortar_bags} bags of mortar.**")
+        st.dataframe(takeoff_materials.round(2), use_container_width=True)
+
     # Bricklaying Materials
-    num_bricks = st.number_input("Number of Bricks Needed:", min_value=0, step=1)
-    cost_per_brick = st.number_input("Cost per Brick ($):", min_value=0.0, format="%.2f", step=0.1)
+    if quantity_method == "Enter Quantities":
+        num_bricks = st.number_input("Number of Bricks Needed:", min_value=0, step=1)
+    cost_per_brick = st.number_input("Cost per Brick ($):", min_value=0.0, value=catalog_price("Masonry", "Brick"), format="%.2f", step=0.1)
+    if quantity_method == "Wall Takeoff":
+        cost_per_block = st.number_input("Cost per Concrete Block ($):", min_value=0.0, value=catalog_price("Masonry", "CMU Block"), format="%.2f", step=0.1)
 
     # Stone Masonry Materials
-    stone_area = st.number_input("Total Area of Stone Masonry (Square Feet):", min_value=0, step=1)
-    cost_per_sqft_stone = st.number_input("Cost per Square Foot of Stone ($):", min_value=0.0, format="%.2f", step=0.1)
+    if quantity_method == "Enter Quantities":
+        stone_area = st.number_input("Total Area of Stone Masonry (Square Feet):", min_value=0, step=1)
+    cost_per_sqft_stone = st.number_input("Cost per Square Foot of Stone ($):", min_value=0.0, value=catalog_price("Masonry", "Stone"), format="%.2f", step=0.1)
 
     # Concrete Finishing and Cement Masonry Materials
     concrete_volume = st.number_input("Volume of Concrete Needed (Cubic Yards):", min_value=0.0, format="%.2f", step=0.1)
-    cost_per_cubic_yard = st.number_input("Cost per Cubic Yard of Concrete ($):", min_value=0.0, format="%.2f", step=10.0)
+    cost_per_cubic_yard = st.number_input("Cost per Cubic Yard of Concrete ($):", min_value=0.0, value=catalog_price("Masonry", "Concrete"), format="%.2f", step=10.0)
 
     rebar_cost = st.number_input("Cost of Rebar and Reinforcement Materials ($):", min_value=0.0, format="%.2f", step=10.0)
-    mortar_cost = st.number_input("Cost of Mortar/Cement ($):", min_value=0.0, format="%.2f", step=10.0)
+    if quantity_method == "Enter Quantities":
+        mortar_cost = st.number_input("Cost of Mortar/Cement ($):", min_value=0.0, format="%.2f", step=10.0)
+    else:
+        cost_per_mortar_bag = st.number_input("Cost per Bag of Mortar ($):", min_value=0.0, value=catalog_price("Masonry", "Mortar Bag"), format="%.2f", step=0.5)
+        mortar_cost = mortar_bags * cost_per_mortar_bag
 
     # Additional Materials
     st.subheader("Additional Materials")
@@ -51,6 +88,44 @@ def main():
     hours_per_helper = st.number_input("Hours per Helper:", min_value=0.0, format="%.2f", step=0.5)
     hourly_rate_helper = st.number_input("Hourly Rate per Helper ($):", min_value=0.0, format="%.2f", step=0.5)
 
+    # Crew Optimizer; paid hours differ from hours worked only when it schedules overtime
+    equipment_rental_cost = 0.0
+    paid_hours_per_mason, paid_hours_per_helper = hours_per_mason, hours_per_helper
+    with st.expander("Crew Optimizer"):
+        use_crew_optimizer = st.checkbox("Size the crew from total labor hours and a deadline")
+        if use_crew_optimizer:
+            total_labor_hours = st.number_input("Total Mason Labor Hours Required:", min_value=0.0, format="%.2f", step=8.0)
+            deadline_days = st.number_input("Deadline (Working Days):", min_value=1, step=1)
+            shift_hours = st.multiselect("Shift Lengths to Consider (Hours):", [8.0, 10.0, 12.0], default=[8.0])
+            max_masons = st.number_input("Maximum Number of Masons:", min_value=1, value=10, step=1)
+            max_helpers_per_mason = st.number_input("Maximum Helpers per Mason:", min_value=0.0, value=2.0, format="%.1f", step=0.5)
+            helper_productivity = st.slider("Helper Productivity (% of a Mason):", min_value=0, max_value=100, value=50, step=5)
+            equipment_cost_per_day = st.number_input("Equipment Rental Cost per Day ($):", min_value=0.0, format="%.2f", step=10.0)
+
+            crews = optimize_crew(
+                total_labor_hours, deadline_days, hourly_rate_mason, hourly_rate_helper,
+                equipment_cost_per_day=equipment_cost_per_day,
+                shift_hours=shift_hours or [8.0],
+                max_leads=max_masons,
+                max_helpers=int(max_masons * max_helpers_per_mason),
+                max_helpers_per_lead=max_helpers_per_mason,
+                helper_productivity=helper_productivity / 100,
+            )
+            if crews.empty:
+                st.warning("No crew within these limits meets the deadline; using the crew entered above.")
+            else:
+                best = crews.iloc[0]
+                st.write(f"**Cheapest crew: {int(best['Leads'])} masons and {int(best['Helpers'])} helpers working "
+                         f"{best['Hours per Day']:g}-hour days for {int(best['Days'])} days.**")
+                st.dataframe(crews.head(10), width=700)
+
+                # The optimized crew replaces the labor inputs above
+                num_masons = int(best["Leads"])
+                num_helpers = int(best["Helpers"])
+                hours_per_mason = hours_per_helper = float(best["Worked Hours per Worker"])
+                paid_hours_per_mason = paid_hours_per_helper = float(best["Paid Hours per Worker"])
+                equipment_rental_cost = float(best["Equipment Cost ($)"])
+
     # Permits and Inspections
     st.subheader("Permits and Inspections")
     permit_cost = st.number_input("Permit Costs ($):", min_value=0.0, format="%.2f", step=10.0)
@@ -64,17 +139,18 @@ def main():
         # Calculate material costs
         total_brick_cost = num_bricks * cost_per_brick
         total_stone_cost = stone_area * cost_per_sqft_stone
+        total_block_cost = num_blocks * cost_per_block
         total_concrete_cost = concrete_volume * cost_per_cubic_yard
-        total_masonry_materials = (total_brick_cost + total_stone_cost + 
+        total_masonry_materials = (total_brick_cost + total_block_cost + total_stone_cost + 
                                    total_concrete_cost + rebar_cost + mortar_cost +
                                    formwork_cost + gravel_base_cost + misc_materials)
 
         # Calculate labor costs
         total_mason_hours = num_masons * hours_per_mason
-        total_mason_cost = total_mason_hours * hourly_rate_mason
+        total_mason_cost = num_masons * paid_hours_per_mason * hourly_rate_mason
 
         total_helper_hours = num_helpers * hours_per_helper
-        total_helper_cost = total_helper_hours * hourly_rate_helper
+        total_helper_cost = num_helpers * paid_hours_per_helper * hourly_rate_helper
 
         total_labor_cost = total_mason_cost + total_helper_cost
 
@@ -82,7 +158,7 @@ def main():
         total_permit_inspect = permit_cost + inspection_cost
 
         # Calculate subtotal
-        subtotal = total_masonry_materials + total_labor_cost + total_permit_inspect
+        subtotal = total_masonry_materials + total_labor_cost + equipment_rental_cost + total_permit_inspect
 
         # Calculate markup and contingency
         markup_amount = subtotal * (markup_percentage / 100)
@@ -105,6 +181,7 @@ def main():
                 "Total Helper Hours",
                 "Material Costs ($)",
                 "Labor Costs ($)",
+                "Equipment Rental ($)",
                 "Permits and Inspections ($)",
                 "Subtotal ($)",
                 f"Markup ({markup_percentage}%) ($)",
@@ -123,6 +200,7 @@ def main():
                 total_helper_hours,
                 round(total_masonry_materials, 2),
                 round(total_labor_cost, 2),
+                round(equipment_rental_cost, 2),
                 round(total_permit_inspect, 2),
                 round(subtotal, 2),
                 round(markup_amount, 2),
@@ -130,6 +208,11 @@ def main():
                 round(total_cost, 2)
             ]
         })
+        if quantity_method == "Wall Takeoff":
+            summary = pd.concat([summary, pd.DataFrame({
+                "Parameter": ["Total Number of Blocks", "Mortar Bags", "Walls in Takeoff"],
+                "Value": [num_blocks, mortar_bags, int(walls["Quantity"].sum())],
+            })], ignore_index=True)
 
         # Display project summary
         st.subheader("Project Summary and Cost Breakdown")
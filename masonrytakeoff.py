@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+
+from estimatecache import LRUCache
+
+# Unit dimensions as (length, height, depth) in inches; veneer stone is set by area
+UNIT_SIZES = {
+    "Modular Brick": (7.625, 2.25, 3.625),
+    "Standard Brick": (8.0, 2.25, 3.625),
+    "Queen Brick": (7.625, 2.75, 2.75),
+    "King Brick": (9.625, 2.625, 2.75),
+    "CMU 4x8x16": (15.625, 7.625, 3.625),
+    "CMU 6x8x16": (15.625, 7.625, 5.625),
+    "CMU 8x8x16": (15.625, 7.625, 7.625),
+    "Stone Veneer": (0.0, 0.0, 0.0),
+}
+
+# Extra units for header courses tying wythes together, as a multiple of a running-bond face
+BOND_FACTORS = {
+    "Running": 1.0,
+    "Stack": 1.0,
+    "Common (headers every 6th course)": 7 / 6,
+    "Flemish": 4 / 3,
+    "English": 3 / 2,
+}
+
+# Columns of the wall table, with the value used for new or missing entries
+WALL_COLUMNS = {
+    "Wall": "",
+    "Length (ft)": 0.0,
+    "Height (ft)": 8.0,
+    "Quantity": 1,
+    "Openings": 0,
+    "Opening Width (ft)": 3.0,
+    "Opening Height (ft)": 4.0,
+    "Unit": "Modular Brick",
+    "Bond": "Running",
+    "Wythes": 1,
+    "Joint (in)": 0.375,
+}
+
+TAKEOFF_COLUMNS = ["Net Area (sq ft)", "Units per Sq Ft", "Units", "Mortar (cu ft)"]
+
+# Columns that decide a wall's takeoff; walls matching on all of them share one result
+SIGNATURE_COLUMNS = [column for column in WALL_COLUMNS if column not in ("Wall", "Quantity")]
+
+# Yield of one 80 lb bag of premixed mortar
+MORTAR_CUFT_PER_BAG = 0.67
+
+# Identical wall signatures are computed once per process
+WALL_TAKEOFF_CACHE = LRUCache(max_entries=4096)
+
+
+def empty_wall_table(num_walls=4):
+    """Starter wall table for the data editor"""
+    walls = pd.DataFrame([WALL_COLUMNS] * num_walls)
+    walls["Wall"] = [f"Wall {i + 1}" for i in range(num_walls)]
+    return walls
+
+
+def normalize_walls(walls):
+    """Fill missing columns and values so uploaded or edited tables compute cleanly"""
+    walls = walls.copy()
+    for column, default in WALL_COLUMNS.items():
+        if column not in walls.columns:
+            walls[column] = default
+        if isinstance(default, str):
+            walls[column] = walls[column].fillna(default).astype(str).str.strip()
+        else:
+            walls[column] = pd.to_numeric(walls[column], errors="coerce").fillna(default).clip(lower=0)
+    walls["Unit"] = walls["Unit"].where(walls["Unit"].isin(list(UNIT_SIZES)), "Modular Brick")
+    walls["Bond"] = walls["Bond"].where(walls["Bond"].isin(list(BOND_FACTORS)), "Running")
+    for column in ["Quantity", "Openings", "Wythes"]:
+        walls[column] = walls[column].astype(int)
+    return walls[list(WALL_COLUMNS)].reset_index(drop=True)
+
+
+def compute_walls(walls):
+    """Vectorized net area, unit count and mortar volume for a single wall of each row"""
+    gross_area = walls["Length (ft)"].to_numpy(dtype=float) * walls["Height (ft)"].to_numpy(dtype=float)
+    opening_area = (walls["Openings"].to_numpy(dtype=float) * walls["Opening Width (ft)"].to_numpy(dtype=float)
+                    * walls["Opening Height (ft)"].to_numpy(dtype=float))
+    net_area = np.maximum(gross_area - opening_area, 0.0)
+
+    dims = np.array([UNIT_SIZES[unit] for unit in walls["Unit"]]).reshape(-1, 3)
+    unit_length, unit_height, unit_depth = dims[:, 0], dims[:, 1], dims[:, 2]
+    joint = walls["Joint (in)"].to_numpy(dtype=float)
+    wythes = walls["Wythes"].to_numpy(dtype=float)
+    bond = walls["Bond"].map(BOND_FACTORS).to_numpy(dtype=float)
+    is_unit = unit_length > 0
+
+    # Each unit occupies its face plus one bed and one head joint
+    with np.errstate(divide="ignore", invalid="ignore"):
+        face_per_unit = np.where(is_unit, 144 / ((unit_length + joint) * (unit_height + joint)), 0.0)
+    units_per_sqft = face_per_unit * bond * wythes
+    units = np.ceil(np.maximum(net_area * units_per_sqft - 1e-9, 0.0))
+
+    # Bed joint under the unit and its head joint, through the unit's depth; veneer stone
+    # is set in a bed as thick as the joint
+    mortar_per_unit = joint * unit_depth * (unit_length + joint + unit_height) / 1728
+    mortar = np.where(is_unit, units * mortar_per_unit, net_area * joint / 12 * wythes)
+
+    return pd.DataFrame(
+        np.column_stack([net_area, units_per_sqft, units, mortar]),
+        columns=TAKEOFF_COLUMNS,
+        index=walls.index,
+    )
+
+
+def wall_takeoff(walls, cache=WALL_TAKEOFF_CACHE):
+    """Per-wall takeoff, computing each distinct wall signature once and memoizing it"""
+    signatures = pd.Series(list(walls[SIGNATURE_COLUMNS].itertuples(index=False, name=None)), dtype=object)
+    codes, uniques = pd.factorize(signatures)
+    results = np.zeros((len(uniques), len(TAKEOFF_COLUMNS)))
+
+    missing = []
+    for i, signature in enumerate(uniques):
+        cached = cache.get(signature)
+        if cached is None:
+            missing.append(i)
+        else:
+            results[i] = cached
+    if missing:
+        computed = compute_walls(pd.DataFrame([uniques[i] for i in missing], columns=SIGNATURE_COLUMNS)).to_numpy()
+        results[missing] = computed
+        for i, row in zip(missing, computed):
+            cache.put(uniques[i], row)
+
+    return pd.DataFrame(results[codes] if len(codes) else np.zeros((0, len(TAKEOFF_COLUMNS))),
+                        columns=TAKEOFF_COLUMNS, index=walls.index)
+
+
+def masonry_materials(walls, takeoff, unit_waste_pct=5.0, mortar_waste_pct=10.0):
+    """Roll the wall takeoff up by unit type with waste, mortar volume and mortar bags"""
+    quantity = walls["Quantity"].to_numpy(dtype=float)
+    totals = pd.DataFrame({
+        "Unit": walls["Unit"].to_numpy(),
+        "Net Area (sq ft)": takeoff["Net Area (sq ft)"].to_numpy() * quantity,
+        "Units": takeoff["Units"].to_numpy() * quantity,
+        "Mortar (cu ft)": takeoff["Mortar (cu ft)"].to_numpy() * quantity,
+    }).groupby("Unit", sort=False, as_index=False).sum()
+    totals["Units with Waste"] = np.ceil(totals["Units"] * (1 + unit_waste_pct / 100) - 1e-9).astype(int)
+    totals["Mortar (cu ft)"] = totals["Mortar (cu ft)"] * (1 + mortar_waste_pct / 100)
+    totals["Mortar Bags"] = np.ceil(totals["Mortar (cu ft)"] / MORTAR_CUFT_PER_BAG - 1e-9).astype(int)
+    return totals[totals["Net Area (sq ft)"] > 0].reset_index(drop=True)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+
+def parent_index(names, parents):
+    """Row number of each row's parent by name, -1 for roots and unknown names"""
+    index = pd.Series(np.arange(len(names)), index=names)
+    return pd.Series(parents).map(index).fillna(-1).to_numpy(dtype=int)
+
+
+def unknown_parents(names, parents):
+    """True for rows whose Parent is filled in but names no row; parent_index makes these roots"""
+    parents = pd.Series(parents).fillna("").astype(str).str.strip()
+    return ((parents != "") & ~parents.isin(set(names))).to_numpy()
+
+
+def below(flags, parent, order):
+    """True for every node under a flagged node, not counting the flagged node itself"""
+    return accumulate_downstream(flags, parent, order) - flags > 0
+
+
+def tree_order(parent):
+    """Breadth-first order of a forest given each node's parent row (-1 for roots)
+
+    Parents always come before their children, so walking the order backwards
+    is a post-order pass. Nodes on a loop, or hanging from one, never appear.
+    """
+    children = [[] for _ in range(len(parent))]
+    order = []
+    for child, up in enumerate(parent.tolist()):
+        if up < 0:
+            order.append(child)
+        else:
+            children[up].append(child)
+    for node in order:
+        order.extend(children[node])
+    return np.array(order, dtype=int)
+
+
+def accumulate_upstream(values, parent, order):
+    """Each node's value plus everything below it, in one post-order pass; works on 1-D or 2-D values"""
+    totals = np.array(values, dtype=float, copy=True)
+    for node in order[::-1].tolist():
+        up = parent[node]
+        if up >= 0:
+            totals[up] += totals[node]
+    return totals
+
+
+def accumulate_downstream(values, parent, order):
+    """Each node's value plus everything between it and its root, in one pass from the roots"""
+    totals = np.array(values, dtype=float, copy=True)
+    for node in order.tolist():
+        up = parent[node]
+        if up >= 0:
+            totals[node] += totals[up]
+    return totals
+
+
+def maximum_upstream(values, parent, order):
+    """Each node's value raised to the largest value anywhere below it, in one post-order pass"""
+    totals = np.array(values, copy=True)
+    for node in order[::-1].tolist():
+        up = parent[node]
+        if up >= 0 and totals[node] > totals[up]:
+            totals[up] = totals[node]
+    return totals
@@ -1,23 +1,126 @@
 import streamlit as st
 import pandas as pd
 
+from paintingtakeoff import describe_pack, empty_room_table, normalize_rooms, pack_containers, update_takeoff
+from pricecatalog import catalog_price
+
+# Inputs the composite project estimator collects for line_items()
+MODEL_INPUTS = {
+    "room_length": ("Room Length (feet)", 0.0),
+    "room_width": ("Room Width (feet)", 0.0),
+    "ceiling_height": ("Ceiling Height (feet)", 0.0),
+    "window_count": ("Number of Windows", 0),
+    "avg_window_size": ("Average Window Size (sq ft)", 0.0),
+    "door_count": ("Number of Doors", 0),
+    "avg_door_size": ("Average Door Size (sq ft)", 0.0),
+    "coats": ("Number of Coats", 2),
+    "paint_price_per_gallon": ("Paint Price per Gallon ($)", 0.0),
+    "paint_price_per_bucket": ("Paint Price per 5-Gallon Bucket ($)", 0.0),
+    "coverage_per_gallon": ("Paint Coverage per Gallon (sq ft)", 400.0),
+    "primer_price_per_gallon": ("Primer Price per Gallon ($)", 0.0),
+    "primer_price_per_bucket": ("Primer Price per 5-Gallon Bucket ($)", 0.0),
+    "primer_coverage": ("Primer Coverage per Gallon (sq ft)", 300.0),
+    "prep_cost": ("Surface Preparation Cost ($)", 0.0),
+    "materials_cost": ("Additional Materials Cost ($)", 0.0),
+    "hours_of_labor": ("Hours of Labor", 0.0),
+    "labor_rate": ("Hourly Labor Rate ($)", 0.0),
+}
+
+# Areas and gallons a room-table takeoff passes in place of single-room dimensions
+TAKEOFF_TOTALS = ["total_wall_area", "ceiling_area", "paintable_area", "total_paint_gallons", "primer_gallons"]
+
+
+def calculate_estimate(inputs):
+    """Quantities, container packs, costs and cost lines for a set of painting inputs
+
+    Areas come from one room's dimensions unless a room-table takeoff passes
+    its TAKEOFF_TOTALS. A primer coverage of 0 means no primer. Paint and primer
+    are bought as the cheapest mix of gallons and 5-gallon buckets. Lines are
+    (phase, item, quantity, unit cost) and are what the composite estimator prices.
+    """
+    if "paintable_area" in inputs:
+        estimate = {name: inputs[name] for name in TAKEOFF_TOTALS}
+    else:
+        total_wall_area = 2 * (inputs["room_length"] + inputs["room_width"]) * inputs["ceiling_height"]
+        ceiling_area = inputs["room_length"] * inputs["room_width"]
+        total_deductions = (inputs["window_count"] * inputs["avg_window_size"]) + (inputs["door_count"] * inputs["avg_door_size"])
+        paintable_area = max(total_wall_area - total_deductions, 0)
+        if inputs.get("include_ceiling", False):
+            paintable_area += ceiling_area
+        estimate = {
+            "total_wall_area": total_wall_area,
+            "ceiling_area": ceiling_area,
+            "paintable_area": paintable_area,
+            "total_paint_gallons": paintable_area * inputs["coats"] / inputs["coverage_per_gallon"] if inputs["coverage_per_gallon"] else 0,
+            "primer_gallons": paintable_area / inputs["primer_coverage"] if inputs["primer_coverage"] else 0,
+        }
+
+    # Round to real container sizes using the cheapest mix of gallons and buckets
+    paint_pack, paint_cost = pack_containers(
+        estimate["total_paint_gallons"], {1: inputs["paint_price_per_gallon"], 5: inputs["paint_price_per_bucket"]})
+    primer_pack, primer_cost = pack_containers(
+        estimate["primer_gallons"], {1: inputs["primer_price_per_gallon"], 5: inputs["primer_price_per_bucket"]})
+    labor_cost = inputs["hours_of_labor"] * inputs["labor_rate"]
+
+    estimate.update({
+        "paint_pack": paint_pack,
+        "paint_cost": paint_cost,
+        "primer_pack": primer_pack,
+        "primer_cost": primer_cost,
+        "labor_cost": labor_cost,
+        "total_cost": paint_cost + primer_cost + inputs["prep_cost"] + inputs["materials_cost"] + labor_cost,
+        "lines": [
+            ("Preparation", "Surface Preparation", 1, inputs["prep_cost"]),
+            ("Preparation", "Additional Materials", 1, inputs["materials_cost"]),
+            ("Finish", f"Primer ({describe_pack(primer_pack)})", 1, primer_cost),
+            ("Finish", f"Paint ({describe_pack(paint_pack)})", 1, paint_cost),
+            ("Finish", "Painting Labor (hours)", inputs["hours_of_labor"], inputs["labor_rate"]),
+        ],
+    })
+    return estimate
+
+
+def line_items(inputs):
+    """Cost lines as (phase, item, quantity, unit cost) for the composite estimator"""
+    return calculate_estimate(inputs)["lines"]
+
+
 def main():
     st.title("Comprehensive Painting Cost Estimator")
     st.write("Enter the details of your painting project below to get an estimated cost.")
 
-    # Room Dimensions
-    st.subheader("Room Dimensions")
-    room_length = st.number_input("Enter room length (feet):", min_value=0.0, format="%.2f", step=0.5)
-    room_width = st.number_input("Enter room width (feet):", min_value=0.0, format="%.2f", step=0.5)
-    ceiling_height = st.number_input("Enter ceiling height (feet):", min_value=0.0, format="%.2f", step=0.5)
-    
-    # Deductions
-    st.subheader("Area Deductions")
-    window_count = st.number_input("Number of windows:", min_value=0, step=1)
-    avg_window_size = st.number_input("Average window size (square feet):", min_value=0.0, format="%.2f", step=0.5)
-    door_count = st.number_input("Number of doors:", min_value=0, step=1)
-    avg_door_size = st.number_input("Average door size (square feet):", min_value=0.0, format="%.2f", step=0.5)
-    
+    takeoff_mode = st.radio("Takeoff mode:", ["Single Room", "Room Table"], horizontal=True)
+
+    if takeoff_mode == "Single Room":
+        # Room Dimensions
+        st.subheader("Room Dimensions")
+        room_length = st.number_input("Enter room length (feet):", min_value=0.0, format="%.2f", step=0.5)
+        room_width = st.number_input("Enter room width (feet):", min_value=0.0, format="%.2f", step=0.5)
+        ceiling_height = st.number_input("Enter ceiling height (feet):", min_value=0.0, format="%.2f", step=0.5)
+        include_ceiling = st.checkbox("Include ceiling")
+        coats = st.number_input("Number of coats:", min_value=1, value=2, step=1)
+
+        # Deductions
+        st.subheader("Area Deductions")
+        window_count = st.number_input("Number of windows:", min_value=0, step=1)
+        avg_window_size = st.number_input("Average window size (square feet):", min_value=0.0, format="%.2f", step=0.5)
+        door_count = st.number_input("Number of doors:", min_value=0, step=1)
+        avg_door_size = st.number_input("Average door size (square feet):", min_value=0.0, format="%.2f", step=0.5)
+    else:
+        # Room Table
+        st.subheader("Room Table")
+        st.write("Upload a CSV with one row per room or edit the table below.")
+        # Sets the Primer column for every room not ticked otherwise in the table or upload
+        prime_rooms = st.checkbox("Requires primer (all rooms)")
+        uploaded_file = st.file_uploader("Choose a room table CSV", type="csv")
+        rooms = empty_room_table(primer=prime_rooms)
+        if uploaded_file is not None:
+            try:
+                rooms = normalize_rooms(pd.read_csv(uploaded_file), prime_rooms)
+            except Exception as e:
+                st.error(f"Error reading file: {str(e)}")
+        rooms = normalize_rooms(st.data_editor(rooms, num_rows="dynamic", hide_index=True, use_container_width=True, key="room_table"), prime_rooms)
+
     # Paint Details
     st.subheader("Paint Details")
     paint_type = st.selectbox(
@@ -28,14 +131,19 @@ def main():
         "Select paint finish:",
         ["Flat", "Eggshell", "Satin", "Semi-gloss", "Gloss"]
     )
-    paint_price_per_gallon = st.number_input("Enter paint price per gallon ($):", min_value=0.0, format="%.2f", step=0.5)
+    paint_price_per_gallon = st.number_input("Enter paint price per gallon ($):", min_value=0.0, value=catalog_price("Painting", paint_type), format="%.2f", step=0.5)
+    paint_price_per_bucket = st.number_input("Enter paint price per 5-gallon bucket ($, 0 if not stocked):", min_value=0.0, format="%.2f", step=1.0)
     coverage_per_gallon = st.number_input("Paint coverage per gallon (sq ft):", min_value=0.0, value=400.0, format="%.2f", step=10.0)
     
     # Surface Preparation
     st.subheader("Surface Preparation")
-    needs_primer = st.checkbox("Requires primer")
+    if takeoff_mode == "Single Room":
+        needs_primer = st.checkbox("Requires primer")
+    else:
+        needs_primer = bool(rooms["Primer"].any())
     if needs_primer:
         primer_price_per_gallon = st.number_input("Primer price per gallon ($):", min_value=0.0, format="%.2f", step=0.5)
+        primer_price_per_bucket = st.number_input("Primer price per 5-gallon bucket ($, 0 if not stocked):", min_value=0.0, format="%.2f", step=1.0)
         primer_coverage = st.number_input("Primer coverage per gallon (sq ft):", min_value=0.0, value=300.0, format="%.2f", step=10.0)
     
     surface_prep_options = st.multiselect(
@@ -61,35 +169,61 @@ def main():
     
     # Calculations
     if st.button("Calculate Total Cost"):
-        # Calculate wall area
-        total_wall_area = 2 * (room_length + room_width) * ceiling_height
-        ceiling_area = room_length * room_width
-        
-        # Deduct windows and doors
-        total_deductions = (window_count * avg_window_size) + (door_count * avg_door_size)
-        paintable_area = total_wall_area - total_deductions
-        
-        if st.checkbox("Include ceiling"):
-            paintable_area += ceiling_area
-        
-        # Calculate paint needed
-        coats = 2  # Assuming two coats as standard
-        total_paint_gallons = (paintable_area * coats) / coverage_per_gallon
-        paint_cost = total_paint_gallons * paint_price_per_gallon
-        
-        # Calculate primer if needed
-        primer_cost = 0
-        if needs_primer:
-            primer_gallons = paintable_area / primer_coverage
-            primer_cost = primer_gallons * primer_price_per_gallon
-        
-        # Calculate labor cost
-        labor_cost = 0
-        if labor_type == "Professional":
-            labor_cost = hours_of_labor * labor_rate
-        
-        # Calculate total project cost
-        total_cost = paint_cost + primer_cost + prep_cost + materials_cost + labor_cost
+        inputs = {
+            "paint_price_per_gallon": paint_price_per_gallon,
+            "paint_price_per_bucket": paint_price_per_bucket,
+            "coverage_per_gallon": coverage_per_gallon,
+            "primer_price_per_gallon": primer_price_per_gallon if needs_primer else 0.0,
+            "primer_price_per_bucket": primer_price_per_bucket if needs_primer else 0.0,
+            "primer_coverage": primer_coverage if needs_primer else 0,
+            "prep_cost": prep_cost,
+            "materials_cost": materials_cost,
+            "hours_of_labor": hours_of_labor if labor_type == "Professional" else 0.0,
+            "labor_rate": labor_rate if labor_type == "Professional" else 0.0,
+        }
+        if takeoff_mode == "Single Room":
+            inputs.update({
+                "room_length": room_length,
+                "room_width": room_width,
+                "ceiling_height": ceiling_height,
+                "include_ceiling": include_ceiling,
+                "coats": coats,
+                "window_count": window_count,
+                "avg_window_size": avg_window_size,
+                "door_count": door_count,
+                "avg_door_size": avg_door_size,
+            })
+        else:
+            # Only rooms edited since the last calculation are recomputed
+            takeoff_state, rooms_recomputed = update_takeoff(
+                rooms, coverage_per_gallon, primer_coverage if needs_primer else 0,
+                previous=st.session_state.get("painting_takeoff"),
+            )
+            st.session_state.painting_takeoff = takeoff_state
+            takeoff = takeoff_state[1]
+
+            inputs.update({
+                "total_wall_area": takeoff["Wall Area (sq ft)"].sum(),
+                "ceiling_area": takeoff["Ceiling Area (sq ft)"].sum(),
+                "paintable_area": takeoff["Paintable Area (sq ft)"].sum(),
+                "total_paint_gallons": takeoff["Paint (gallons)"].sum(),
+                "primer_gallons": takeoff["Primer (gallons)"].sum(),
+            })
+            coats = ", ".join(str(int(c)) for c in sorted(rooms["Coats"].unique()))
+
+            st.subheader("Room Takeoff")
+            st.dataframe(pd.concat([rooms[["Room"]], takeoff.round(2)], axis=1), use_container_width=True)
+            st.caption(f"{rooms_recomputed} of {len(rooms)} rooms recomputed")
+
+        estimate = calculate_estimate(inputs)
+        total_wall_area = estimate["total_wall_area"]
+        ceiling_area = estimate["ceiling_area"]
+        paintable_area = estimate["paintable_area"]
+        total_paint_gallons = estimate["total_paint_gallons"]
+        paint_pack, paint_cost = estimate["paint_pack"], estimate["paint_cost"]
+        primer_pack, primer_cost = estimate["primer_pack"], estimate["primer_cost"]
+        labor_cost = estimate["labor_cost"]
+        total_cost = estimate["total_cost"]
 
         # Create summary DataFrame
         input_summary = pd.DataFrame({
@@ -101,6 +235,8 @@ def main():
                 "Paint Finish",
                 "Number of Coats",
                 "Total Paint Needed (gallons)",
+                "Paint Containers",
+                "Primer Containers",
                 "Paint Cost ($)",
                 "Primer Cost ($)",
                 "Surface Preparation Cost ($)",
@@ -116,6 +252,8 @@ def main():
                 paint_finish,
                 coats,
                 round(total_paint_gallons, 2),
+                describe_pack(paint_pack),
+                describe_pack(primer_pack),
                 round(paint_cost, 2),
                 round(primer_cost, 2),
                 round(prep_cost, 2),
@@ -0,0 +1,160 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from tableflags import parse_flags
+
+# Columns of the room table, with the value used for new or missing entries
+ROOM_COLUMNS = {
+    "Room": "",
+    "Length (ft)": 0.0,
+    "Width (ft)": 0.0,
+    "Ceiling Height (ft)": 8.0,
+    "Windows": 0,
+    "Window Size (sq ft)": 15.0,
+    "Doors": 0,
+    "Door Size (sq ft)": 21.0,
+    "Paint Ceiling": False,
+    "Coats": 2,
+    "Primer": False,
+}
+
+TAKEOFF_COLUMNS = [
+    "Wall Area (sq ft)",
+    "Ceiling Area (sq ft)",
+    "Deductions (sq ft)",
+    "Paintable Area (sq ft)",
+    "Paint (gallons)",
+    "Primer (gallons)",
+]
+
+
+def empty_room_table(num_rooms=3, primer=False):
+    """Starter room table for the data editor; primer sets whether rooms start out primed"""
+    rooms = pd.DataFrame([ROOM_COLUMNS] * num_rooms)
+    rooms["Room"] = [f"Room {i + 1}" for i in range(num_rooms)]
+    rooms["Primer"] = primer
+    return rooms
+
+
+def normalize_rooms(rooms, primer=False):
+    """Fill missing columns and values so uploaded or edited tables compute cleanly
+
+    primer is used for rooms whose Primer cell is missing or blank.
+    """
+    rooms = rooms.copy()
+    defaults = dict(ROOM_COLUMNS, Primer=primer)
+    for column, default in defaults.items():
+        if column not in rooms.columns:
+            rooms[column] = default
+        if isinstance(default, bool):
+            rooms[column] = parse_flags(rooms[column], default)
+        elif isinstance(default, str):
+            rooms[column] = rooms[column].fillna("").astype(str)
+        else:
+            rooms[column] = pd.to_numeric(rooms[column], errors="coerce").fillna(default).clip(lower=0)
+    return rooms[list(ROOM_COLUMNS)].reset_index(drop=True)
+
+
+def compute_takeoff(rooms, coverage_per_gallon, primer_coverage):
+    """Vectorized wall, ceiling, deduction and gallon columns for every room"""
+    length = rooms["Length (ft)"].to_numpy(dtype=float)
+    width = rooms["Width (ft)"].to_numpy(dtype=float)
+    height = rooms["Ceiling Height (ft)"].to_numpy(dtype=float)
+
+    wall_area = 2 * (length + width) * height
+    ceiling_area = np.where(rooms["Paint Ceiling"].to_numpy(dtype=bool), length * width, 0.0)
+    deductions = (rooms["Windows"].to_numpy(dtype=float) * rooms["Window Size (sq ft)"].to_numpy(dtype=float)
+                  + rooms["Doors"].to_numpy(dtype=float) * rooms["Door Size (sq ft)"].to_numpy(dtype=float))
+    paintable_area = np.maximum(wall_area - deductions, 0.0) + ceiling_area
+
+    coats = rooms["Coats"].to_numpy(dtype=float)
+    paint_gallons = paintable_area * coats / coverage_per_gallon if coverage_per_gallon else np.zeros_like(paintable_area)
+    primer_rooms = rooms["Primer"].to_numpy(dtype=bool)
+    if primer_coverage:
+        primer_gallons = np.where(primer_rooms, paintable_area / primer_coverage, 0.0)
+    else:
+        primer_gallons = np.zeros_like(paintable_area)
+
+    return pd.DataFrame(
+        np.column_stack([wall_area, ceiling_area, deductions, paintable_area, paint_gallons, primer_gallons]),
+        columns=TAKEOFF_COLUMNS,
+        index=rooms.index,
+    )
+
+
+def update_takeoff(rooms, coverage_per_gallon, primer_coverage, previous=None):
+    """Recompute only rooms whose row changed since the previous takeoff
+
+    previous is the (row hashes, takeoff) pair returned by the last call.
+    """
+    # Coverage changes invalidate every room, so they are folded into each row hash
+    settings = pd.Series([coverage_per_gallon, primer_coverage]).astype(str).str.cat(sep="|")
+    row_hashes = pd.util.hash_pandas_object(rooms.assign(_settings=settings), index=False).to_numpy()
+
+    if previous is None or len(previous[0]) == 0:
+        takeoff = compute_takeoff(rooms, coverage_per_gallon, primer_coverage)
+        return (row_hashes, takeoff), len(rooms)
+
+    previous_hashes, previous_takeoff = previous
+    # Match unchanged rows by content so inserted or deleted rooms do not force a full recompute
+    lookup = pd.Series(np.arange(len(previous_hashes)), index=previous_hashes)
+    lookup = lookup[~lookup.index.duplicated()]
+    matched = lookup.reindex(row_hashes).to_numpy()
+    changed = np.isnan(matched)
+
+    takeoff = pd.DataFrame(np.zeros((len(rooms), len(TAKEOFF_COLUMNS))), columns=TAKEOFF_COLUMNS, index=rooms.index)
+    if (~changed).any():
+        takeoff.iloc[np.flatnonzero(~changed)] = previous_takeoff.to_numpy()[matched[~changed].astype(int)]
+    if changed.any():
+        takeoff.iloc[np.flatnonzero(changed)] = compute_takeoff(
+            rooms.iloc[np.flatnonzero(changed)], coverage_per_gallon, primer_coverage
+        ).to_numpy()
+    return (row_hashes, takeoff), int(changed.sum())
+
+
+def pack_containers(gallons, container_prices):
+    """Cheapest set of containers holding at least the required gallons
+
+    container_prices maps container size in gallons to its price. Returns
+    (counts by size, total cost).
+    """
+    sizes = sorted(size for size, price in container_prices.items() if price > 0)
+    if gallons <= 0 or not sizes:
+        return {}, 0.0
+
+    # Work in the smallest unit any container size divides into (quarts for 0.25 gal)
+    unit = min(sizes)
+    for size in sizes:
+        while abs(size / unit - round(size / unit)) > 1e-9:
+            unit /= 2
+    units = [int(round(size / unit)) for size in sizes]
+    target = math.ceil(gallons / unit - 1e-9)
+
+    # Unbounded covering knapsack: cost[t] is the cheapest way to hold at least t units,
+    # so a 5 gal bucket wins over four single gallons whenever it is cheaper
+    cost = np.full(target + 1, np.inf)
+    choice = np.full(target + 1, -1)
+    cost[0] = 0.0
+    for t in range(1, target + 1):
+        for i, size_units in enumerate(units):
+            candidate = cost[max(t - size_units, 0)] + container_prices[sizes[i]]
+            if candidate < cost[t]:
+                cost[t] = candidate
+                choice[t] = i
+
+    counts = {size: 0 for size in sizes}
+    t = target
+    while t > 0:
+        i = choice[t]
+        counts[sizes[i]] += 1
+        t = max(t - units[i], 0)
+    return {size: count for size, count in counts.items() if count}, float(cost[target])
+
+
+def describe_pack(counts):
+    """Human-readable container list such as '3 x 5 gal, 2 x 1 gal'"""
+    if not counts:
+        return "None"
+    return ", ".join(f"{count} x {size:g} gal" for size, count in sorted(counts.items(), reverse=True))
@@ -0,0 +1,229 @@
+import math
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+PHASE_NAMES = "ABC"
+
+# Service and panel bus ratings stocked, in amps
+SERVICE_SIZES = [100, 125, 150, 200, 225, 400, 600, 800, 1000, 1200]
+
+# Panelboard sizes by number of breaker spaces
+PANEL_SPACES = [12, 16, 20, 24, 30, 32, 40, 42, 54, 60, 66, 72, 84]
+
+# Single-phase panels are 120/240 V with two legs; three-phase panels are 120/208 V
+PANEL_SYSTEMS = {"120/240V Single Phase": 2, "120/208V Three Phase": 3}
+
+LINE_TO_NEUTRAL_VOLTS = 120.0
+
+
+class PanelBalancer:
+    """Greedy phase assignment for panel circuits that rebalances as each circuit is added
+
+    Every circuit lands on the least-loaded phase (or adjacent pair of phases for
+    two-pole circuits). After each addition single-pole circuits are moved or
+    swapped between the heaviest and lightest phases while that narrows the
+    spread by more than tolerance_va, so the panel stays balanced without
+    re-solving from scratch.
+    """
+
+    def __init__(self, num_phases=3, max_moves=50, tolerance_va=50.0):
+        self.num_phases = num_phases
+        self.max_moves = max_moves
+        self.tolerance_va = tolerance_va
+        self.loads = np.zeros(num_phases)
+        self.names = []
+        self.circuits = Counter()
+        self.poles = np.zeros(0, dtype=int)
+        self.va = np.zeros(0)
+        self.first_phase = np.zeros(0, dtype=int)
+
+    def _phases(self, index):
+        return [(self.first_phase[index] + k) % self.num_phases for k in range(self.poles[index])]
+
+    def add(self, name, va, poles=1):
+        """Place a circuit drawing va in total across poles breaker poles"""
+        poles = int(min(max(poles, 1), self.num_phases))
+        share = va / poles
+        # Adjacent phases only: multi-pole breakers span consecutive bus stabs
+        starts = np.arange(self.num_phases) if poles < self.num_phases else np.array([0])
+        spans = (starts[:, None] + np.arange(poles)[None, :]) % self.num_phases
+        peak = (self.loads[spans] + share).max(axis=1)
+        best = int(np.argmin(peak))
+
+        self.names.append(name)
+        self.circuits[(name, va, poles)] += 1
+        self.poles = np.append(self.poles, poles)
+        self.va = np.append(self.va, va)
+        self.first_phase = np.append(self.first_phase, starts[best])
+        self.loads[spans[best]] += share
+        if poles == 1:
+            self._rebalance()
+
+    def _rebalance(self):
+        single = self.poles == 1
+        va = self.va
+        for _ in range(self.max_moves):
+            heavy, light = int(np.argmax(self.loads)), int(np.argmin(self.loads))
+            gap = self.loads[heavy] - self.loads[light]
+            if gap <= self.tolerance_va:
+                return
+            on_heavy = np.flatnonzero(single & (self.first_phase == heavy))
+            on_light = np.flatnonzero(single & (self.first_phase == light))
+            if len(on_heavy) == 0:
+                return
+
+            # Moving x from heavy to light leaves a gap of |gap - 2x|; swapping x and y leaves |gap - 2(x - y)|
+            moves = np.abs(gap - 2 * va[on_heavy])
+            best_move = int(np.argmin(moves))
+            best, swap_with = moves[best_move], None
+            if len(on_light):
+                # The ideal partner for x is x - gap / 2; the nearest light load either side of it is the best swap
+                order = np.argsort(va[on_light])
+                light_va = va[on_light][order]
+                target = va[on_heavy] - gap / 2
+                right = np.clip(np.searchsorted(light_va, target), 0, len(light_va) - 1)
+                left = np.maximum(right - 1, 0)
+                partner = np.where(np.abs(light_va[left] - target) < np.abs(light_va[right] - target), left, right)
+                swaps = np.abs(gap - 2 * (va[on_heavy] - light_va[partner]))
+                i = int(np.argmin(swaps))
+                if swaps[i] < best:
+                    best, best_move, swap_with = swaps[i], i, on_light[order[partner[i]]]
+            if best >= gap - self.tolerance_va:
+                return
+
+            mover = on_heavy[best_move]
+            self.first_phase[mover] = light
+            self.loads[heavy] -= va[mover]
+            self.loads[light] += va[mover]
+            if swap_with is not None:
+                self.first_phase[swap_with] = heavy
+                self.loads[light] -= va[swap_with]
+                self.loads[heavy] += va[swap_with]
+
+    def positions(self, indices=None):
+        """Breaker spaces for each circuit; odd spaces on the left, even on the right, rows cycling through the phases
+
+        Only the circuits in indices are laid out, as one panel; the others get None.
+        """
+        taken = set()
+        spaces_by_circuit = [None] * len(self.names)
+        indices = np.arange(len(self.names)) if indices is None else np.asarray(indices, dtype=int)
+        # Scanning resumes where the last breaker of the same shape was placed, since every row before it is full
+        next_row = {}
+        # Multi-pole breakers first, so they get contiguous rows before single poles fill the gaps
+        for index in indices[np.argsort(-self.poles[indices], kind="stable")].tolist():
+            poles, phase = int(self.poles[index]), int(self.first_phase[index])
+            row = next_row.get((poles, phase), phase)
+            while True:
+                rows = range(row, row + poles)
+                for side in (1, 2):
+                    spaces = [2 * r + side for r in rows]
+                    if not taken.intersection(spaces):
+                        break
+                else:
+                    row += self.num_phases
+                    continue
+                break
+            next_row[(poles, phase)] = row
+            taken.update(spaces)
+            spaces_by_circuit[index] = spaces
+        return spaces_by_circuit
+
+    def layout(self, panels=1):
+        """Panel number and breaker spaces for each circuit, dealing circuits round-robin over the panels"""
+        panel_of = np.arange(len(self.names)) % panels
+        spaces = [None] * len(self.names)
+        for panel in range(panels):
+            for index, circuit_spaces in enumerate(self.positions(np.flatnonzero(panel_of == panel))):
+                if circuit_spaces is not None:
+                    spaces[index] = circuit_spaces
+        return panel_of, spaces
+
+    def schedule(self, panels=1):
+        """Panel schedule rows with panel, phases, spaces and the load on each phase"""
+        panel_of, spaces = self.layout(panels)
+        rows = []
+        for index, name in enumerate(self.names):
+            phases = self._phases(index)
+            row = {
+                "Circuit": name,
+                "Panel": int(panel_of[index]) + 1,
+                "Poles": self.poles[index],
+                "Phases": "-".join(PHASE_NAMES[p] for p in phases),
+                "Spaces": ", ".join(str(s) for s in spaces[index]),
+            }
+            for p in range(self.num_phases):
+                row[f"Phase {PHASE_NAMES[p]} (VA)"] = round(self.va[index] / self.poles[index], 1) if p in phases else 0.0
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+def balance_panel(circuits, num_phases=3, demand_factor_pct=100.0, spare_pct=20.0, balancer=None):
+    """Assign a sized circuit schedule to phases and spaces, then size the service from the heaviest phase
+
+    Circuits at line-to-neutral voltage take one pole; higher single-phase
+    voltages take two and three-phase circuits take three. Loads are added
+    largest first. Continuous loads count at 125% before the demand factor, and
+    the service must carry the heaviest phase at 120 V. Passing the balancer
+    from a previous result adds only circuits that are new since then; it is
+    rebuilt when any earlier circuit changed or was removed. Panels are sized
+    from their highest occupied space plus spares. When the load or the spaces
+    outgrow the largest sizes stocked, the status says so and the circuits are
+    split over several panels.
+    """
+    three_phase = circuits["Phase"].to_numpy(dtype=float) >= 3
+    voltage = circuits["Voltage"].to_numpy(dtype=float)
+    load = circuits["Load (A)"].to_numpy(dtype=float)
+    va = load * voltage * np.where(three_phase, np.sqrt(3), 1.0)
+    poles = np.where(three_phase, 3, np.where(voltage > LINE_TO_NEUTRAL_VOLTS * 1.1, 2, 1))
+    poles = np.minimum(poles, num_phases)
+    continuous = circuits["Continuous"].to_numpy(dtype=bool)
+    demand_va = va * np.where(continuous, 1.25, 1.0) * demand_factor_pct / 100
+
+    wanted = Counter(zip(circuits["Circuit"].tolist(), demand_va.tolist(), poles.tolist()))
+    if balancer is None or balancer.num_phases != num_phases or balancer.circuits - wanted:
+        balancer = PanelBalancer(num_phases)
+    for (name, circuit_va, circuit_poles), count in sorted((wanted - balancer.circuits).items(), key=lambda item: -item[0][1]):
+        for _ in range(count):
+            balancer.add(name, circuit_va, circuit_poles)
+
+    loads = balancer.loads
+    average = loads.mean() if len(loads) else 0.0
+    imbalance_pct = (loads.max() - average) / average * 100 if average > 0 else 0.0
+    demand_amps = loads.max() / LINE_TO_NEUTRAL_VOLTS if len(loads) else 0.0
+    service = next((size for size in SERVICE_SIZES if size >= demand_amps - 1e-9), None)
+    service_status = "OK" if service is not None else f"Demand exceeds the largest {SERVICE_SIZES[-1]} A service"
+
+    # Phase rows leave gaps, so each panel must reach its highest occupied space plus its spares
+    used = int(balancer.poles.sum())
+    panels = max(math.ceil(used * (1 + spare_pct / 100) / PANEL_SPACES[-1]), 1)
+    while True:
+        panel_of, layout = balancer.layout(panels)
+        needed = 0
+        for panel in range(panels):
+            members = np.flatnonzero(panel_of == panel)
+            highest = max((max(layout[index]) for index in members), default=0)
+            spares = math.ceil(balancer.poles[members].sum() * spare_pct / 100)
+            needed = max(needed, highest + spares)
+        # Past the largest panelboard the circuits are dealt over one more panel
+        if needed <= PANEL_SPACES[-1] or panels >= len(balancer.names):
+            break
+        panels += 1
+    spaces = next((size for size in PANEL_SPACES if size >= needed), PANEL_SPACES[-1])
+    schedule = balancer.schedule(panels)
+    phases = pd.DataFrame({"Phase": list(PHASE_NAMES[:num_phases]), "Demand (VA)": loads.round(0),
+                           "Current (A)": (loads / LINE_TO_NEUTRAL_VOLTS).round(1)})
+    return {
+        "schedule": schedule,
+        "phases": phases,
+        "imbalance_pct": imbalance_pct,
+        "demand_amps": demand_amps,
+        "service_amps": service if service is not None else SERVICE_SIZES[-1],
+        "service_status": service_status,
+        "spaces_used": used,
+        "panel_spaces": spaces,
+        "panels": panels,
+        "balancer": balancer,
+    }
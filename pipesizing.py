@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+from networks import accumulate_upstream, below, maximum_upstream, parent_index, tree_order, unknown_parents
+
+# Water supply fixture units (flush tank, combined hot and cold) and drainage fixture units per fixture
+FIXTURE_UNITS = {
+    "Lavatory": (1.0, 1.0),
+    "Kitchen Sink": (1.5, 2.0),
+    "Water Closet (Tank)": (2.5, 3.0),
+    "Water Closet (Flushometer)": (10.0, 4.0),
+    "Urinal": (5.0, 4.0),
+    "Bathtub": (4.0, 2.0),
+    "Shower": (2.0, 2.0),
+    "Dishwasher": (1.5, 2.0),
+    "Clothes Washer": (4.0, 3.0),
+    "Drinking Fountain": (0.25, 0.5),
+    "Hose Bibb": (2.5, 0.0),
+    "Floor Drain": (0.0, 2.0),
+}
+
+PIPE_SYSTEMS = ["Supply", "Drain"]
+
+# Pipe segments, with the value used for new or missing entries. Parent is the segment toward
+# the meter or building drain; Fixtures counts the fixtures of the given type served directly.
+PIPE_COLUMNS = {
+    "Segment": "",
+    "Parent": "",
+    "System": "Supply",
+    "Run": "Branch",
+    "Length (ft)": 0.0,
+    "Fixture": "",
+    "Fixtures": 0.0,
+    "Material": "",
+}
+
+DRAIN_RUNS = ["Branch", "Stack", "Building Drain"]
+
+# Hunter's curve for flush-tank systems: supply fixture units to demand in gpm
+DEMAND_WSFU = np.array([0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 25, 30, 40, 50, 60, 80, 100, 120, 140, 160,
+                        180, 200, 250, 300, 400, 500, 750, 1000, 1250, 1500, 2000, 2500, 3000, 4000, 5000], dtype=float)
+DEMAND_GPM = np.array([0, 3.0, 5.0, 6.5, 8.0, 9.4, 10.7, 12.8, 14.6, 17.5, 19.6, 21.5, 23.3, 26.3, 29.1, 32.0,
+                       38.0, 43.5, 48.0, 52.5, 57.0, 61.0, 65.0, 75.0, 85.0, 105.0, 124.0, 170.0, 208.0, 240.0,
+                       267.0, 321.0, 375.0, 432.0, 525.0, 593.0])
+
+# Nominal sizes with a representative inside diameter (in) for supply velocity
+SUPPLY_SIZES = ["1/2", "3/4", "1", "1-1/4", "1-1/2", "2", "2-1/2", "3", "4", "6", "8"]
+SUPPLY_ID = np.array([0.545, 0.785, 1.025, 1.265, 1.505, 1.985, 2.465, 2.945, 3.905, 5.845, 7.725])
+
+# Drainage fixture units each size carries, by kind of run (horizontal branch, stack, building drain at 1/4 in/ft)
+DRAIN_SIZES = ["1-1/2", "2", "2-1/2", "3", "4", "5", "6", "8", "10", "12", "15"]
+DRAIN_CAPACITY = {
+    "Branch": np.array([3, 6, 12, 20, 160, 360, 620, 1400, 2500, 3900, 7000], dtype=float),
+    "Stack": np.array([8, 16, 32, 48, 240, 540, 960, 2200, 3800, 6000, 10400], dtype=float),
+    "Building Drain": np.array([0, 21, 24, 42, 216, 480, 840, 1920, 3500, 5600, 8400], dtype=float),
+}
+# Any drain serving a water closet is at least 3 in
+WATER_CLOSET_MIN_DRAIN = DRAIN_SIZES.index("3")
+
+
+def empty_pipe_table():
+    """Starter supply and drain runs for the data editor"""
+    return pd.DataFrame([
+        {"Segment": "Main", "Parent": "", "System": "Supply", "Run": "Branch", "Length (ft)": 40.0, "Fixture": "", "Fixtures": 0.0, "Material": ""},
+        {"Segment": "Bath", "Parent": "Main", "System": "Supply", "Run": "Branch", "Length (ft)": 15.0, "Fixture": "Water Closet (Tank)", "Fixtures": 1.0, "Material": ""},
+        {"Segment": "Building Drain", "Parent": "", "System": "Drain", "Run": "Building Drain", "Length (ft)": 30.0, "Fixture": "", "Fixtures": 0.0, "Material": ""},
+        {"Segment": "Bath Drain", "Parent": "Building Drain", "System": "Drain", "Run": "Branch", "Length (ft)": 10.0, "Fixture": "Water Closet (Tank)", "Fixtures": 1.0, "Material": ""},
+    ])
+
+
+def normalize_pipes(pipes, default_material="PVC"):
+    """Fill missing columns and values; blank materials take the job's pipe material"""
+    pipes = pipes.copy()
+    for column, default in PIPE_COLUMNS.items():
+        if column not in pipes.columns:
+            pipes[column] = default
+        if isinstance(default, str):
+            pipes[column] = pipes[column].fillna(default).astype(str).str.strip()
+        else:
+            pipes[column] = pd.to_numeric(pipes[column], errors="coerce").fillna(default).clip(lower=0)
+    system = pipes["System"].str.title().replace({"Water": "Supply", "Waste": "Drain", "Dwv": "Drain"})
+    pipes["System"] = system.where(system.isin(PIPE_SYSTEMS), "Supply")
+    run = pipes["Run"].str.title()
+    pipes["Run"] = run.where(run.isin(DRAIN_RUNS), "Branch")
+    pipes["Material"] = pipes["Material"].where(pipes["Material"] != "", default_material)
+    pipes = pipes[pipes["Segment"] != ""].drop_duplicates(subset="Segment")
+    return pipes[list(PIPE_COLUMNS)].reset_index(drop=True)
+
+
+def supply_demand_gpm(wsfu):
+    """Peak demand from supply fixture units along Hunter's curve, extended linearly past its last point"""
+    slope = (DEMAND_GPM[-1] - DEMAND_GPM[-2]) / (DEMAND_WSFU[-1] - DEMAND_WSFU[-2])
+    beyond = DEMAND_GPM[-1] + (wsfu - DEMAND_WSFU[-1]) * slope
+    return np.where(wsfu > DEMAND_WSFU[-1], beyond, np.interp(wsfu, DEMAND_WSFU, DEMAND_GPM))
+
+
+def size_pipes(pipes, max_velocity_fps=8.0):
+    """Fixture units, demand and nominal size for every segment of the supply and drain trees
+
+    Fixture units accumulate from the fixtures toward the meter or building
+    drain in one post-order pass. Supply segments take the smallest size whose
+    velocity at the Hunter's-curve demand is within max_velocity_fps; drain
+    segments take the smallest size whose fixture-unit capacity for the kind of
+    run covers the load, never less than 3 in below a water closet and never
+    smaller than any drain emptying into them.
+    """
+    parent = parent_index(pipes["Segment"], pipes["Parent"])
+    # A segment only drains into or feeds from a segment of its own system
+    system = pipes["System"].to_numpy()
+    crossed = (parent >= 0) & (system[np.maximum(parent, 0)] != system)
+    parent = np.where(crossed, -1, parent)
+    order = tree_order(parent)
+    # A misspelled Parent would otherwise start its own tree and undersize the real main
+    orphan = unknown_parents(pipes["Segment"], pipes["Parent"])
+    connected = np.zeros(len(pipes), dtype=bool)
+    connected[order] = True
+    connected &= ~below((orphan | crossed).astype(float), parent, order)
+
+    units = pipes["Fixture"].map({name: wsfu for name, (wsfu, _) in FIXTURE_UNITS.items()}).fillna(0.0).to_numpy()
+    drainage = pipes["Fixture"].map({name: dfu for name, (_, dfu) in FIXTURE_UNITS.items()}).fillna(0.0).to_numpy()
+    count = pipes["Fixtures"].to_numpy(dtype=float)
+    water_closets = np.where(pipes["Fixture"].str.startswith("Water Closet"), count, 0.0)
+    totals = accumulate_upstream(np.column_stack([units * count, drainage * count, water_closets, count]), parent, order)
+    wsfu, dfu, closets, fixtures = totals.T
+
+    supply = system == "Supply"
+    gpm = np.where(supply, supply_demand_gpm(wsfu), 0.0)
+    # Velocity in fps is 0.4085 x gpm / ID^2; every circuit against every size as a matrix
+    velocity = 0.4085 * gpm[:, None] / SUPPLY_ID[None, :] ** 2
+    fits = velocity <= max_velocity_fps
+    supply_index = np.where(fits.any(axis=1), fits.argmax(axis=1), len(SUPPLY_SIZES) - 1)
+
+    run = pipes["Run"].to_numpy()
+    capacity = np.select([run[:, None] == name for name in DRAIN_RUNS],
+                         [DRAIN_CAPACITY[name][None, :] for name in DRAIN_RUNS])
+    carries = capacity >= dfu[:, None] - 1e-9
+    drain_index = np.where(carries.any(axis=1), carries.argmax(axis=1), len(DRAIN_SIZES) - 1)
+    drain_index = np.where(closets > 0, np.maximum(drain_index, WATER_CLOSET_MIN_DRAIN), drain_index)
+    # Drain pipe never gets smaller in the direction of flow
+    drain_index = maximum_upstream(np.where(supply, 0, drain_index), parent, order)
+
+    rows = np.arange(len(pipes))
+    over = np.where(supply, ~fits.any(axis=1), ~carries.any(axis=1))
+    return pd.DataFrame({
+        "Segment": pipes["Segment"].to_numpy(),
+        "System": system,
+        "Material": pipes["Material"].to_numpy(),
+        "Fixtures Served": fixtures,
+        "WSFU": np.where(supply, wsfu, 0.0),
+        "DFU": np.where(supply, 0.0, dfu),
+        "Demand (gpm)": gpm.round(1),
+        "Size (in)": np.where(supply, np.array(SUPPLY_SIZES)[supply_index], np.array(DRAIN_SIZES)[drain_index]),
+        "Velocity (fps)": np.where(supply, velocity[rows, supply_index], 0.0).round(2),
+        "Length (ft)": pipes["Length (ft)"].to_numpy(dtype=float),
+        "Status": np.select([orphan, crossed, ~connected, over],
+                            ["Parent not found", "Parent in another system", "Not connected to a main", "Exceeds largest size"], "OK"),
+    })
+
+
+def footage_by_size(sized):
+    """Total feet of pipe per system, material and nominal size"""
+    totals = sized.groupby(["System", "Material", "Size (in)"], as_index=False)["Length (ft)"].sum()
+    return totals[totals["Length (ft)"] > 0].reset_index(drop=True)
@@ -1,6 +1,11 @@
 import streamlit as st
 import pandas as pd
 
+from pipesizing import FIXTURE_UNITS, empty_pipe_table, footage_by_size, normalize_pipes, size_pipes
+from pricecatalog import catalog_price
+from sprinklerhydraulics import SCHEDULE_40_ID, grid_network, hydraulic_calculation, normalize_nodes
+from sprinklerhydraulics import normalize_pipes as normalize_sprinkler_pipes
+
 def main():
     st.title("Comprehensive Plumbing Project Cost Estimator")
     st.write("Enter the details of your plumbing project below to get an estimated cost.")
@@ -26,10 +31,46 @@ def main():
 
     # General Material Inputs (Applicable to All Trades)
     st.subheader("Materials")
-    pipe_cost_per_foot = st.number_input("Cost of Pipe per Foot ($):", min_value=0.0, format="%.2f", step=0.1)
-    pipe_length = st.number_input("Total Pipe Length Needed (Feet):", min_value=0, step=1)
+    pipe_mode = st.radio("Pipe quantities:", ["Enter Totals", "Piping Network"], horizontal=True)
+    if pipe_mode == "Enter Totals":
+        pipe_cost_per_foot = st.number_input("Cost of Pipe per Foot ($):", min_value=0.0, value=catalog_price("Plumbing", pipe_material), format="%.2f", step=0.1)
+        pipe_length = st.number_input("Total Pipe Length Needed (Feet):", min_value=0, step=1)
+
+        num_fixtures = st.number_input("Number of Fixtures (sinks, toilets, etc.):", min_value=0, step=1)
+    else:
+        st.write("Enter supply and drain segments with the segment they connect to toward the meter or building "
+                 "drain (blank for the main), the kind of run, and the fixtures each serves directly. Fixture types: "
+                 + ", ".join(FIXTURE_UNITS) + ".")
+        pipe_file = st.file_uploader("Upload Piping Network (CSV)", type=["csv"], key="pipe_upload")
+        pipe_table = empty_pipe_table()
+        if pipe_file is not None:
+            try:
+                pipe_table = normalize_pipes(pd.read_csv(pipe_file), pipe_material)
+            except Exception as e:
+                st.error(f"Error reading file: {str(e)}")
+        pipes = normalize_pipes(st.data_editor(
+            pipe_table, num_rows="dynamic", hide_index=True, use_container_width=True, key="pipe_editor"), pipe_material)
+        max_velocity = st.number_input("Maximum Supply Velocity (Feet per Second):", min_value=1.0, value=8.0, step=0.5)
+
+        sized = size_pipes(pipes, max_velocity)
+        st.dataframe(sized, use_container_width=True)
+        if (sized["Status"] != "OK").any():
+            st.warning(f"{int((sized['Status'] != 'OK').sum())} segments have a Parent that was not found, are not connected, or exceed the largest pipe size; see Status.")
+
+        # Each size and material is priced on its own; the network total becomes the pipe line
+        footage = footage_by_size(sized)
+        footage["Price per Foot ($)"] = [catalog_price("Plumbing", f"{material} {size} in")
+                                         for material, size in zip(footage["Material"], footage["Size (in)"])]
+        footage = st.data_editor(footage, hide_index=True, use_container_width=True, key="pipe_price_editor",
+                                 disabled=["System", "Material", "Size (in)", "Length (ft)"])
+        network_pipe_cost = (footage["Length (ft)"] * pd.to_numeric(footage["Price per Foot ($)"], errors="coerce").fillna(0.0)).sum()
+        pipe_length = float(footage["Length (ft)"].sum())
+        pipe_cost_per_foot = network_pipe_cost / pipe_length if pipe_length else 0.0
+        # Fixtures usually appear in both trees, so count whichever lists more of them
+        num_fixtures = int(pipes.groupby("System")["Fixtures"].sum().max()) if not pipes.empty else 0
+        st.write(f"**{pipe_length:,.0f} ft of pipe in {len(footage)} sizes serving {num_fixtures} fixtures: "
+                 f"${network_pipe_cost:,.2f}.**")
 
-    num_fixtures = st.number_input("Number of Fixtures (sinks, toilets, etc.):", min_value=0, step=1)
     cost_per_fixture = st.number_input("Cost per Fixture ($):", min_value=0.0, format="%.2f", step=0.5)
 
     valve_cost = st.number_input("Total Cost of Valves ($):", min_value=0.0, format="%.2f", step=10.0)
@@ -49,7 +90,80 @@ def main():
     elif contractor_type == "Sprinkler Fitter":
         st.subheader("Sprinkler System Specific Inputs")
         sprinkler_head_cost = st.number_input("Cost per Sprinkler Head ($):", min_value=0.0, format="%.2f", step=1.0)
-        num_sprinkler_heads = st.number_input("Number of Sprinkler Heads:", min_value=0, step=1)
+        sprinkler_mode = st.radio("Sprinkler design:", ["Enter Head Count", "Hydraulic Calculation"], horizontal=True)
+        hydraulics = None
+        if sprinkler_mode == "Enter Head Count":
+            num_sprinkler_heads = st.number_input("Number of Sprinkler Heads:", min_value=0, step=1)
+        else:
+            st.write("Start from a gridded system of branch lines tied to cross mains at both ends, or upload "
+                     "your own nodes (Node, Type of Source/Head/Junction, X, Y, Elevation, K-Factor) and pipes "
+                     "(From, To, Length, inside Diameter, C-Factor, Fittings equivalent length). Loops are fine.")
+            col1, col2 = st.columns(2)
+            with col1:
+                num_branches = st.number_input("Branch Lines:", min_value=1, value=4, step=1)
+                head_spacing = st.number_input("Head Spacing on Branch (Feet):", min_value=1.0, value=12.0, step=0.5)
+                branch_size = st.selectbox("Branch Line Size (in):", list(SCHEDULE_40_ID), index=0)
+                ceiling_height = st.number_input("Heads Above Source (Feet):", min_value=0.0, value=10.0, step=1.0)
+            with col2:
+                heads_per_branch = st.number_input("Heads per Branch Line:", min_value=1, value=6, step=1)
+                branch_spacing = st.number_input("Branch Line Spacing (Feet):", min_value=1.0, value=12.0, step=0.5)
+                main_size = st.selectbox("Cross Main Size (in):", list(SCHEDULE_40_ID), index=4)
+                k_factor = st.number_input("Head K-Factor:", min_value=0.1, value=5.6, step=0.1)
+            node_table, sprinkler_pipe_table = grid_network(
+                int(num_branches), int(heads_per_branch), head_spacing, branch_spacing, branch_size, main_size,
+                elevation=ceiling_height, k_factor=k_factor)
+
+            node_file = st.file_uploader("Upload Sprinkler Nodes (CSV)", type=["csv"], key="sprinkler_node_upload")
+            if node_file is not None:
+                try:
+                    node_table = normalize_nodes(pd.read_csv(node_file))
+                except Exception as e:
+                    st.error(f"Error reading file: {str(e)}")
+            sprinkler_pipe_file = st.file_uploader("Upload Sprinkler Pipes (CSV)", type=["csv"], key="sprinkler_pipe_upload")
+            if sprinkler_pipe_file is not None:
+                try:
+                    sprinkler_pipe_table = normalize_sprinkler_pipes(pd.read_csv(sprinkler_pipe_file))
+                except Exception as e:
+                    st.error(f"Error reading file: {str(e)}")
+            with st.expander("Network Tables"):
+                nodes = normalize_nodes(st.data_editor(
+                    node_table, num_rows="dynamic", hide_index=True, use_container_width=True, key="sprinkler_node_editor"))
+                sprinkler_pipes = normalize_sprinkler_pipes(st.data_editor(
+                    sprinkler_pipe_table, num_rows="dynamic", hide_index=True, use_container_width=True, key="sprinkler_pipe_editor"))
+
+            st.write("Design area and water supply:")
+            col1, col2 = st.columns(2)
+            with col1:
+                density = st.number_input("Design Density (gpm/sq ft):", min_value=0.01, value=0.10, format="%.2f", step=0.01)
+                design_area = st.number_input("Design Area (sq ft):", min_value=1.0, value=1500.0, step=50.0)
+                area_per_head = st.number_input("Coverage per Head (sq ft):", min_value=1.0, value=130.0, step=5.0)
+                min_head_pressure = st.number_input("Minimum Head Pressure (psi):", min_value=0.0, value=7.0, step=0.5)
+            with col2:
+                hose_allowance = st.number_input("Hose Stream Allowance (gpm):", min_value=0.0, value=250.0, step=50.0)
+                static_pressure = st.number_input("Supply Static Pressure (psi):", min_value=0.0, value=80.0, step=1.0)
+                residual_pressure = st.number_input("Supply Residual Pressure (psi):", min_value=0.0, value=60.0, step=1.0)
+                test_flow = st.number_input("Supply Test Flow (gpm):", min_value=1.0, value=1000.0, step=50.0)
+
+            hydraulics = hydraulic_calculation(nodes, sprinkler_pipes, design_area, area_per_head, density,
+                                               min_head_pressure, hose_allowance, static_pressure,
+                                               min(residual_pressure, static_pressure), test_flow)
+            num_sprinkler_heads = int((nodes["Type"] == "Head").sum())
+            if hydraulics is None:
+                st.warning("The network needs a Source node and at least one Head connected to it by pipes.")
+            else:
+                st.dataframe(hydraulics["design_heads"], use_container_width=True)
+                with st.expander("Pipe Flows"):
+                    st.dataframe(hydraulics["pipes"], use_container_width=True)
+                st.write(f"**{len(hydraulics['design_heads'])} design heads need {hydraulics['system_gpm']:,.1f} gpm "
+                         f"at {hydraulics['source_psi']:,.1f} psi at the source; with hose streams the supply "
+                         f"offers {hydraulics['available_psi']:,.1f} psi at {hydraulics['total_gpm']:,.1f} gpm.**")
+                if hydraulics["unreachable_heads"]:
+                    st.warning(f"{len(hydraulics['unreachable_heads'])} heads have no pipe path to the source and were "
+                               "left out: " + ", ".join(hydraulics["unreachable_heads"][:20]))
+                if hydraulics["pump_needed"]:
+                    st.warning(f"The water supply falls {hydraulics['pump_boost_psi']:,.1f} psi short: a fire pump is needed.")
+                else:
+                    st.success("The water supply meets the demand without a fire pump.")
         fire_pump_cost = st.number_input("Cost of Fire Pump ($):", min_value=0.0, format="%.2f", step=100.0)
 
     # Additional Materials
@@ -146,6 +260,14 @@ def main():
             ]
         })
 
+        if contractor_type == "Sprinkler Fitter" and hydraulics is not None:
+            summary = pd.concat([summary, pd.DataFrame({
+                "Parameter": ["Number of Sprinkler Heads", "Required Source Pressure (psi)", "Sprinkler Demand with Hose (gpm)",
+                              "Fire Pump Needed"],
+                "Value": [num_sprinkler_heads, round(hydraulics["source_psi"], 1), round(hydraulics["total_gpm"], 1),
+                          "Yes" if hydraulics["pump_needed"] else "No"],
+            })], ignore_index=True)
+
         # Display project summary
         st.subheader("Project Summary and Cost Breakdown")
         st.dataframe(summary, width=700)
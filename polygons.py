@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+
+def parse_vertex_strings(vertices):
+    """Flatten 'x,y; x,y; ...' outlines into owner row numbers and vertex coordinates
+
+    Empty or non-numeric pairs (a trailing ';', a stray word) are dropped, and
+    rows left with fewer than three vertices are rejected rather than padded
+    with zeros. Returns (owner, x, y) arrays with each outline's vertices
+    contiguous and in order.
+    """
+    vertices = vertices.reset_index(drop=True).fillna("").astype(str)
+    if vertices.empty:
+        return np.zeros(0, dtype=int), np.zeros(0), np.zeros(0)
+    points = vertices.str.split(";").explode().str.split(",", expand=True)
+    x = pd.to_numeric(points[0].str.strip(), errors="coerce")
+    y = pd.to_numeric(points[1].str.strip(), errors="coerce") if points.shape[1] > 1 else pd.Series(np.nan, index=points.index)
+    valid = x.notna() & y.notna()
+    if points.shape[1] > 2:
+        valid &= points[2].isna()
+    owner = points.index.to_numpy()
+    counts = np.bincount(owner[valid.to_numpy()], minlength=len(vertices))
+    keep = valid.to_numpy() & (counts[owner] >= 3)
+    return owner[keep], x.to_numpy(dtype=float)[keep], y.to_numpy(dtype=float)[keep]
+
+
+def invalid_outlines(vertices):
+    """Rows whose vertex text is filled in but does not give an outline of three or more valid vertices"""
+    owner, _, _ = parse_vertex_strings(vertices)
+    filled = vertices.reset_index(drop=True).fillna("").astype(str).str.strip() != ""
+    return (filled & (np.bincount(owner, minlength=len(vertices)) == 0)).to_numpy()
+
+
+def polygon_metrics(owner, x, y, count):
+    """Shoelace area, perimeter and bounding-box extents of many outlines in one pass
+
+    owner gives the row number (0..count-1) of each vertex, with every outline's
+    vertices contiguous and in order. Rows without vertices get zeros.
+    """
+    area = np.zeros(count)
+    perimeter = np.zeros(count)
+    extent_x = np.zeros(count)
+    extent_y = np.zeros(count)
+    if len(owner) == 0:
+        return area, perimeter, extent_x, extent_y
+
+    # Each vertex pairs with the next one of its own outline, wrapping to the first
+    starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+    ends = np.r_[starts[1:], len(owner)]
+    following = np.arange(1, len(owner) + 1)
+    following[ends - 1] = starts
+    x1, y1 = x[following], y[following]
+
+    area = 0.5 * np.abs(np.bincount(owner, weights=x * y1 - x1 * y, minlength=count))
+    perimeter = np.bincount(owner, weights=np.hypot(x1 - x, y1 - y), minlength=count)
+    extent_x[owner[starts]] = np.maximum.reduceat(x, starts) - np.minimum.reduceat(x, starts)
+    extent_y[owner[starts]] = np.maximum.reduceat(y, starts) - np.minimum.reduceat(y, starts)
+    return area, perimeter, extent_x, extent_y
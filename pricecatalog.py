@@ -0,0 +1,180 @@
+import os
+import sqlite3
+
+import click
+import pandas as pd
+
+from estimatecache import LRUCache
+
+# Location of the local catalog; override with PRICE_CATALOG_PATH
+CATALOG_PATH = os.environ.get("PRICE_CATALOG_PATH", "price_catalog.db")
+
+# Region used to prefill estimators; prices without a region apply everywhere
+DEFAULT_REGION = os.environ.get("PRICE_CATALOG_REGION", "")
+
+# Columns expected in a supplier price book (region, description and unit are optional)
+CATALOG_COLUMNS = ["sku", "trade", "material_type", "region", "description", "unit", "unit_cost"]
+
+IMPORT_CHUNK_ROWS = 100_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    sku TEXT NOT NULL,
+    trade TEXT NOT NULL COLLATE NOCASE,
+    material_type TEXT NOT NULL COLLATE NOCASE,
+    region TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+    description TEXT NOT NULL DEFAULT '',
+    unit TEXT NOT NULL DEFAULT '',
+    unit_cost REAL NOT NULL,
+    PRIMARY KEY (sku, region)
+);
+CREATE INDEX IF NOT EXISTS idx_prices_lookup ON prices (trade, material_type, region, unit_cost);
+CREATE VIRTUAL TABLE IF NOT EXISTS prices_fts USING fts5(
+    description, content='prices', content_rowid='rowid'
+);
+"""
+
+# Warm cache for hot (trade, material type, region) lookups
+PRICE_CACHE = LRUCache(max_entries=4096)
+
+
+def connect(path=CATALOG_PATH):
+    """Open the catalog database, creating the schema if needed"""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _normalize_columns(chunk):
+    chunk.columns = [str(c).strip().lower().replace(" ", "_") for c in chunk.columns]
+    missing = {"sku", "trade", "material_type", "unit_cost"} - set(chunk.columns)
+    if missing:
+        raise ValueError(f"Price book is missing required columns: {', '.join(sorted(missing))}")
+    for column in ("region", "description", "unit"):
+        if column not in chunk.columns:
+            chunk[column] = ""
+    chunk = chunk[CATALOG_COLUMNS].copy()
+    for column in CATALOG_COLUMNS[:-1]:
+        chunk[column] = chunk[column].fillna("").astype(str).str.strip()
+    chunk["unit_cost"] = pd.to_numeric(chunk["unit_cost"], errors="coerce")
+    return chunk.dropna(subset=["unit_cost"])
+
+
+def import_price_book(csv_source, path=CATALOG_PATH):
+    """Load a supplier CSV price book into the catalog, replacing matching SKUs"""
+    conn = connect(path)
+    imported = 0
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        with conn:
+            # Read in chunks so million-row price books never sit in memory at once
+            for chunk in pd.read_csv(csv_source, dtype=str, chunksize=IMPORT_CHUNK_ROWS):
+                chunk = _normalize_columns(chunk)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO prices "
+                    "(sku, trade, material_type, region, description, unit, unit_cost) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    chunk.itertuples(index=False, name=None),
+                )
+                imported += len(chunk)
+            # Rebuild the full-text index once rather than per row
+            conn.execute("INSERT INTO prices_fts(prices_fts) VALUES ('rebuild')")
+    finally:
+        conn.close()
+    PRICE_CACHE.clear()
+    return imported
+
+
+def lookup_price(trade, material_type, region=DEFAULT_REGION, path=CATALOG_PATH):
+    """Return the cheapest catalog row for a trade and material type, or None"""
+    key = (os.path.abspath(path), trade.lower(), material_type.lower(), region.lower())
+    cached = PRICE_CACHE.get(key)
+    if cached is not None:
+        return cached or None
+    if not os.path.exists(path):
+        return None
+
+    conn = connect(path)
+    try:
+        # Prefer a regional price, falling back to prices that apply everywhere;
+        # each query is a single seek on idx_prices_lookup
+        row = None
+        for candidate_region in dict.fromkeys([region, ""]):
+            row = conn.execute(
+                "SELECT sku, description, unit, unit_cost FROM prices "
+                "WHERE trade = ? AND material_type = ? AND region = ? "
+                "ORDER BY unit_cost LIMIT 1",
+                (trade, material_type, candidate_region),
+            ).fetchone()
+            if row is not None:
+                break
+    finally:
+        conn.close()
+
+    result = dict(zip(["sku", "description", "unit", "unit_cost"], row)) if row else {}
+    PRICE_CACHE.put(key, result)
+    return result or None
+
+
+def catalog_price(trade, material_type, default=0.0, region=DEFAULT_REGION, path=CATALOG_PATH):
+    """Unit cost to prefill an estimator input with, or default when the catalog has none"""
+    row = lookup_price(trade, material_type, region=region, path=path)
+    if row is None:
+        return default
+    return float(row["unit_cost"])
+
+
+def search_descriptions(text, trade=None, limit=25, path=CATALOG_PATH):
+    """Full-text search over SKU descriptions, best matches first"""
+    columns = ["sku", "trade", "material_type", "region", "description", "unit", "unit_cost"]
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=columns)
+
+    query = (
+        "SELECT p.sku, p.trade, p.material_type, p.region, p.description, p.unit, p.unit_cost "
+        "FROM prices_fts JOIN prices p ON p.rowid = prices_fts.rowid "
+        "WHERE prices_fts MATCH ?"
+    )
+    # Quote each term so punctuation in sizes like 1/2" is not read as FTS syntax
+    terms = " ".join('"' + term.replace('"', '""') + '"' for term in text.split())
+    params = [terms]
+    if trade:
+        query += " AND p.trade = ?"
+        params.append(trade)
+    query += " ORDER BY prices_fts.rank LIMIT ?"
+    params.append(limit)
+
+    conn = connect(path)
+    try:
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+
+
+@click.group()
+def cli():
+    """Manage the local material price catalog"""
+
+
+@cli.command("import")
+@click.argument("csv_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--db", "db_path", default=CATALOG_PATH, show_default=True, help="Catalog database file.")
+def import_command(csv_path, db_path):
+    """Import a supplier CSV price book"""
+    count = import_price_book(csv_path, path=db_path)
+    click.echo(f"Imported {count:,} prices into {db_path}")
+
+
+@cli.command("search")
+@click.argument("text")
+@click.option("--trade", default=None, help="Only search this trade.")
+@click.option("--db", "db_path", default=CATALOG_PATH, show_default=True, help="Catalog database file.")
+def search_command(text, trade, db_path):
+    """Search SKU descriptions"""
+    results = search_descriptions(text, trade=trade, path=db_path)
+    click.echo(results.to_string(index=False) if not results.empty else "No matches")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,94 @@
+import math
+
+import pandas as pd
+
+PANEL_PORTS = [24, 48]
+SWITCH_PORTS = [24, 48]
+RACK_SIZES = [42, 45, 48]
+
+ALLOCATION_COLUMNS = ["Closet", "Drops", "Ports", "Panels", "Switches", "Managers", "RU Used", "Racks"]
+
+
+def _patch_groups(ports, ports_per_panel, switch_ports, panel_ru, managers_per_panel, switch_ru):
+    # One group per switch: the panels it serves with their cable managers, kept together in a rack.
+    # Every port needs a switch port, so a panel larger than the switch is shared by several switches.
+    panels = math.ceil(ports / ports_per_panel)
+    switches = math.ceil(ports / switch_ports)
+    groups = []
+    for switch in range(switches):
+        group_panels = panels // switches + (switch < panels % switches)
+        managers = math.ceil(group_panels * managers_per_panel)
+        items = []
+        for _ in range(group_panels):
+            items.append(("Patch Panel", panel_ru))
+            if managers > 0:
+                items.append(("Cable Manager", 1))
+                managers -= 1
+        items.extend([("Cable Manager", 1)] * managers)
+        items.append(("Switch", switch_ru))
+        groups.append(items)
+    return groups
+
+
+def _first_fit_decreasing(groups, capacity):
+    # Largest groups first into the first rack with room; groups taller than a rack are split
+    pieces = []
+    for items in groups:
+        if sum(ru for _, ru in items) <= capacity:
+            pieces.append(items)
+        else:
+            pieces.extend([[item] for item in items])
+    racks = []
+    free = []
+    for items in sorted(pieces, key=lambda group: -sum(ru for _, ru in group)):
+        height = sum(ru for _, ru in items)
+        for i, room in enumerate(free):
+            if room >= height:
+                racks[i].extend(items)
+                free[i] -= height
+                break
+        else:
+            racks.append(list(items))
+            free.append(capacity - height)
+    return racks
+
+
+def allocate_racks(drops_by_closet, ports_per_panel=24, switch_ports=48, rack_ru=42, reserved_ru=4,
+                   spare_pct=10.0, panel_ru=1, switch_ru=1, managers_per_panel=1.0):
+    """Pack each closet's drops into patch panels, switches and managers, then into racks
+
+    drops_by_closet maps closet name to drop count. spare_pct adds growth ports
+    and reserved_ru is held back in every rack for shelves, UPS and the like.
+    Returns (allocation by closet, rack elevation rows).
+    """
+    capacity = max(rack_ru - reserved_ru, 1)
+    allocation = []
+    elevation = []
+    for closet, drops in drops_by_closet.items():
+        drops = int(drops)
+        if drops <= 0:
+            continue
+        ports = math.ceil(drops * (1 + spare_pct / 100))
+        groups = _patch_groups(ports, ports_per_panel, switch_ports, panel_ru, managers_per_panel, switch_ru)
+        racks = _first_fit_decreasing(groups, capacity)
+
+        counts = {"Patch Panel": 0, "Switch": 0, "Cable Manager": 0}
+        for rack_number, items in enumerate(racks, start=1):
+            # Elevations are numbered from the top of the rack down
+            position = rack_ru
+            for item, ru in items:
+                counts[item] += 1
+                elevation.append({"Closet": closet, "Rack": rack_number, "Top RU": position, "Height (RU)": ru, "Item": item})
+                position -= ru
+        allocation.append({
+            "Closet": closet,
+            "Drops": drops,
+            "Ports": counts["Patch Panel"] * ports_per_panel,
+            "Panels": counts["Patch Panel"],
+            "Switches": counts["Switch"],
+            "Managers": counts["Cable Manager"],
+            "RU Used": sum(ru for items in racks for _, ru in items),
+            "Racks": len(racks),
+        })
+    return (pd.DataFrame(allocation, columns=ALLOCATION_COLUMNS),
+            pd.DataFrame(elevation, columns=["Closet", "Rack", "Top RU", "Height (RU)", "Item"]))
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+from polygons import parse_vertex_strings, polygon_metrics
+
+ROOF_STYLES = ["Gable", "Hip", "Shed", "Flat"]
+
+# Columns of the facet table, with the value used for new or missing entries
+FACET_COLUMNS = {
+    "Roof": "Roof 1",
+    "Section": "",
+    "Style": "Gable",
+    "Plan Length (ft)": 0.0,
+    "Plan Width (ft)": 0.0,
+    "Vertices": "",
+    "Pitch (in/12)": 6.0,
+    "Overhang (ft)": 1.0,
+    "Valleys (ft)": 0.0,
+    "Wall Abutment (ft)": 0.0,
+}
+
+GEOMETRY_COLUMNS = [
+    "Plan Area (sq ft)",
+    "Slope Factor",
+    "Sloped Area (sq ft)",
+    "Ridge (ft)",
+    "Hip (ft)",
+    "Valley (ft)",
+    "Eave (ft)",
+    "Rake (ft)",
+    "Drip Edge (ft)",
+    "Step Flashing (ft)",
+]
+
+# Underlayment roll coverages in square feet
+UNDERLAYMENT_ROLLS = {"#15 Felt (400 sq ft)": 400.0, "#30 Felt (200 sq ft)": 200.0, "Synthetic (1000 sq ft)": 1000.0}
+
+BUNDLES_PER_SQUARE = 3
+# Linear feet of hip and ridge covered by one bundle of cap shingles
+CAP_LF_PER_BUNDLE = 33.0
+
+
+def empty_facet_table(num_sections=2):
+    """Starter facet table for the data editor"""
+    facets = pd.DataFrame([FACET_COLUMNS] * num_sections)
+    facets["Section"] = [f"Section {i + 1}" for i in range(num_sections)]
+    return facets
+
+
+def normalize_facets(facets):
+    """Fill missing columns and values so uploaded or edited tables compute cleanly"""
+    facets = facets.copy()
+    for column, default in FACET_COLUMNS.items():
+        if column not in facets.columns:
+            facets[column] = default
+        if isinstance(default, str):
+            facets[column] = facets[column].fillna(default).astype(str).str.strip()
+        else:
+            facets[column] = pd.to_numeric(facets[column], errors="coerce").fillna(default).clip(lower=0)
+    style = facets["Style"].str.title()
+    facets["Style"] = style.where(style.isin(ROOF_STYLES), "Gable")
+    return facets[list(FACET_COLUMNS)].reset_index(drop=True)
+
+
+def compute_geometry(facets):
+    """Vectorized sloped area and ridge, hip, valley, eave, rake and flashing lengths
+
+    Each row is a roof section built from plan length and width, or from plan
+    outline vertices. Every plane of a section shares its pitch, so sloped area
+    is plan area times the slope factor for any outline. Hips and ridges of an
+    outline are taken from its bounding rectangle.
+    """
+    owner, x, y = parse_vertex_strings(facets["Vertices"])
+    polygon_area, polygon_perimeter, extent_x, extent_y = polygon_metrics(owner, x, y, len(facets))
+    has_polygon = np.bincount(owner, minlength=len(facets)) > 0
+    overhang = facets["Overhang (ft)"].to_numpy(dtype=float)
+
+    # Length is the longer plan side however the dimensions were entered, so ridges run along it
+    side_a = np.where(has_polygon, extent_x, facets["Plan Length (ft)"].to_numpy(dtype=float))
+    side_b = np.where(has_polygon, extent_y, facets["Plan Width (ft)"].to_numpy(dtype=float))
+    length, width = np.maximum(side_a, side_b), np.minimum(side_a, side_b)
+    # Overhang extends the footprint on every side (exact for rectangular outlines)
+    has_roof = (length > 0) & (width > 0)
+    length = np.where(has_roof, length + 2 * overhang, 0.0)
+    width = np.where(has_roof, width + 2 * overhang, 0.0)
+    plan_area = np.where(has_polygon, polygon_area + polygon_perimeter * overhang + 4 * overhang ** 2, length * width)
+    plan_perimeter = np.where(has_polygon, polygon_perimeter + 8 * overhang, 2 * (length + width)) * has_roof
+
+    style = facets["Style"].to_numpy()
+    rise_per_foot = facets["Pitch (in/12)"].to_numpy(dtype=float) / 12
+    slope_factor = np.where(style == "Flat", 1.0, np.sqrt(1 + rise_per_foot ** 2))
+    sloped_area = plan_area * slope_factor
+
+    gable, hip, shed = style == "Gable", style == "Hip", style == "Shed"
+    # A hip runs diagonally in plan across half the width and rises with the common rafters
+    half_run = width / 2
+    ridge = np.select([gable, hip, shed], [length, np.maximum(length - width, 0.0), length], 0.0)
+    hips = np.where(hip, 4 * half_run * np.sqrt(2 + rise_per_foot ** 2), 0.0)
+    eave = np.select([gable, hip, shed], [2 * length, plan_perimeter, length], plan_perimeter)
+    rake = np.select([gable, shed], [2 * width * slope_factor, 2 * width * slope_factor], 0.0)
+    # Valleys and wall abutments are measured in plan; a valley between equal pitches runs diagonally
+    valley = facets["Valleys (ft)"].to_numpy(dtype=float) * np.sqrt(1 + (rise_per_foot ** 2) / 2)
+    step_flashing = facets["Wall Abutment (ft)"].to_numpy(dtype=float) * slope_factor
+
+    return pd.DataFrame(
+        np.column_stack([plan_area, slope_factor, sloped_area, ridge, hips, valley, eave, rake,
+                         eave + rake, step_flashing]),
+        columns=GEOMETRY_COLUMNS,
+        index=facets.index,
+    )
+
+
+def roof_materials(facets, geometry, waste_pct=10.0, underlayment_roll_sqft=400.0):
+    """Roll sections up per roof and size shingle bundles, cap bundles and underlayment rolls"""
+    roof_ids, roofs = pd.factorize(facets["Roof"])
+    totals = {
+        column: np.bincount(roof_ids, weights=geometry[column].to_numpy(), minlength=len(roofs))
+        for column in ["Sloped Area (sq ft)", "Ridge (ft)", "Hip (ft)", "Valley (ft)", "Drip Edge (ft)", "Step Flashing (ft)"]
+    }
+    ordered_area = totals["Sloped Area (sq ft)"] * (1 + waste_pct / 100)
+    squares = ordered_area / 100
+    materials = pd.DataFrame({"Roof": roofs, **totals})
+    materials["Squares"] = squares.round(2)
+    materials["Shingle Bundles"] = np.ceil(squares * BUNDLES_PER_SQUARE - 1e-9).astype(int)
+    materials["Cap Bundles"] = np.ceil((totals["Ridge (ft)"] + totals["Hip (ft)"]) / CAP_LF_PER_BUNDLE - 1e-9).astype(int)
+    materials["Underlayment Rolls"] = np.ceil(ordered_area / underlayment_roll_sqft - 1e-9).astype(int)
+    return materials
@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
 
+from pricecatalog import catalog_price
+from polygons import invalid_outlines
+from roofgeometry import UNDERLAYMENT_ROLLS, compute_geometry, empty_facet_table, normalize_facets, roof_materials
+
 def main():
     st.title("Comprehensive Roofing Project Cost Estimator")
     st.write("Enter the details of your roofing project below to get an estimated cost.")
@@ -12,30 +16,70 @@ def main():
         ["Shingler", "Flat Roofer", "Metal Roofer"]
     )
 
-    roof_area = st.number_input("Total Roof Area (Square Feet):", min_value=0, step=10)
+    measurement_method = st.radio("Roof measurements:", ["Enter Totals", "Facet Table"], horizontal=True)
+    if measurement_method == "Enter Totals":
+        roof_area = st.number_input("Total Roof Area (Square Feet):", min_value=0, step=10)
+    else:
+        st.write("Upload a CSV of roof sections or edit the table below. Give plan length and width, "
+                 "or plan outline vertices as 'x, y; x, y; ...'. Rows sharing a Roof name are totaled together.")
+        uploaded_file = st.file_uploader("Choose a facet table CSV", type="csv")
+        facets = empty_facet_table()
+        if uploaded_file is not None:
+            try:
+                facets = normalize_facets(pd.read_csv(uploaded_file))
+            except Exception as e:
+                st.error(f"Error reading file: {str(e)}")
+        facets = normalize_facets(st.data_editor(facets, num_rows="dynamic", hide_index=True, use_container_width=True, key="facet_table"))
+        roof_waste = st.slider("Shingle and Underlayment Waste (%):", min_value=0, max_value=25, value=10, step=1)
+        underlayment_type = st.selectbox("Underlayment Roll:", list(UNDERLAYMENT_ROLLS))
+
+        geometry = compute_geometry(facets)
+        rejected = invalid_outlines(facets["Vertices"])
+        if rejected.any():
+            st.warning(f"{int(rejected.sum())} sections have vertices that do not form an outline of at least three "
+                       "valid 'x, y' points; their plan length and width are used instead.")
+        roof_takeoff = roof_materials(facets, geometry, roof_waste, UNDERLAYMENT_ROLLS[underlayment_type])
+        roof_area = round(float(geometry["Sloped Area (sq ft)"].sum()), 2)
+        flashing_length = float(roof_takeoff["Drip Edge (ft)"].sum() + roof_takeoff["Step Flashing (ft)"].sum() + roof_takeoff["Valley (ft)"].sum())
+        st.write(f"**Sloped roof area: {roof_area:,.2f} sq ft across {len(roof_takeoff)} roofs.**")
+        st.dataframe(roof_takeoff.round(2), use_container_width=True)
+        with st.expander("Geometry by Section"):
+            st.dataframe(pd.concat([facets[["Roof", "Section", "Style"]], geometry.round(2)], axis=1), use_container_width=True)
 
     # Material Inputs
     st.subheader("Materials")
 
     if roofing_type == "Shingler":
-        shingle_cost = st.number_input("Cost per Bundle of Shingles ($):", min_value=0.0, format="%.2f", step=1.0)
-        bundles_needed = st.number_input("Number of Bundles Needed:", min_value=0, step=1)
-        underlayment_cost = st.number_input("Cost of Underlayment per Roll ($):", min_value=0.0, format="%.2f", step=1.0)
-        rolls_needed = st.number_input("Number of Rolls Needed:", min_value=0, step=1)
+        shingle_cost = st.number_input("Cost per Bundle of Shingles ($):", min_value=0.0, value=catalog_price("Roofing", "Shingle Bundle"), format="%.2f", step=1.0)
+        underlayment_cost = st.number_input("Cost of Underlayment per Roll ($):", min_value=0.0, value=catalog_price("Roofing", "Underlayment Roll"), format="%.2f", step=1.0)
+        if measurement_method == "Enter Totals":
+            bundles_needed = st.number_input("Number of Bundles Needed:", min_value=0, step=1)
+            rolls_needed = st.number_input("Number of Rolls Needed:", min_value=0, step=1)
+        else:
+            # Field and cap bundles both come from the facet takeoff
+            bundles_needed = int(roof_takeoff["Shingle Bundles"].sum() + roof_takeoff["Cap Bundles"].sum())
+            rolls_needed = int(roof_takeoff["Underlayment Rolls"].sum())
+            st.write(f"Bundles needed: **{bundles_needed}** (including hip and ridge cap), underlayment rolls needed: **{rolls_needed}**")
 
     elif roofing_type == "Flat Roofer":
-        flat_material_cost = st.number_input("Cost per Square Foot of Flat Roofing Material ($):", min_value=0.0, format="%.2f", step=0.1)
+        flat_material_cost = st.number_input("Cost per Square Foot of Flat Roofing Material ($):", min_value=0.0, value=catalog_price("Roofing", "Flat Roofing Membrane"), format="%.2f", step=0.1)
         insulation_cost = st.number_input("Cost of Insulation per Square Foot ($):", min_value=0.0, format="%.2f", step=0.1)
         sealant_cost = st.number_input("Total Cost of Sealant and Adhesives ($):", min_value=0.0, format="%.2f", step=10.0)
 
     elif roofing_type == "Metal Roofer":
-        metal_panel_cost = st.number_input("Cost per Metal Panel ($):", min_value=0.0, format="%.2f", step=1.0)
+        metal_panel_cost = st.number_input("Cost per Metal Panel ($):", min_value=0.0, value=catalog_price("Roofing", "Metal Panel"), format="%.2f", step=1.0)
         panels_needed = st.number_input("Number of Metal Panels Needed:", min_value=0, step=1)
-        flashing_cost = st.number_input("Total Cost of Flashing Materials ($):", min_value=0.0, format="%.2f", step=10.0)
+        if measurement_method == "Enter Totals":
+            flashing_cost = st.number_input("Total Cost of Flashing Materials ($):", min_value=0.0, format="%.2f", step=10.0)
+        else:
+            # The facet takeoff prices flashing per linear foot below
+            flashing_cost = 0.0
 
     # Additional Materials
     st.subheader("Additional Materials")
     fasteners_cost = st.number_input("Cost of Fasteners ($):", min_value=0.0, format="%.2f", step=1.0)
+    if measurement_method == "Facet Table":
+        flashing_cost_per_ft = st.number_input("Drip Edge, Valley and Step Flashing Cost per Linear Foot ($):", min_value=0.0, value=catalog_price("Roofing", "Flashing"), format="%.2f", step=0.1)
     disposal_cost = st.number_input("Cost of Disposal (Dumpster, Haul Away) ($):", min_value=0.0, format="%.2f", step=10.0)
 
     # Labor Inputs
@@ -72,6 +116,8 @@ def main():
 
         # Add additional material costs
         total_materials += fasteners_cost + disposal_cost
+        if measurement_method == "Facet Table":
+            total_materials += flashing_length * flashing_cost_per_ft
 
         # Calculate labor costs
         total_labor_cost = labor_hours * hourly_rate * num_workers
@@ -118,6 +164,12 @@ def main():
                 round(total_cost, 2)
             ]
         })
+        if measurement_method == "Facet Table":
+            summary = pd.concat([summary, pd.DataFrame({
+                "Parameter": ["Roofs Measured", "Squares (with waste)", "Ridge and Hip (ft)", "Flashing and Drip Edge (ft)"],
+                "Value": [len(roof_takeoff), round(float(roof_takeoff["Squares"].sum()), 2),
+                          round(float(roof_takeoff["Ridge (ft)"].sum() + roof_takeoff["Hip (ft)"].sum()), 2), round(flashing_length, 2)],
+            })], ignore_index=True)
 
         # Display project summary
         st.subheader("Project Summary and Cost Breakdown")
@@ -0,0 +1,276 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# Nodes of the sprinkler network, with the value used for new or missing entries
+NODE_COLUMNS = {
+    "Node": "",
+    "Type": "Junction",
+    "X (ft)": 0.0,
+    "Y (ft)": 0.0,
+    "Elevation (ft)": 0.0,
+    "K-Factor": 5.6,
+}
+
+NODE_TYPES = ["Source", "Head", "Junction"]
+
+# Pipes between nodes; equivalent length covers the fittings along the pipe
+PIPE_COLUMNS = {
+    "From": "",
+    "To": "",
+    "Length (ft)": 0.0,
+    "Diameter (in)": 1.049,
+    "C-Factor": 120.0,
+    "Fittings (ft)": 0.0,
+}
+
+PSI_PER_FT = 0.433
+
+# Schedule 40 inside diameters by nominal size, for generated grids
+SCHEDULE_40_ID = {"1": 1.049, "1-1/4": 1.380, "1-1/2": 1.610, "2": 2.067, "2-1/2": 2.469, "3": 3.068, "4": 4.026}
+
+
+def grid_network(num_branches, heads_per_branch, head_spacing=12.0, branch_spacing=12.0, branch_size="1",
+                 main_size="2-1/2", riser_length=20.0, elevation=10.0, k_factor=5.6):
+    """Gridded system: branch lines of heads tied at both ends to cross mains fed from one riser
+
+    The riser runs from the source at the origin up to the first cross main.
+    Returns (nodes, pipes) tables.
+    """
+    branch_id, main_id = SCHEDULE_40_ID[branch_size], SCHEDULE_40_ID[main_size]
+    rows, columns = np.meshgrid(np.arange(num_branches), np.arange(heads_per_branch + 2), indexing="ij")
+    # Column 0 and the last column are the cross-main tees; heads sit between them
+    names = np.char.add(np.char.add("B", rows.ravel().astype(str)), np.char.add("-", columns.ravel().astype(str)))
+    is_head = ((columns > 0) & (columns <= heads_per_branch)).ravel()
+    nodes = pd.DataFrame({
+        "Node": np.concatenate([["Source"], names]),
+        "Type": np.concatenate([["Source"], np.where(is_head, "Head", "Junction")]),
+        "X (ft)": np.r_[0.0, columns.ravel() * head_spacing],
+        "Y (ft)": np.r_[0.0, rows.ravel() * branch_spacing],
+        "Elevation (ft)": np.r_[0.0, np.full(names.size, elevation)],
+        "K-Factor": np.r_[0.0, np.where(is_head, k_factor, 0.0)],
+    })
+
+    grid = names.reshape(rows.shape)
+    last = heads_per_branch + 1
+    along = pd.DataFrame({"From": grid[:, :-1].ravel(), "To": grid[:, 1:].ravel(),
+                          "Length (ft)": head_spacing, "Diameter (in)": branch_id})
+    mains = pd.DataFrame({"From": np.r_[grid[:-1, 0], grid[:-1, last]], "To": np.r_[grid[1:, 0], grid[1:, last]],
+                          "Length (ft)": branch_spacing, "Diameter (in)": main_id})
+    riser = pd.DataFrame({"From": ["Source"], "To": [grid[0, 0]], "Length (ft)": [riser_length + elevation],
+                          "Diameter (in)": [main_id]})
+    pipes = pd.concat([riser, mains, along], ignore_index=True)
+    pipes["C-Factor"] = 120.0
+    pipes["Fittings (ft)"] = 0.0
+    return nodes, pipes
+
+
+def normalize_nodes(nodes):
+    """Fill missing columns and values so uploaded or edited node tables solve cleanly"""
+    nodes = nodes.copy()
+    for column, default in NODE_COLUMNS.items():
+        if column not in nodes.columns:
+            nodes[column] = default
+        if isinstance(default, str):
+            nodes[column] = nodes[column].fillna(default).astype(str).str.strip()
+        else:
+            nodes[column] = pd.to_numeric(nodes[column], errors="coerce").fillna(default)
+    node_type = nodes["Type"].str.title()
+    nodes["Type"] = node_type.where(node_type.isin(NODE_TYPES), "Junction")
+    nodes = nodes[nodes["Node"] != ""].drop_duplicates(subset="Node")
+    return nodes[list(NODE_COLUMNS)].reset_index(drop=True)
+
+
+def normalize_pipes(pipes):
+    """Fill missing columns and values so uploaded or edited pipe tables solve cleanly"""
+    pipes = pipes.copy()
+    for column, default in PIPE_COLUMNS.items():
+        if column not in pipes.columns:
+            pipes[column] = default
+        if isinstance(default, str):
+            pipes[column] = pipes[column].fillna(default).astype(str).str.strip()
+        else:
+            pipes[column] = pd.to_numeric(pipes[column], errors="coerce").fillna(default).clip(lower=0)
+    return pipes[list(PIPE_COLUMNS)].reset_index(drop=True)
+
+
+def _conjugate_gradient(a, b, conductance, diagonal, free, rhs, tolerance=1e-10, max_iterations=2000):
+    # Jacobi-preconditioned CG on the weighted graph Laplacian plus diagonal, applied straight from the
+    # edge list so nothing n x n is ever built. Fixed nodes are held at zero and drop out of the system.
+    n = len(rhs)
+
+    def apply(x):
+        flow = conductance * (x[a] - x[b])
+        return np.where(free, diagonal * x + np.bincount(a, flow, n) - np.bincount(b, flow, n), x)
+
+    precondition = 1.0 / np.where(free, diagonal + np.bincount(a, conductance, n) + np.bincount(b, conductance, n), 1.0)
+    rhs = np.where(free, rhs, 0.0)
+    x = np.zeros(n)
+    residual = rhs.copy()
+    z = precondition * residual
+    direction = z.copy()
+    rz = residual @ z
+    limit = tolerance * max(np.linalg.norm(rhs), 1e-30)
+    for _ in range(max_iterations):
+        if np.linalg.norm(residual) <= limit:
+            break
+        step_vector = apply(direction)
+        step = rz / (direction @ step_vector)
+        x += step * direction
+        residual -= step * step_vector
+        z = precondition * residual
+        rz_next = residual @ z
+        direction = z + (rz_next / rz) * direction
+        rz = rz_next
+    return x
+
+
+def _balance(a, b, resistance, elevation_psi, k_factor, grade):
+    # Pipe flows (Hazen-Williams: drop = r x Q^1.852), head discharge (K x sqrt(P)) and node imbalance
+    n = len(grade)
+    drop = grade[a] - grade[b]
+    magnitude = np.maximum(np.abs(drop), 1e-4)
+    flow = np.sign(drop) * (np.abs(drop) / resistance) ** (1 / 1.852)
+    pressure = np.maximum(grade - elevation_psi, 1e-4)
+    discharge = k_factor * np.sqrt(pressure)
+    imbalance = np.bincount(b, flow, n) - np.bincount(a, flow, n) - discharge
+    conductance = (magnitude / resistance) ** (1 / 1.852) / (1.852 * magnitude)
+    return flow, discharge, imbalance, conductance, k_factor / (2 * np.sqrt(pressure))
+
+
+def _reachable(a, b, n, start):
+    # Breadth-first search over the pipes, which carry water either way
+    ends = np.r_[a, b]
+    neighbors = np.r_[b, a]
+    order = np.argsort(ends, kind="stable")
+    neighbors = neighbors[order]
+    offsets = np.searchsorted(ends[order], np.arange(n + 1))
+    reached = np.zeros(n, dtype=bool)
+    reached[start] = True
+    frontier = np.array([start])
+    while len(frontier):
+        spans = [neighbors[offsets[node]:offsets[node + 1]] for node in frontier.tolist()]
+        found = np.unique(np.concatenate(spans))
+        frontier = found[~reached[found]]
+        reached[frontier] = True
+    return reached
+
+
+def _solve_network(a, b, resistance, elevation_psi, k_factor, free, grade, tolerance=1e-4, max_iterations=100):
+    # Newton iteration on hydraulic grade (psi); nodes that are not free hold their starting value
+    flow, discharge, imbalance, conductance, emitter_slope = _balance(a, b, resistance, elevation_psi, k_factor, grade)
+    for _ in range(max_iterations):
+        norm = np.abs(imbalance[free]).max(initial=0.0)
+        if norm < tolerance:
+            break
+        # The Jacobian is the pipe-conductance Laplacian plus each head's emitter slope: symmetric positive definite
+        correction = _conjugate_gradient(a, b, conductance, emitter_slope, free, np.where(free, imbalance, 0.0))
+        # Flow is steep near zero drop, so full steps can overshoot; halve until the imbalance shrinks
+        step = 1.0
+        for _ in range(30):
+            trial = grade + step * correction
+            result = _balance(a, b, resistance, elevation_psi, k_factor, trial)
+            if np.abs(result[2][free]).max(initial=0.0) < norm:
+                break
+            step /= 2
+        grade = trial
+        flow, discharge, imbalance, conductance, emitter_slope = result
+    return grade, flow, discharge
+
+
+def hydraulic_calculation(nodes, pipes, design_area_sqft=1500.0, area_per_head=130.0, density_gpm_sqft=0.10,
+                          min_head_psi=7.0, hose_allowance_gpm=250.0, static_psi=80.0, residual_psi=60.0,
+                          test_flow_gpm=1000.0):
+    """Required source pressure and flow for the design area, and whether a fire pump is needed
+
+    The design area is the heads farthest from the source, enough of them to
+    cover design_area_sqft at area_per_head; only they flow. Every design head
+    must discharge at least the density over its area and at least
+    min_head_psi. The network, loops and grids included, is solved by Newton
+    iteration on node pressures with Hazen-Williams pipes and K-factor heads;
+    the source pressure is then scaled until the weakest design head just
+    meets its requirement. The water supply follows the usual
+    static/residual curve, and a pump is needed when it cannot deliver the
+    system demand plus hose allowance at the required pressure. Heads with no
+    pipe path to the source are listed in unreachable_heads and never flow.
+    """
+    index = pd.Series(np.arange(len(nodes)), index=nodes["Node"])
+    known = pipes["From"].isin(index.index) & pipes["To"].isin(index.index) & (pipes["From"] != pipes["To"])
+    pipes = pipes[known]
+    a = index[pipes["From"]].to_numpy()
+    b = index[pipes["To"]].to_numpy()
+    length = (pipes["Length (ft)"] + pipes["Fittings (ft)"]).to_numpy(dtype=float)
+    diameter = pipes["Diameter (in)"].to_numpy(dtype=float)
+    c_factor = pipes["C-Factor"].to_numpy(dtype=float)
+    # Friction in psi per foot is 4.52 Q^1.852 / (C^1.852 d^4.87)
+    resistance = np.maximum(4.52 * length / (np.maximum(c_factor, 1.0) ** 1.852 * np.maximum(diameter, 0.1) ** 4.87), 1e-12)
+
+    sources = np.flatnonzero((nodes["Type"] == "Source").to_numpy())
+    heads = np.flatnonzero((nodes["Type"] == "Head").to_numpy())
+    if len(sources) == 0 or len(heads) == 0 or len(a) == 0:
+        return None
+    source = int(sources[0])
+
+    # Heads with no pipe path to the source can never flow; leave them out of the design area and report them
+    reached = _reachable(a, b, len(nodes), source)
+    unreachable = nodes["Node"].to_numpy()[heads[~reached[heads]]].tolist()
+    heads = heads[reached[heads]]
+    if len(heads) == 0:
+        return None
+    free = reached.copy()
+    free[source] = False
+
+    # Most remote heads by distance from the source form the design area
+    x, y = nodes["X (ft)"].to_numpy(dtype=float), nodes["Y (ft)"].to_numpy(dtype=float)
+    num_design = min(max(math.ceil(design_area_sqft / area_per_head - 1e-9), 1), len(heads))
+    distance = np.hypot(x[heads] - x[source], y[heads] - y[source])
+    design = heads[np.argsort(-distance, kind="stable")[:num_design]]
+
+    k_factor = np.zeros(len(nodes))
+    k_factor[design] = nodes["K-Factor"].to_numpy(dtype=float)[design]
+    required_flow = np.maximum(density_gpm_sqft * area_per_head, k_factor[design] * math.sqrt(min_head_psi))
+    elevation_psi = nodes["Elevation (ft)"].to_numpy(dtype=float) * PSI_PER_FT
+
+    # Flows grow roughly with the square root of pressure, so rescale on the squared shortfall; each
+    # pass starts from the previous solution scaled the same way, which Newton finishes in a few steps.
+    # Stop only once every design head meets its flow, aiming just above it so the last pass never falls short.
+    tolerance = 1e-3
+    source_pressure = max(min_head_psi + elevation_psi[design].max() - elevation_psi[source], 1.0) * 2
+    grade = np.full(len(nodes), source_pressure + elevation_psi[source])
+    for _ in range(30):
+        grade, flow, discharge = _solve_network(a, b, resistance, elevation_psi, k_factor, free, grade)
+        ratio = float((required_flow / np.maximum(discharge[design], 1e-9)).max())
+        if 1 - tolerance < ratio <= 1:
+            break
+        scale = (ratio * (1 + tolerance / 2)) ** 2
+        source_pressure *= scale
+        grade = elevation_psi + (grade - elevation_psi) * scale
+        grade[source] = source_pressure + elevation_psi[source]
+    pressure = grade - elevation_psi
+
+    system_flow = float(discharge.sum())
+    total_flow = system_flow + hose_allowance_gpm
+    # Supply curve: residual pressure falls with flow to the 1.85 power
+    available = static_psi - (static_psi - residual_psi) * (total_flow / test_flow_gpm) ** 1.85 if test_flow_gpm > 0 else 0.0
+    boost = max(source_pressure - available, 0.0)
+
+    head_table = pd.DataFrame({
+        "Node": nodes["Node"].to_numpy()[design],
+        "Pressure (psi)": pressure[design].round(2),
+        "Flow (gpm)": discharge[design].round(2),
+        "Required (gpm)": required_flow.round(2),
+    })
+    pipe_table = pipes.assign(**{"Flow (gpm)": flow.round(2),
+                                 "Velocity (fps)": (0.4085 * np.abs(flow) / np.maximum(diameter, 0.1) ** 2).round(2)})
+    return {
+        "design_heads": head_table,
+        "pipes": pipe_table.reset_index(drop=True),
+        "source_psi": float(source_pressure),
+        "system_gpm": system_flow,
+        "total_gpm": total_flow,
+        "available_psi": float(available),
+        "pump_needed": boost > 0,
+        "pump_boost_psi": float(boost),
+        "unreachable_heads": unreachable,
+    }
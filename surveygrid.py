@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+SURVEY_COLUMNS = ["X (ft)", "Y (ft)", "Elevation (ft)"]
+
+TARGET_SURFACES = ["Level Plane", "Sloped Plane", "Best-Fit Plane"]
+
+# Scattered points are interpolated from this many nearest survey shots
+IDW_NEIGHBORS = 8
+# Distances computed per interpolation chunk, to bound memory on large surveys
+IDW_CHUNK = 2_000_000
+
+
+def read_survey(csv_source):
+    """Load survey shots from a CSV with X, Y and elevation columns (the first three if unnamed)"""
+    survey = pd.read_csv(csv_source)
+    if not set(SURVEY_COLUMNS).issubset(survey.columns):
+        survey = survey.iloc[:, :3]
+        survey.columns = SURVEY_COLUMNS
+    survey = survey[SURVEY_COLUMNS].apply(pd.to_numeric, errors="coerce").dropna()
+    return survey.drop_duplicates(subset=SURVEY_COLUMNS[:2]).reset_index(drop=True)
+
+
+def _as_grid(survey):
+    # A survey already on a full rectangular grid is used as-is
+    xs = np.unique(survey["X (ft)"].to_numpy())
+    ys = np.unique(survey["Y (ft)"].to_numpy())
+    if len(xs) < 2 or len(ys) < 2 or len(xs) * len(ys) != len(survey):
+        return None
+    grid = survey.pivot(index="Y (ft)", columns="X (ft)", values="Elevation (ft)")
+    return xs, ys, grid.to_numpy()
+
+
+def interpolate_grid(x, y, z, spacing, neighbors=IDW_NEIGHBORS, power=2.0):
+    """Inverse-distance-weighted elevations on a regular grid over the survey's extent"""
+    xs = np.arange(x.min(), x.max() + spacing / 2, spacing)
+    ys = np.arange(y.min(), y.max() + spacing / 2, spacing)
+    node_x, node_y = (a.ravel() for a in np.meshgrid(xs, ys))
+    k = min(neighbors, len(x))
+
+    elevations = np.empty(len(node_x))
+    chunk = max(1, IDW_CHUNK // len(x))
+    for start in range(0, len(node_x), chunk):
+        cx, cy = node_x[start:start + chunk, None], node_y[start:start + chunk, None]
+        # Squared distances rank neighbors the same and skip the square root
+        distance_sq = (cx - x) ** 2 + (cy - y) ** 2
+        nearest = np.argpartition(distance_sq, k - 1, axis=1)[:, :k]
+        d_sq = np.take_along_axis(distance_sq, nearest, axis=1)
+        with np.errstate(divide="ignore"):
+            weights = 1.0 / d_sq ** (power / 2)
+        # A node sitting on a shot takes that shot's elevation
+        exact = d_sq < 1e-18
+        weights = np.where(exact.any(axis=1, keepdims=True), exact.astype(float), weights)
+        elevations[start:start + chunk] = (weights * z[nearest]).sum(axis=1) / weights.sum(axis=1)
+    return xs, ys, elevations.reshape(len(ys), len(xs))
+
+
+def survey_volume(survey, target="Level Plane", target_elevation=0.0, slope_x_pct=0.0, slope_y_pct=0.0,
+                  min_thickness_in=0.0, spacing=1.0):
+    """Patch/overlay fill and high-spot cut between the surveyed slab and a target plane
+
+    Gridded surveys are integrated directly; scattered shots are interpolated onto
+    a grid of the given spacing first. The target plane is level, sloped from the
+    survey's lower-left corner, or fitted to the shots, and is raised when needed
+    so the overlay is never thinner than min_thickness_in.
+    """
+    x = survey["X (ft)"].to_numpy(dtype=float)
+    y = survey["Y (ft)"].to_numpy(dtype=float)
+    z = survey["Elevation (ft)"].to_numpy(dtype=float)
+    if len(survey) < 3:
+        raise ValueError("The survey needs at least three points")
+
+    gridded = _as_grid(survey)
+    if gridded is None:
+        xs, ys, surface = interpolate_grid(x, y, z, spacing)
+    else:
+        xs, ys, surface = gridded
+    grid_x, grid_y = np.meshgrid(xs, ys)
+
+    if target == "Best-Fit Plane":
+        coefficients = np.linalg.lstsq(np.column_stack([np.ones_like(x), x, y]), z, rcond=None)[0]
+        plane = coefficients[0] + coefficients[1] * grid_x + coefficients[2] * grid_y
+    else:
+        slope_x = slope_x_pct / 100 if target == "Sloped Plane" else 0.0
+        slope_y = slope_y_pct / 100 if target == "Sloped Plane" else 0.0
+        plane = target_elevation + slope_x * (grid_x - xs[0]) + slope_y * (grid_y - ys[0])
+
+    depth = plane - surface
+    raise_ft = max(min_thickness_in / 12 - np.nanmin(depth), 0.0) if min_thickness_in > 0 else 0.0
+    depth = depth + raise_ft
+
+    # Trapezoidal rule: each cell takes the mean of its four corners over its own area
+    cell_area = np.outer(np.diff(ys), np.diff(xs))
+    fill = np.clip(depth, 0.0, None)
+    cut = np.clip(-depth, 0.0, None)
+
+    def integrate(values):
+        corners = (values[:-1, :-1] + values[1:, :-1] + values[:-1, 1:] + values[1:, 1:]) / 4
+        return float(np.nansum(corners * cell_area))
+
+    valid = ~np.isnan(depth[:-1, :-1] + depth[1:, :-1] + depth[:-1, 1:] + depth[1:, 1:])
+    area = float(cell_area[valid].sum())
+    fill_cuft = integrate(fill)
+    return {
+        "area_sqft": area,
+        "fill_cuft": fill_cuft,
+        "fill_cuyd": fill_cuft / 27,
+        "cut_cuyd": integrate(cut) / 27,
+        "average_depth_in": fill_cuft / area * 12 if area else 0.0,
+        "max_depth_in": float(np.nanmax(fill)) * 12,
+        "plane_raise_in": float(raise_ft) * 12,
+        "grid_points": int(np.isfinite(surface).sum()),
+        "interpolated": gridded is None,
+    }
@@ -0,0 +1,21 @@
+import pandas as pd
+
+# Text read from yes/no cells; anything else falls back to the column default
+TEXT_FLAGS = {
+    "true": True, "t": True, "yes": True, "y": True, "x": True,
+    "false": False, "f": False, "no": False, "n": False,
+}
+
+
+def parse_flags(values, default):
+    """Yes/no column from booleans, numbers or text
+
+    Numbers (including 1.0/0.0 read from CSV) are True when nonzero, known text
+    is mapped, and blank or unrecognized cells take default.
+    """
+    values = pd.Series(values)
+    text = values.astype(str).str.strip().str.lower()
+    number = pd.to_numeric(text, errors="coerce")
+    flags = text.map(TEXT_FLAGS).astype(object)
+    flags = flags.where(number.isna(), number != 0)
+    return flags.where(flags.notna(), default).astype(bool)
@@ -0,0 +1,220 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from locaterecords import parse_polyline
+
+# Trench runs, with the value used for new or missing entries. Depths lists one depth per
+# centerline vertex ("3; 3.5; 4"); a single depth applies to the whole run.
+TRENCH_COLUMNS = {
+    "Trench": "",
+    "Vertices": "",
+    "Depths (ft)": "3",
+    "Width (ft)": 2.0,
+    "Side Slope (H:V)": 0.0,
+    "Bedding (in)": 6.0,
+    "Pipe Diameter (in)": 4.0,
+}
+
+SEGMENT_COLUMNS = ["Trench", "Segment", "Length (ft)", "Start Depth (ft)", "End Depth (ft)",
+                   "Excavation (cu yd)", "Bedding (cu yd)", "Pipe (cu yd)", "Backfill (cu yd)"]
+
+
+def empty_trench_table():
+    """Starter trench run for the data editor"""
+    trench = dict(TRENCH_COLUMNS, Trench="Trench 1", Vertices="0,0; 100,0", **{"Depths (ft)": "3; 4"})
+    return pd.DataFrame([trench])
+
+
+def normalize_trenches(trenches):
+    """Fill missing columns and values so uploaded or edited tables compute cleanly"""
+    trenches = trenches.copy()
+    for column, default in TRENCH_COLUMNS.items():
+        if column not in trenches.columns:
+            trenches[column] = default
+        if isinstance(default, str):
+            trenches[column] = trenches[column].fillna(default).astype(str).str.strip()
+        else:
+            trenches[column] = pd.to_numeric(trenches[column], errors="coerce").fillna(default).clip(lower=0)
+    blank = trenches["Trench"] == ""
+    trenches.loc[blank, "Trench"] = [f"Trench {i + 1}" for i in np.flatnonzero(blank.to_numpy())]
+    return trenches[list(TRENCH_COLUMNS)].reset_index(drop=True)
+
+
+def _vertex_depths(text, count):
+    # One depth per vertex; short lists repeat their last depth and blanks fall back to zero
+    depths = pd.to_numeric(pd.Series(str(text).split(";")), errors="coerce").dropna().to_numpy(dtype=float)
+    if len(depths) == 0:
+        return np.zeros(count)
+    return np.r_[depths, np.full(max(count - len(depths), 0), depths[-1])][:count]
+
+
+def trench_segments(trenches):
+    """Vectorized volumes for every centerline segment of every trench
+
+    Each segment uses the average end area of its trapezoidal cross-sections,
+    so depth can vary linearly between vertices. Bedding fills the trench
+    bottom to the bedding depth, the pipe displaces its own volume and the
+    remainder is backfill.
+    """
+    owner, x, y, depth = [], [], [], []
+    for row, (vertices, depths) in enumerate(zip(trenches["Vertices"], trenches["Depths (ft)"])):
+        line = parse_polyline(vertices)
+        if len(line) < 2:
+            continue
+        owner.append(np.full(len(line), row))
+        x.append(line[:, 0])
+        y.append(line[:, 1])
+        depth.append(_vertex_depths(depths, len(line)))
+    if not owner:
+        return pd.DataFrame(columns=SEGMENT_COLUMNS + ["Row", "X0", "Y0", "X1", "Y1"])
+    owner, x, y, depth = (np.concatenate(values) for values in (owner, x, y, depth))
+
+    # Segments join consecutive vertices of the same trench
+    same = owner[1:] == owner[:-1]
+    row = owner[1:][same]
+    x0, y0, x1, y1 = x[:-1][same], y[:-1][same], x[1:][same], y[1:][same]
+    d0, d1 = depth[:-1][same], depth[1:][same]
+    length = np.hypot(x1 - x0, y1 - y0)
+
+    width = trenches["Width (ft)"].to_numpy(dtype=float)[row]
+    slope = trenches["Side Slope (H:V)"].to_numpy(dtype=float)[row]
+    bedding_ft = np.minimum(trenches["Bedding (in)"].to_numpy(dtype=float)[row] / 12, np.minimum(d0, d1))
+    pipe_ft = trenches["Pipe Diameter (in)"].to_numpy(dtype=float)[row] / 12
+
+    # Bottom width plus the sloped sides on each wall
+    area0 = d0 * (width + slope * d0)
+    area1 = d1 * (width + slope * d1)
+    excavation = length * (area0 + area1) / 2 / 27
+    bedding = length * bedding_ft * (width + slope * bedding_ft) / 27
+    pipe = length * math.pi * (pipe_ft / 2) ** 2 / 27
+    backfill = np.maximum(excavation - bedding - pipe, 0.0)
+
+    segment = pd.Series(row).groupby(row).cumcount().to_numpy()
+    return pd.DataFrame({
+        "Trench": trenches["Trench"].to_numpy()[row],
+        "Segment": segment,
+        "Length (ft)": length,
+        "Start Depth (ft)": d0,
+        "End Depth (ft)": d1,
+        "Excavation (cu yd)": excavation,
+        "Bedding (cu yd)": bedding,
+        "Pipe (cu yd)": pipe,
+        "Backfill (cu yd)": backfill,
+        "Row": row,
+        "X0": x0,
+        "Y0": y0,
+        "X1": x1,
+        "Y1": y1,
+    })
+
+
+def merge_intervals(intervals, key):
+    """Union of overlapping [Start (ft), End (ft)] intervals within each key group, one row per merged interval"""
+    intervals = intervals.sort_values(key + ["Start (ft)"], kind="stable")
+    reach = intervals.groupby(key, sort=False)["End (ft)"].cummax()
+    # An interval opens a new run when it starts past everything before it in its group
+    new_run = intervals[key].ne(intervals[key].shift()).any(axis=1) | (intervals["Start (ft)"] > reach.shift())
+    run = new_run.cumsum()
+    return intervals.groupby(run, sort=False).agg(
+        **{column: (column, "first") for column in intervals.columns if column not in ("Start (ft)", "End (ft)")},
+        **{"Start (ft)": ("Start (ft)", "min"), "End (ft)": ("End (ft)", "max")},
+    ).reset_index(drop=True)
+
+
+def trench_crossings(trenches, segments, locate_store, tolerance_ft=2.0):
+    """Located utilities inside each trench or its tolerance zone, with the stretch they force to be hand dug
+
+    A mark is a crossing where it comes within half the trench width plus
+    tolerance_ft of a centerline segment. Each mark is clipped to that band and
+    the trench is hand dug along the clipped piece plus tolerance_ft either
+    side, capped to the segment. Pieces of one mark are merged, so a utility
+    running alongside the trench is hand dug over its whole run.
+    """
+    columns = ["Row", "Trench", "Segment", "Mark ID", "Utility", "Depth (ft)", "Distance (ft)",
+               "Start (ft)", "End (ft)", "Hand Dig (ft)"]
+    if locate_store is None or len(locate_store) == 0 or segments.empty:
+        return pd.DataFrame(columns=columns)
+
+    found = []
+    for row, trench in trenches.iterrows():
+        run = segments[segments["Row"] == row]
+        if run.empty:
+            continue
+        line = np.r_[run[["X0", "Y0"]].to_numpy(), run[["X1", "Y1"]].to_numpy()[-1:]]
+        reach = trench["Width (ft)"] / 2 + tolerance_ft
+        spans = locate_store.query_spans_along_line(line, reach)
+        if spans.empty:
+            continue
+        segment_length = run["Length (ft)"].to_numpy()[spans["Query Segment"].to_numpy()]
+        found.append(pd.DataFrame({
+            "Row": row,
+            "Trench": trench["Trench"],
+            "Segment": spans["Query Segment"].to_numpy(),
+            "Mark ID": spans["Mark ID"].to_numpy(),
+            "Utility": spans["Utility"].to_numpy(),
+            "Depth (ft)": spans["Depth (ft)"].to_numpy(),
+            "Distance (ft)": spans["Distance (ft)"].to_numpy(),
+            "Start (ft)": np.clip(spans["Start (ft)"].to_numpy() - tolerance_ft, 0.0, segment_length),
+            "End (ft)": np.clip(spans["End (ft)"].to_numpy() + tolerance_ft, 0.0, segment_length),
+        }))
+    if not found:
+        return pd.DataFrame(columns=columns)
+
+    crossings = pd.concat(found, ignore_index=True)
+    # The closest piece gives the mark's distance; its pieces' hand-dig stretches are merged
+    crossings["Distance (ft)"] = crossings.groupby(["Row", "Segment", "Mark ID"])["Distance (ft)"].transform("min")
+    crossings = merge_intervals(crossings, ["Row", "Segment", "Mark ID"])
+    crossings["Hand Dig (ft)"] = crossings["End (ft)"] - crossings["Start (ft)"]
+    return crossings[columns]
+
+
+def trench_takeoff(trenches, locate_store=None, tolerance_ft=2.0, swell_pct=25.0, truck_cu_yd=12.0,
+                   native_backfill=True, machine_cu_yd_per_hr=15.0, hand_cu_yd_per_hr=0.75):
+    """Excavation, backfill, bedding, spoil haul and dig hours for a set of trenches
+
+    Hand-dig stretches at utility crossings are merged where they overlap and
+    moved from machine to hand production, capped at each segment's length. With native backfill only the
+    spoil displaced by bedding and pipe is hauled off; otherwise all of it is,
+    and backfill is imported. Volumes are bank cubic yards; haul loads use the
+    swelled loose volume.
+    """
+    segments = trench_segments(trenches)
+    crossings = trench_crossings(trenches, segments, locate_store, tolerance_ft)
+
+    excavation = float(segments["Excavation (cu yd)"].sum())
+    bedding = float(segments["Bedding (cu yd)"].sum())
+    pipe = float(segments["Pipe (cu yd)"].sum())
+    backfill = float(segments["Backfill (cu yd)"].sum())
+
+    # Hand-dig volume is the crossing footage at the segment's average cross-section
+    hand_dig = 0.0
+    if not crossings.empty:
+        # Overlapping stretches of nearby marks are dug once
+        key = ["Row", "Segment"]
+        dug = merge_intervals(crossings[key + ["Start (ft)", "End (ft)"]], key)
+        dug["Hand Dig (ft)"] = dug["End (ft)"] - dug["Start (ft)"]
+        per_segment = dug.groupby(key, as_index=False)["Hand Dig (ft)"].sum()
+        per_segment = per_segment.merge(segments[key + ["Length (ft)", "Excavation (cu yd)"]], on=key)
+        dug = np.minimum(per_segment["Hand Dig (ft)"], per_segment["Length (ft)"])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = np.where(per_segment["Length (ft)"] > 0, dug / per_segment["Length (ft)"], 0.0)
+        hand_dig = float((share * per_segment["Excavation (cu yd)"]).sum())
+
+    haul_bank = bedding + pipe if native_backfill else excavation
+    haul_loose = haul_bank * (1 + swell_pct / 100)
+    return {
+        "segments": segments.drop(columns=["Row", "X0", "Y0", "X1", "Y1"]),
+        "crossings": crossings.drop(columns="Row"),
+        "length_ft": float(segments["Length (ft)"].sum()),
+        "excavation_cu_yd": excavation,
+        "backfill_cu_yd": backfill,
+        "imported_backfill_cu_yd": 0.0 if native_backfill else backfill,
+        "bedding_cu_yd": bedding,
+        "haul_cu_yd": haul_loose,
+        "haul_loads": int(math.ceil(haul_loose / truck_cu_yd - 1e-9)) if truck_cu_yd > 0 else 0,
+        "hand_dig_cu_yd": hand_dig,
+        "machine_hours": (excavation - hand_dig) / machine_cu_yd_per_hr if machine_cu_yd_per_hr > 0 else 0.0,
+        "hand_dig_hours": hand_dig / hand_cu_yd_per_hr if hand_cu_yd_per_hr > 0 else 0.0,
+    }
@@ -1,6 +1,12 @@
 import streamlit as st
 import pandas as pd
 
+from crewoptimizer import optimize_crew
+from detectionplanner import DETECTION_METHODS, combination_costs, default_method_table, normalize_methods, plan_detection
+from locaterecords import LocateStore, parse_polyline, read_marks
+from pricecatalog import catalog_price
+from trenchvolume import empty_trench_table, normalize_trenches, trench_takeoff
+
 def main():
     st.title("Underground Utility Locating Cost Estimator")
     st.write("Enter the details of your underground utility locating project to get an estimated cost.")
@@ -25,28 +31,119 @@ def main():
     # Utility types selection
     utility_types = st.multiselect(
         "Select Utility Types to Locate:",
-        ["Gas Lines", "Water Lines", "Sewer Lines", "Electric Cables", "Telecom Cables", "Fiber Optic Cables", "Oil Pipelines"]
+        list(DETECTION_METHODS)
     )
 
     # Detection method based on utility types
-    detection_methods = {
-        "Gas Lines": ["Electromagnetic", "Ground Penetrating Radar (GPR)", "Acoustic Detection"],
-        "Water Lines": ["Electromagnetic", "Acoustic Detection", "GPR"],
-        "Sewer Lines": ["GPR", "Electromagnetic", "Acoustic Detection"],
-        "Electric Cables": ["Electromagnetic", "Induction Locators"],
-        "Telecom Cables": ["Electromagnetic", "GPR"],
-        "Fiber Optic Cables": ["Electromagnetic", "GPR"],
-        "Oil Pipelines": ["Electromagnetic", "GPR", "Magnetic Locator"]
-    }
-
+    method_mode = st.radio("Detection methods:", ["Choose per Utility", "Plan Cheapest Methods"], horizontal=True)
     selected_detection_methods = set()
-    for utility in utility_types:
-        methods = detection_methods.get(utility, [])
-        selected_method = st.selectbox(f"Detection Method for {utility}:", methods)
-        selected_detection_methods.add(selected_method)
+    method_rates = None
+    if method_mode == "Choose per Utility":
+        for utility in utility_types:
+            methods = DETECTION_METHODS.get(utility, [])
+            selected_method = st.selectbox(f"Detection Method for {utility}:", methods)
+            selected_detection_methods.add(selected_method)
+    else:
+        st.write("Enter each method's equipment day rate and how many square feet one crew sweeps per day. "
+                 "The plan is priced with the crew entered under Labor below.")
+        method_rates = normalize_methods(st.data_editor(
+            default_method_table(), num_rows="dynamic", hide_index=True, use_container_width=True, key="method_editor"))
 
     service_depth = st.number_input("Estimated Depth of Utilities (Feet):", min_value=0.0, step=0.5)
 
+    # Locate Records
+    st.subheader("Locate Records")
+    st.write("Upload marks from a previous locate: points with X (ft), Y (ft), or polylines with one row per "
+             "vertex sharing a Mark ID. Utility, Depth (ft) and Method columns are kept with each mark.")
+    point_file = st.file_uploader("Upload Point Marks (CSV)", type=["csv"], key="locate_points")
+    line_file = st.file_uploader("Upload Polyline Marks (CSV)", type=["csv"], key="locate_lines")
+
+    locate_store = None
+    if point_file is not None or line_file is not None:
+        # The index is rebuilt only when the uploads change, so queries stay quick on large sites
+        upload_key = tuple((f.name, f.size) if f is not None else None for f in (point_file, line_file))
+        if st.session_state.get("locate_upload_key") != upload_key:
+            try:
+                points = read_marks(point_file, "Point") if point_file is not None else None
+                lines = read_marks(line_file, "Line") if line_file is not None else None
+                st.session_state["locate_store"] = LocateStore(points, lines)
+                st.session_state["locate_upload_key"] = upload_key
+            except Exception as e:
+                st.error(f"Error reading file: {str(e)}")
+                st.session_state.pop("locate_store", None)
+                st.session_state.pop("locate_upload_key", None)
+        locate_store = st.session_state.get("locate_store")
+
+    if locate_store is not None:
+        st.write(f"**{len(locate_store)} marks loaded.**")
+        st.dataframe(locate_store.summary(), use_container_width=True)
+
+        with st.expander("Find Marks in an Area"):
+            col1, col2 = st.columns(2)
+            with col1:
+                box_xmin = st.number_input("Min X (ft):", value=0.0, step=10.0)
+                box_ymin = st.number_input("Min Y (ft):", value=0.0, step=10.0)
+            with col2:
+                box_xmax = st.number_input("Max X (ft):", value=100.0, step=10.0)
+                box_ymax = st.number_input("Max Y (ft):", value=100.0, step=10.0)
+            in_box = locate_store.query_bbox(min(box_xmin, box_xmax), min(box_ymin, box_ymax),
+                                             max(box_xmin, box_xmax), max(box_ymin, box_ymax))
+            st.write(f"{len(in_box)} marks in the area.")
+            st.dataframe(in_box, use_container_width=True)
+
+        with st.expander("Find Marks Near a Planned Trench"):
+            trench_text = st.text_input("Trench Centerline (x,y; x,y; ...):", value="0,0; 100,0")
+            clearance = st.number_input("Search Distance from Centerline (Feet):", min_value=0.0, value=2.0, step=0.5)
+            trench_line = parse_polyline(trench_text)
+            if len(trench_line) < 2:
+                st.warning("Enter at least two x,y points for the trench centerline.")
+            else:
+                near_trench = locate_store.query_near_line(trench_line, clearance)
+                st.write(f"{len(near_trench)} marks within {clearance:g} ft of the trench.")
+                st.dataframe(near_trench, use_container_width=True)
+
+    # Trench Excavation
+    st.subheader("Trench Excavation")
+    use_trenches = st.checkbox("Price trench excavation from centerline profiles")
+    trench = None
+    if use_trenches:
+        st.write("Enter each trench as centerline points (x,y; x,y; ...) with one depth per point, or a single "
+                 "depth for the whole run. Located marks within the tolerance zone are hand dug.")
+        trench_file = st.file_uploader("Upload Trench Table (CSV)", type=["csv"], key="trench_upload")
+        trench_table = empty_trench_table()
+        if trench_file is not None:
+            try:
+                trench_table = normalize_trenches(pd.read_csv(trench_file))
+            except Exception as e:
+                st.error(f"Error reading file: {str(e)}")
+        trench_table = normalize_trenches(st.data_editor(
+            trench_table, num_rows="dynamic", hide_index=True, use_container_width=True, key="trench_editor"))
+
+        col1, col2 = st.columns(2)
+        with col1:
+            tolerance_ft = st.number_input("Hand-Dig Tolerance Zone Each Side of a Utility (Feet):", min_value=0.0, value=2.0, step=0.5)
+            machine_rate = st.number_input("Machine Excavation Rate (Cubic Yards per Hour):", min_value=0.1, value=15.0, step=1.0)
+            hand_rate = st.number_input("Hand Dig Rate (Cubic Yards per Hour):", min_value=0.05, value=0.75, step=0.05)
+            swell_pct = st.number_input("Spoil Swell (%):", min_value=0.0, value=25.0, step=5.0)
+            truck_cu_yd = st.number_input("Haul Truck Capacity (Cubic Yards):", min_value=1.0, value=12.0, step=1.0)
+        with col2:
+            native_backfill = st.checkbox("Backfill with native spoil", value=True)
+            excavator_rate = st.number_input("Excavator Cost per Hour ($):", min_value=0.0, value=catalog_price("Underground Utility", "Excavator Hour"), format="%.2f", step=5.0)
+            dig_labor_rate = st.number_input("Excavation Labor Rate per Hour ($):", min_value=0.0, format="%.2f", step=0.5)
+            bedding_price = st.number_input("Bedding Material per Cubic Yard ($):", min_value=0.0, value=catalog_price("Underground Utility", "Bedding"), format="%.2f", step=1.0)
+            backfill_price = st.number_input("Imported Backfill per Cubic Yard ($):", min_value=0.0, value=catalog_price("Underground Utility", "Backfill"), format="%.2f", step=1.0)
+            haul_price = st.number_input("Haul Cost per Load ($):", min_value=0.0, format="%.2f", step=10.0)
+
+        trench = trench_takeoff(trench_table, locate_store, tolerance_ft, swell_pct, truck_cu_yd,
+                                native_backfill, machine_rate, hand_rate)
+        st.write(f"**{trench['length_ft']:,.0f} ft of trench: {trench['excavation_cu_yd']:,.1f} cu yd excavated, "
+                 f"{trench['bedding_cu_yd']:,.1f} cu yd bedding, {trench['haul_loads']} haul loads.**")
+        st.dataframe(trench["segments"].round(2), use_container_width=True)
+        if not trench["crossings"].empty:
+            st.write(f"{len(trench['crossings'])} located utilities cross the trenches; "
+                     f"{trench['hand_dig_cu_yd']:,.1f} cu yd is hand dug.")
+            st.dataframe(trench["crossings"], use_container_width=True)
+
     # Cost Inputs
     st.subheader("Cost Estimations")
 
@@ -61,6 +158,73 @@ def main():
     hours_per_tech = st.number_input("Hours per Technician per Day:", min_value=0.0, format="%.2f", step=0.5)
     num_days_worked = st.number_input("Total Days of Work:", min_value=1, step=1)
     hourly_rate = st.number_input("Hourly Rate per Technician ($):", min_value=0.0, format="%.2f", step=0.5)
+    # Paid hours differ from hours worked only when the crew optimizer schedules overtime
+    paid_hours_per_tech = hours_per_tech
+
+    # Detection plan: one sweep of the site per chosen method, with the crew above
+    planned_equipment_cost = None
+    if method_rates is not None:
+        crew_cost_per_day = num_technicians * hours_per_tech * hourly_rate
+        plan, ranked = plan_detection(utility_types, method_rates, total_square_footage, crew_cost_per_day)
+        st.subheader("Detection Plan")
+        with st.expander("Cost of Each Method by Utility"):
+            st.caption("Blank where the method cannot locate the utility.")
+            st.dataframe(combination_costs(utility_types, method_rates, total_square_footage, crew_cost_per_day).round(2),
+                         use_container_width=True)
+        if plan.empty:
+            st.warning("Select utility types, and make sure each one has a method with a sweep rate, to plan detection.")
+        else:
+            best = ranked.iloc[0]
+            st.write(f"**Cheapest plan: {best['Methods']} over {int(best['Days'])} days for ${best['Cost ($)']:,.2f}.**")
+            st.dataframe(plan, use_container_width=True)
+            with st.expander("All Method Sets That Cover Every Utility"):
+                st.dataframe(ranked, use_container_width=True)
+
+            # Each method's sweep is a separate pass, so rental and crew days add up
+            chosen = method_rates[method_rates["Method"].isin(plan["Method"])]
+            method_days = plan.drop_duplicates("Method").set_index("Method")["Days"]
+            planned_equipment_cost = float((chosen.set_index("Method")["Equipment per Day ($)"] * method_days).sum())
+            selected_detection_methods = set(plan["Method"])
+            num_days_rented = int(best["Days"])
+            num_days_worked = max(int(best["Days"]), 1)
+
+    # Crew Optimizer
+    with st.expander("Crew Optimizer"):
+        # The detection plan already fixes the days and equipment from its sweeps, and its
+        # methods were costed with the crew above, so the two never size the same job
+        if planned_equipment_cost is not None:
+            st.caption("The detection plan sets the days and equipment from its sweep rates with the crew "
+                       "entered above; clear the detection methods to size the crew from labor hours instead.")
+            use_crew_optimizer = False
+        else:
+            use_crew_optimizer = st.checkbox("Size the crew from total labor hours and a deadline")
+        if use_crew_optimizer:
+            total_labor_hours = st.number_input("Total Technician Labor Hours Required:", min_value=0.0, format="%.2f", step=8.0)
+            deadline_days = st.number_input("Deadline (Working Days):", min_value=1, step=1)
+            shift_hours = st.multiselect("Shift Lengths to Consider (Hours):", [8.0, 10.0, 12.0], default=[8.0])
+            max_technicians = st.number_input("Maximum Number of Technicians:", min_value=1, value=10, step=1)
+
+            # Equipment is rented for every day the crew is on site
+            crews = optimize_crew(
+                total_labor_hours, deadline_days, hourly_rate,
+                equipment_cost_per_day=equipment_rental,
+                shift_hours=shift_hours or [8.0],
+                max_leads=max_technicians,
+            )
+            if crews.empty:
+                st.warning("No crew within these limits meets the deadline; using the crew entered above.")
+            else:
+                best = crews.iloc[0]
+                st.write(f"**Cheapest crew: {int(best['Leads'])} technicians working "
+                         f"{best['Hours per Day']:g}-hour days for {int(best['Days'])} days.**")
+                st.dataframe(crews.head(10), width=700)
+
+                # The optimized crew replaces the labor and rental inputs above
+                num_technicians = int(best["Leads"])
+                num_days_worked = max(int(best["Days"]), 1)
+                num_days_rented = int(best["Days"])
+                hours_per_tech = float(best["Worked Hours per Worker"]) / num_days_worked
+                paid_hours_per_tech = float(best["Paid Hours per Worker"]) / num_days_worked
 
     # Permits and Insurance
     st.subheader("Permits and Insurance")
@@ -74,11 +238,27 @@ def main():
     if st.button("Calculate Total Cost"):
         # Calculate material and equipment costs
         total_equipment_cost = equipment_rental * num_days_rented
+        if planned_equipment_cost is not None:
+            total_equipment_cost = planned_equipment_cost
         total_materials = total_equipment_cost + materials_cost
 
         # Calculate labor costs
         total_labor_hours = num_technicians * hours_per_tech * num_days_worked
-        total_labor_cost = total_labor_hours * hourly_rate
+        total_labor_cost = num_technicians * paid_hours_per_tech * num_days_worked * hourly_rate
+
+        # Trench excavation: machine time and bedding, backfill and haul go to materials; digging is labor
+        trench_cost = 0.0
+        if trench is not None:
+            trench_materials = (trench["machine_hours"] * excavator_rate
+                                + trench["bedding_cu_yd"] * bedding_price
+                                + trench["imported_backfill_cu_yd"] * backfill_price
+                                + trench["haul_loads"] * haul_price)
+            trench_labor_hours = trench["machine_hours"] + trench["hand_dig_hours"]
+            trench_labor_cost = trench_labor_hours * dig_labor_rate
+            total_materials += trench_materials
+            total_labor_hours += trench_labor_hours
+            total_labor_cost += trench_labor_cost
+            trench_cost = trench_materials + trench_labor_cost
 
         # Calculate permit and insurance costs
         total_permit_insurance = permit_cost + insurance_cost
@@ -133,6 +313,34 @@ def main():
             ]
         })
 
+        if locate_store is not None:
+            summary = pd.concat([summary, pd.DataFrame({
+                "Parameter": ["Locate Marks on Record"],
+                "Value": [len(locate_store)],
+            })], ignore_index=True)
+
+        if trench is not None:
+            summary = pd.concat([summary, pd.DataFrame({
+                "Parameter": [
+                    "Trench Length (ft)",
+                    "Excavation (cu yd)",
+                    "Hand Dig at Crossings (cu yd)",
+                    "Bedding (cu yd)",
+                    "Backfill (cu yd)",
+                    "Haul Loads",
+                    "Trench Excavation Cost ($)",
+                ],
+                "Value": [
+                    round(trench["length_ft"], 1),
+                    round(trench["excavation_cu_yd"], 2),
+                    round(trench["hand_dig_cu_yd"], 2),
+                    round(trench["bedding_cu_yd"], 2),
+                    round(trench["backfill_cu_yd"], 2),
+                    trench["haul_loads"],
+                    round(trench_cost, 2),
+                ],
+            })], ignore_index=True)
+
         # Display project summary
         st.subheader("Project Summary and Cost Breakdown")
         st.dataframe(summary, width=600)